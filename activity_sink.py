@@ -0,0 +1,240 @@
+import os
+import time
+import queue
+import atexit
+import logging
+import threading
+from datetime import datetime
+
+from sqlalchemy import insert
+
+# Sentinel telling the writer thread to stop
+_STOP = object()
+
+
+class ActivitySink:
+    """
+    Background writer for activity rows.
+
+    Requests hand rows to a bounded in-process queue and return immediately. A
+    worker thread inserts them in bulk whenever a batch fills up or the flush
+    interval passes. When the queue is full new rows are dropped rather than
+    slowing requests down, and the queue is drained when the process exits.
+    """
+
+    def __init__(self, app, db, model, max_queue=10000, batch_size=500, flush_interval=1.0, on_write=None):
+        """
+        Initialize the sink
+
+        Args:
+            app (Flask): Application used for the database context
+            db (SQLAlchemy): Database extension
+            model: Model class the rows are inserted into
+            max_queue (int): Maximum number of rows waiting to be written
+            batch_size (int): Maximum number of rows per insert
+            flush_interval (float): Maximum seconds a row waits before being written
+            on_write (callable): Optional function called with the session and the
+                                 rows of each batch after they are committed, in a
+                                 transaction of its own so its failures never lose rows
+        """
+        self.app = app
+        self.db = db
+        self.model = model
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.on_write = on_write
+
+        self._lock = threading.Lock()
+        self._queue = None
+        self._thread = None
+        self._pid = None
+
+        self.queued = 0
+        self.flushed = 0
+        self.dropped = 0
+        self.failed = 0
+        self.batches = 0
+        self.on_write_failed = 0
+
+        atexit.register(self.stop)
+
+    def _ensure_started(self):
+        """Start the writer thread, again after a fork since threads don't survive it"""
+        if self._pid == os.getpid() and self._thread is not None:
+            return
+        with self._lock:
+            if self._pid == os.getpid() and self._thread is not None:
+                return
+            self._queue = queue.Queue(maxsize=self.max_queue)
+            self._thread = threading.Thread(target=self._run, name='activity-sink', daemon=True)
+            self._pid = os.getpid()
+            self._thread.start()
+
+    def record(self, **fields):
+        """
+        Queue one activity row
+
+        Args:
+            **fields: Column values for the row
+
+        Returns:
+            bool: True if the row was queued, False if it was dropped
+        """
+        return self.record_many([fields]) == 1
+
+    def record_many(self, rows):
+        """
+        Queue several activity rows
+
+        Args:
+            rows (list): Column value dicts, one per row
+
+        Returns:
+            int: Number of rows queued, the rest were dropped
+        """
+        self._ensure_started()
+        queued = 0
+        for row in rows:
+            row.setdefault('timestamp', datetime.utcnow())
+            try:
+                self._queue.put_nowait(row)
+                queued += 1
+            except queue.Full:
+                self.dropped += 1
+        self.queued += queued
+        if queued < len(rows):
+            logging.warning(f"Activity queue full, dropped {len(rows) - queued} rows")
+        return queued
+
+    def _run(self):
+        """Collect rows into batches and write them until stopped"""
+        work = self._queue
+        stopping = False
+        while not stopping:
+            item = work.get()
+            if item is _STOP:
+                work.task_done()
+                break
+
+            batch = [item]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = work.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    work.task_done()
+                    stopping = True
+                    break
+                batch.append(item)
+
+            self._write(batch)
+            for _ in batch:
+                work.task_done()
+
+        # Write whatever was queued behind the stop request
+        self._write(self._drain(work))
+
+    def _drain(self, work):
+        """Take every row still in a queue without waiting"""
+        rows = []
+        while True:
+            try:
+                item = work.get_nowait()
+            except queue.Empty:
+                return rows
+            work.task_done()
+            if item is not _STOP:
+                rows.append(item)
+
+    def _write(self, rows):
+        """Insert rows in a single statement and commit, then hand them to on_write"""
+        if not rows:
+            return
+        with self.app.app_context():
+            try:
+                self.db.session.execute(insert(self.model), rows)
+                self.db.session.commit()
+                self.flushed += len(rows)
+                self.batches += 1
+            except Exception as e:
+                self.db.session.rollback()
+                self.failed += len(rows)
+                logging.error(f"Error writing {len(rows)} activity rows: {str(e)}")
+                self.db.session.remove()
+                return
+
+            try:
+                if self.on_write is not None:
+                    self.on_write(self.db.session, rows)
+                    self.db.session.commit()
+            except Exception as e:
+                self.db.session.rollback()
+                self.on_write_failed += len(rows)
+                logging.error(f"Error processing {len(rows)} written activity rows: {str(e)}")
+            finally:
+                self.db.session.remove()
+
+    def flush(self, timeout=None):
+        """
+        Wait until every queued row has been written
+
+        Args:
+            timeout (float): Maximum seconds to wait, None waits indefinitely
+
+        Returns:
+            bool: True if the queue was drained, False on timeout
+        """
+        if self._pid != os.getpid() or self._thread is None:
+            return True
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def stop(self, timeout=5.0):
+        """
+        Stop the writer thread after writing every queued row
+
+        Args:
+            timeout (float): Maximum seconds to wait for the writer to finish
+        """
+        if self._pid != os.getpid() or self._thread is None:
+            return
+        thread, work = self._thread, self._queue
+        try:
+            work.put(_STOP, timeout=timeout)
+        except queue.Full:
+            logging.error("Activity queue still full at shutdown")
+        thread.join(timeout)
+        if thread.is_alive():
+            logging.error(f"Activity writer did not finish, {work.qsize()} rows unwritten")
+        else:
+            # The writer stopped, write anything queued after it did
+            self._write(self._drain(work))
+        self._thread = None
+
+    def stats(self):
+        """
+        Get counters for the sink
+
+        Returns:
+            dict: Rows queued, flushed, dropped and failed, rows on_write failed on,
+                  batches written and current backlog
+        """
+        return {
+            'queued': self.queued,
+            'flushed': self.flushed,
+            'dropped': self.dropped,
+            'failed': self.failed,
+            'on_write_failed': self.on_write_failed,
+            'batches': self.batches,
+            'backlog': self._queue.qsize() if self._queue is not None else 0,
+        }
@@ -0,0 +1,268 @@
+"""
+Usage analytics kept up to date incrementally from the activity writer.
+
+Every batch of SessionActivity rows is folded into hourly, daily and all-time
+rollup rows, and popular searches are read off the all-time rows through an
+index, so reports never aggregate the raw table and every worker process
+reports the same counts. Raw rows can then be compacted away:
+
+    python analytics.py backfill
+    python analytics.py compact --keep-days 30 --keep-hourly-days 14
+"""
+import sys
+import logging
+import argparse
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, delete
+from sqlalchemy.dialects import sqlite, postgresql
+
+# Bucket start used for the single all-time rollup row per word
+TOTAL_BUCKET = datetime(1970, 1, 1)
+
+
+def bucket_starts(timestamp):
+    """
+    Get the start of every rollup bucket a timestamp falls in
+
+    Args:
+        timestamp (datetime): Activity time
+
+    Returns:
+        list: (granularity, bucket start) pairs
+    """
+    hour = timestamp.replace(minute=0, second=0, microsecond=0)
+    return [('hour', hour), ('day', hour.replace(hour=0)), ('total', TOTAL_BUCKET)]
+
+
+def aggregate(rows):
+    """
+    Sum activity rows into rollup counts
+
+    Args:
+        rows (list): Activity column dicts with timestamp, word_searched and feature flags
+
+    Returns:
+        dict: Counts keyed by (granularity, bucket start, word), where word '' holds feature totals
+    """
+    counts = {}
+
+    def add(key, searches=0, tts=0, stt=0):
+        entry = counts.setdefault(key, [0, 0, 0])
+        entry[0] += searches
+        entry[1] += tts
+        entry[2] += stt
+
+    for row in rows:
+        timestamp = row.get('timestamp') or datetime.utcnow()
+        tts = 1 if row.get('text_to_speech_used') else 0
+        stt = 1 if row.get('speech_to_text_used') else 0
+        # Speech-to-text rows store the transcript, only count real lookups as searches
+        word = (row.get('word_searched') or '').lower() if not (tts or stt) else ''
+        for granularity, start in bucket_starts(timestamp):
+            add((granularity, start, ''), searches=1 if word else 0, tts=tts, stt=stt)
+            if word:
+                add((granularity, start, word), searches=1)
+    return counts
+
+
+class UsageAnalytics:
+    """Maintains the rollup tables and reports from them"""
+
+    def __init__(self, db, rollup_model, activity_model, read_db=None):
+        """
+        Initialize the analytics
+
+        Args:
+            db (SQLAlchemy): Database extension
+            rollup_model: ActivityRollup model class
+            activity_model: SessionActivity model class
+            read_db (ReadWriteDatabase): Optional source of a read-only session for reports
+        """
+        self.db = db
+        self.read_db = read_db
+        self.rollup_model = rollup_model
+        self.activity_model = activity_model
+
+    def _upsert(self, session, counts):
+        """Add counts to the rollup rows, creating missing rows"""
+        if not counts:
+            return
+        model = self.rollup_model
+        values = [
+            {
+                'granularity': granularity,
+                'bucket_start': start,
+                'word': word,
+                'searches': searches,
+                'text_to_speech_uses': tts,
+                'speech_to_text_uses': stt,
+            }
+            for (granularity, start, word), (searches, tts, stt) in counts.items()
+        ]
+
+        dialect = session.get_bind().dialect.name
+        if dialect in ('sqlite', 'postgresql'):
+            insert = sqlite.insert if dialect == 'sqlite' else postgresql.insert
+            stmt = insert(model).values(values)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=['granularity', 'bucket_start', 'word'],
+                set_={
+                    'searches': model.searches + stmt.excluded.searches,
+                    'text_to_speech_uses': model.text_to_speech_uses + stmt.excluded.text_to_speech_uses,
+                    'speech_to_text_uses': model.speech_to_text_uses + stmt.excluded.speech_to_text_uses,
+                },
+            )
+            session.execute(stmt)
+            return
+
+        # Other databases: update existing rows and insert the rest one by one
+        for value in values:
+            row = session.query(model).filter_by(
+                granularity=value['granularity'], bucket_start=value['bucket_start'], word=value['word']
+            ).first()
+            if row is None:
+                session.add(model(**value))
+            else:
+                row.searches += value['searches']
+                row.text_to_speech_uses += value['text_to_speech_uses']
+                row.speech_to_text_uses += value['speech_to_text_uses']
+
+    def record_rows(self, session, rows):
+        """
+        Fold newly written activity rows into the rollups, in the caller's transaction
+
+        Args:
+            session: Database session the rows were inserted with
+            rows (list): Activity column dicts
+        """
+        self._upsert(session, aggregate(rows))
+
+    def summary(self, hours=24, top=10):
+        """
+        Report usage from the rollups, independent of the raw row count
+
+        Args:
+            hours (int): Number of recent hourly buckets returned
+            top (int): Number of popular searches returned
+
+        Returns:
+            dict: All-time totals, recent hourly totals and the most searched words
+        """
+        model = self.rollup_model
+        session = self.read_db.read_session if self.read_db is not None else self.db.session
+
+        total = session.query(model).filter_by(granularity='total', bucket_start=TOTAL_BUCKET, word='').first()
+        since = datetime.utcnow().replace(minute=0, second=0, microsecond=0) - timedelta(hours=hours - 1)
+        hourly = (session.query(model)
+                  .filter(model.granularity == 'hour', model.word == '', model.bucket_start >= since)
+                  .order_by(model.bucket_start)
+                  .all())
+        # The all-time rows are shared by every worker, read in count order off their index
+        top_searches = session.execute(
+            select(model.word, model.searches)
+            .where(model.granularity == 'total', model.bucket_start == TOTAL_BUCKET, model.word != '')
+            .order_by(model.searches.desc(), model.word)
+            .limit(top)
+        ).all()
+
+        def counts(row):
+            return {
+                'searches': row.searches if row else 0,
+                'text_to_speech': row.text_to_speech_uses if row else 0,
+                'speech_to_text': row.speech_to_text_uses if row else 0,
+            }
+
+        return {
+            'totals': counts(total),
+            'hourly': [dict(counts(row), hour=row.bucket_start.isoformat() + 'Z') for row in hourly],
+            'top_searches': [{'word': word, 'count': count} for word, count in top_searches],
+        }
+
+    def backfill(self, batch_size=10000):
+        """
+        Build rollups from the raw activity rows, for databases that predate them
+
+        Args:
+            batch_size (int): Raw rows aggregated per transaction
+
+        Returns:
+            int: Number of raw rows aggregated
+        """
+        activity = self.activity_model
+        session = self.db.session
+        last_id = 0
+        total = 0
+        while True:
+            rows = session.execute(
+                select(activity.id, activity.timestamp, activity.word_searched,
+                       activity.text_to_speech_used, activity.speech_to_text_used)
+                .where(activity.id > last_id)
+                .order_by(activity.id)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                return total
+            self.record_rows(session, [row._asdict() for row in rows])
+            session.commit()
+            last_id = rows[-1].id
+            total += len(rows)
+
+    def compact(self, keep_days=30, keep_hourly_days=14):
+        """
+        Delete raw activity rows and hourly rollups past their retention period
+
+        Raw rows are already counted in the rollups when they are written, so
+        deleting them loses no totals.
+
+        Args:
+            keep_days (int): Days of raw activity rows to keep
+            keep_hourly_days (int): Days of hourly rollups to keep
+
+        Returns:
+            dict: Number of raw rows and hourly rollups deleted
+        """
+        now = datetime.utcnow()
+        session = self.db.session
+        raw = session.execute(
+            delete(self.activity_model).where(self.activity_model.timestamp < now - timedelta(days=keep_days))
+        ).rowcount
+        hourly = session.execute(
+            delete(self.rollup_model).where(
+                self.rollup_model.granularity == 'hour',
+                self.rollup_model.bucket_start < now - timedelta(days=keep_hourly_days),
+            )
+        ).rowcount
+        session.commit()
+        logging.info(f"Compacted {raw} activity rows and {hourly} hourly rollups")
+        return {'activity_rows': raw, 'hourly_rollups': hourly}
+
+
+def main(argv=None):
+    """Command line entry point for backfilling and compacting analytics"""
+    parser = argparse.ArgumentParser(description='Maintain the usage analytics rollups')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    backfill_parser = subparsers.add_parser('backfill', help='build rollups from existing raw activity rows')
+    backfill_parser.add_argument('--force', action='store_true', help='run even if rollups already exist')
+    compact_parser = subparsers.add_parser('compact', help='delete raw rows and hourly rollups past retention')
+    compact_parser.add_argument('--keep-days', type=int, default=30)
+    compact_parser.add_argument('--keep-hourly-days', type=int, default=14)
+    args = parser.parse_args(argv)
+
+    from app import app, usage_analytics
+    from models import ActivityRollup
+
+    with app.app_context():
+        if args.command == 'backfill':
+            if ActivityRollup.query.first() is not None and not args.force:
+                print("Rollups already exist, backfilling would count rows twice. Use --force to run anyway.")
+                return 1
+            print(f"Aggregated {usage_analytics.backfill()} activity rows.")
+        else:
+            deleted = usage_analytics.compact(args.keep_days, args.keep_hourly_days)
+            print(f"Deleted {deleted['activity_rows']} activity rows and {deleted['hourly_rollups']} hourly rollups.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
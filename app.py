@@ -16,8 +16,8 @@ db = SQLAlchemy(model_class=Base)
 app = Flask(__name__)
 app.secret_key = os.environ.get("SESSION_SECRET", "dev-secret-key")
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
+# Configure logging, debug output on every lookup is too costly for production
+logging.basicConfig(level=os.environ.get("LOG_LEVEL", "INFO").upper())
 
 # configure the database
 db_url = os.environ.get("DATABASE_URL")
@@ -33,9 +33,38 @@ app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
     "pool_pre_ping": True,
 }
 
+# SQLite allows one writer at a time, so keep the write pool small and serve
+# hot reads from a separate read-only pool (see sqlite_tuning.py). In-memory
+# databases use a single shared connection and take no pool options.
+from sqlalchemy.engine import make_url
+from sqlite_tuning import ReadWriteDatabase, is_sqlite_file
+SQLITE_TUNING = os.environ.get("SQLITE_TUNING", "1") != "0"
+if SQLITE_TUNING and is_sqlite_file(make_url(app.config["SQLALCHEMY_DATABASE_URI"])):
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"].update({
+        "pool_size": int(os.environ.get("SQLITE_WRITE_POOL_SIZE", 2)),
+        "max_overflow": 0,
+        "pool_timeout": 30,
+    })
+
 # Initialize the app with the extension
 db.init_app(app)
 
+# Enable WAL and connection pragmas on SQLite and open the read-only pool
+read_write_db = ReadWriteDatabase(
+    app, db,
+    enabled=SQLITE_TUNING,
+    read_pool_size=int(os.environ.get("SQLITE_READ_POOL_SIZE", 8)),
+)
+
+# Record per-route latency, stage timings and query counts, and optionally
+# profile every Nth request
+from request_metrics import RequestMetrics
+request_metrics = RequestMetrics(
+    app,
+    profile_every=int(os.environ.get("PROFILE_EVERY_N_REQUESTS", 0)),
+    profile_dir=os.environ.get("PROFILE_DIR"),
+)
+
 with app.app_context():
     # Make sure to import the models here or their tables won't be created
     import models  # noqa: F401
@@ -43,6 +72,90 @@ with app.app_context():
     # Create database tables if they don't exist
     db.create_all()
 
+    # Add columns and indexes that create_all doesn't apply to existing tables
+    from schema_upgrade import upgrade_schema
+    upgrade_schema(db)
+
+# Keep usage rollups up to date as activity rows are written
+from analytics import UsageAnalytics
+usage_analytics = UsageAnalytics(
+    db, models.ActivityRollup, models.SessionActivity,
+    read_db=read_write_db,
+)
+
+# Write activity rows in the background so requests don't wait on a commit
+from activity_sink import ActivitySink
+activity_sink = ActivitySink(
+    app, db, models.SessionActivity,
+    max_queue=int(os.environ.get("ACTIVITY_QUEUE_SIZE", 10000)),
+    batch_size=int(os.environ.get("ACTIVITY_BATCH_SIZE", 500)),
+    flush_interval=float(os.environ.get("ACTIVITY_FLUSH_INTERVAL", 1.0)),
+    on_write=usage_analytics.record_rows,
+)
+
+# Cache synthesized speech on disk, keyed by the text and voice settings
+from tts_cache import TTSCache, TTS_BACKENDS
+tts_cache = TTSCache(
+    os.environ.get("TTS_CACHE_DIR", os.path.join(app.instance_path, "tts_cache")),
+    backend=TTS_BACKENDS[os.environ.get("TTS_BACKEND", "gtts")](),
+    max_bytes=int(os.environ.get("TTS_CACHE_MAX_BYTES", 256 * 1024 * 1024)),
+    wait_timeout=float(os.environ.get("SPEECH_CALL_TIMEOUT", 15.0)),
+)
+
+# Speech recognition engine and the largest audio upload it accepts
+from stt_engine import STT_BACKENDS
+stt_backend = STT_BACKENDS[os.environ.get("STT_BACKEND", "google")]()
+app.config["STT_MAX_UPLOAD_BYTES"] = int(os.environ.get("STT_MAX_UPLOAD_BYTES", 10 * 1024 * 1024))
+# Reject bigger request bodies with 413 before werkzeug parses and spools them,
+# leaving room for the multipart framing around the audio file
+app.config["MAX_CONTENT_LENGTH"] = int(os.environ.get(
+    "MAX_CONTENT_LENGTH", app.config["STT_MAX_UPLOAD_BYTES"] + 64 * 1024))
+
+# Run blocking TTS/STT engine calls on a bounded pool so they can't tie up every worker
+from engine_pool import EnginePool
+speech_pool = EnginePool(
+    "speech",
+    max_workers=int(os.environ.get("SPEECH_POOL_WORKERS", 4)),
+    max_queue=int(os.environ.get("SPEECH_POOL_QUEUE", 8)),
+    timeout=float(os.environ.get("SPEECH_CALL_TIMEOUT", 15.0)),
+)
+
+# Serve the vocabulary for the exercises and quiz pages from memory
+from sign_catalog import SignCatalogService
+sign_catalog = SignCatalogService(
+    db, models.SignLanguageEntry,
+    ttl=float(os.environ.get("CATALOG_TTL", 60.0)),
+    page_cache_size=int(os.environ.get("CATALOG_PAGE_CACHE_SIZE", 0)),
+    read_db=read_write_db,
+)
+
+# Suggest close matches for words without a sign
+from fuzzy_search import FuzzyMatcher
+fuzzy_matcher = FuzzyMatcher(sign_catalog, max_distance=int(os.environ.get("FUZZY_MAX_DISTANCE", 2)))
+
+# Stitch popular sentences into one video and hint the first clips of others to the browser
+from sentence_stitcher import SentenceStitcher
+sentence_stitcher = SentenceStitcher(
+    os.environ.get("SENTENCE_CACHE_DIR", os.path.join(app.instance_path, "sentence_cache")),
+    min_requests=int(os.environ.get("SENTENCE_STITCH_MIN_REQUESTS", 3)),
+    max_bytes=int(os.environ.get("SENTENCE_CACHE_MAX_BYTES", 512 * 1024 * 1024)),
+)
+app.config["SIGN_PRELOAD_CLIPS"] = int(os.environ.get("SIGN_PRELOAD_CLIPS", 3))
+
+# Load the minified, fingerprinted static bundles once 'python assets.py build' has run
+from assets import AssetManifest
+asset_manifest = AssetManifest(
+    app.static_folder,
+    os.path.join(app.static_folder, "dist"),
+    enabled=os.environ.get("ASSET_BUNDLES", "1") != "0",
+)
+app.jinja_env.globals["asset_urls"] = asset_manifest.urls
+
+# Build the sign video index and metadata once so the first lookups don't pay for them
+with app.app_context():
+    from utils import video_manifest
+    video_manifest().entries()
+
 # Import Flask's render_template
 from flask import render_template
 
@@ -0,0 +1,597 @@
+"""
+Build step for the static JS and CSS.
+
+The scripts and stylesheet are bundled, minified and written under content
+hashed names with gzip (and brotli, when the brotli package is installed)
+variants next to them, so the browser fetches one file per bundle, caches it
+forever and gets the smallest encoding it accepts. Templates resolve bundle
+URLs through the manifest and fall back to the individual source files until
+the bundles are built. The files of the last few builds are kept and still
+served, so pages cached before a deploy can load their bundles:
+
+    python assets.py build [--keep N]
+    python assets.py clean
+
+The rjsmin, rcssmin and brotli packages are optional (pip install '.[assets]');
+without them a built-in minifier and gzip are used.
+"""
+import os
+import re
+import sys
+import gzip
+import json
+import time
+import hashlib
+import logging
+import argparse
+import threading
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import rjsmin
+except ImportError:
+    rjsmin = None
+
+try:
+    import rcssmin
+except ImportError:
+    rcssmin = None
+
+ROOT_PATH = os.path.dirname(os.path.abspath(__file__))
+STATIC_DIR = os.path.join(ROOT_PATH, 'static')
+DIST_DIR = os.path.join(STATIC_DIR, 'dist')
+MANIFEST_NAME = 'manifest.json'
+HISTORY_NAME = 'history.json'
+
+# Number of previous builds whose files are kept next to the current one
+KEEP_BUILDS = 3
+
+# Bundles by name, each built from source files under static/ in load order
+BUNDLES = {
+    'js/main.js': ['js/sign_language.js', 'data/sign_language_data.js', 'js/progress_tracker.js', 'js/script.js',
+                   'js/spaced_repetition.js'],
+    'js/quiz.js': ['js/quiz.js'],
+    'css/style.css': ['css/style.css'],
+}
+
+MIMETYPES = {
+    '.js': 'text/javascript',
+    '.css': 'text/css',
+}
+
+# Pre-compressed variants, in order of preference when the client accepts several
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+# A '/' after one of these starts a regular expression literal, not a division
+_REGEX_PRECEDERS = set('(,=:[!&|?{};+-*%<>~^')
+_REGEX_KEYWORDS = {'return', 'typeof', 'case', 'do', 'else', 'in', 'instanceof', 'new', 'delete', 'void',
+                   'throw', 'yield', 'await'}
+_WORD_CHARS = re.compile(r'[\w$]+$')
+
+
+def _skip_string(source, i):
+    """Get the index after the quoted string starting at i"""
+    quote = source[i]
+    j = i + 1
+    while j < len(source):
+        c = source[j]
+        if c == '\\':
+            j += 2
+            continue
+        if c == quote:
+            return j + 1
+        if c == '\n':
+            break
+        j += 1
+    raise ValueError(f"Unterminated string at offset {i}")
+
+
+def _skip_template(source, i):
+    """Get the index after the template literal starting at i, including nested ${} expressions"""
+    j = i + 1
+    while j < len(source):
+        c = source[j]
+        if c == '\\':
+            j += 2
+            continue
+        if c == '`':
+            return j + 1
+        if c == '$' and source.startswith('{', j + 1):
+            j = _skip_expression(source, j + 2)
+            continue
+        j += 1
+    raise ValueError(f"Unterminated template literal at offset {i}")
+
+
+def _skip_expression(source, j):
+    """Get the index after the closing brace of a template ${} expression"""
+    depth = 1
+    while j < len(source):
+        c = source[j]
+        if c in '\'"':
+            j = _skip_string(source, j)
+            continue
+        if c == '`':
+            j = _skip_template(source, j)
+            continue
+        if c == '{':
+            depth += 1
+        elif c == '}':
+            depth -= 1
+            if depth == 0:
+                return j + 1
+        j += 1
+    raise ValueError("Unterminated template expression")
+
+
+def _skip_regex(source, i):
+    """Get the index after the regular expression literal starting at i, or None if it isn't one"""
+    j = i + 1
+    in_class = False
+    while j < len(source):
+        c = source[j]
+        if c == '\\':
+            j += 2
+            continue
+        if c == '\n':
+            return None
+        if c == '[':
+            in_class = True
+        elif c == ']':
+            in_class = False
+        elif c == '/' and not in_class:
+            j += 1
+            while j < len(source) and (source[j].isalnum() or source[j] == '_'):
+                j += 1
+            return j
+        j += 1
+    return None
+
+
+def _regex_allowed(code):
+    """Check whether a '/' following the code emitted so far starts a regular expression"""
+    tail = code.rstrip()
+    if not tail:
+        return True
+    if tail[-1] in _REGEX_PRECEDERS:
+        return True
+    word = _WORD_CHARS.search(tail)
+    return word is not None and word.group() in _REGEX_KEYWORDS
+
+
+def _compact_code(code):
+    """Collapse whitespace in code outside literals, keeping line breaks for automatic semicolons"""
+    code = re.sub(r'[ \t\r\f\v]+', ' ', code)
+    return re.sub(r' ?\n\s*', '\n', code)
+
+
+def minify_js(source):
+    """
+    Minify JavaScript
+
+    Uses rjsmin when installed. Otherwise comments and indentation are removed
+    while strings, template and regular expression literals are kept verbatim
+    and line breaks are kept, so automatic semicolon insertion is unaffected.
+
+    Args:
+        source (str): JavaScript source
+
+    Returns:
+        str: Minified JavaScript
+    """
+    if rjsmin is not None:
+        return rjsmin.jsmin(source)
+
+    out = []
+    code = []
+    i = 0
+    n = len(source)
+
+    def flush():
+        if code:
+            out.append(_compact_code(''.join(code)))
+            code.clear()
+
+    def emitted():
+        # The end of the output is enough to tell what precedes a '/'
+        tail = ''.join(code[-200:])
+        if len(code) < 200 and out:
+            tail = out[-1][-200:] + tail
+        return tail
+
+    while i < n:
+        c = source[i]
+        if c in '\'"`':
+            end = _skip_template(source, i) if c == '`' else _skip_string(source, i)
+            flush()
+            out.append(source[i:end])
+            i = end
+        elif source.startswith('//', i):
+            end = source.find('\n', i)
+            i = n if end == -1 else end
+        elif source.startswith('/*', i):
+            end = source.find('*/', i + 2)
+            if end == -1:
+                raise ValueError(f"Unterminated comment at offset {i}")
+            # Keep a line break where the comment had one, in case it ended a statement
+            code.append('\n' if '\n' in source[i:end] else ' ')
+            i = end + 2
+        elif c == '/' and _regex_allowed(emitted()):
+            end = _skip_regex(source, i)
+            if end is None:
+                code.append(c)
+                i += 1
+            else:
+                flush()
+                out.append(source[i:end])
+                i = end
+        else:
+            code.append(c)
+            i += 1
+    flush()
+    return ''.join(out).strip() + '\n'
+
+
+def minify_css(source):
+    """
+    Minify CSS
+
+    Uses rcssmin when installed. Otherwise comments are removed and whitespace
+    is collapsed outside strings.
+
+    Args:
+        source (str): CSS source
+
+    Returns:
+        str: Minified CSS
+    """
+    if rcssmin is not None:
+        return rcssmin.cssmin(source)
+
+    out = []
+    code = []
+    i = 0
+    n = len(source)
+
+    def flush():
+        chunk = re.sub(r'\s+', ' ', ''.join(code))
+        chunk = re.sub(r' ?([{};,>]) ?', r'\1', chunk)
+        out.append(re.sub(r': ', ':', chunk).replace(';}', '}'))
+        code.clear()
+
+    while i < n:
+        c = source[i]
+        if c in '\'"':
+            end = _skip_string(source, i)
+            flush()
+            out.append(source[i:end])
+            i = end
+        elif source.startswith('/*', i):
+            end = source.find('*/', i + 2)
+            code.append(' ')
+            i = n if end == -1 else end + 2
+        else:
+            code.append(c)
+            i += 1
+    flush()
+    return ''.join(out).strip() + '\n'
+
+
+def bundle(static_dir, sources):
+    """
+    Concatenate and minify the source files of a bundle
+
+    Args:
+        static_dir (str): Directory the source paths are relative to
+        sources (list): Source paths in load order
+
+    Returns:
+        bytes: Minified bundle
+    """
+    texts = []
+    for source in sources:
+        with open(os.path.join(static_dir, source), encoding='utf-8') as f:
+            texts.append(f.read())
+    if sources[0].endswith('.css'):
+        return minify_css('\n'.join(texts)).encode('utf-8')
+    # Each file is a separate classic script, so end every one of them as a statement
+    return ''.join(minify_js(text) + ';\n' for text in texts).encode('utf-8')
+
+
+def _write(path, data):
+    """Write a file atomically so a running server never serves a partial one"""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _read_json(path, default):
+    """Read a JSON file written by a previous build, or get the default if there is none"""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+def build(static_dir=STATIC_DIR, dist_dir=DIST_DIR, bundles=BUNDLES, keep_builds=KEEP_BUILDS):
+    """
+    Build every bundle with its compressed variants and write the manifest
+
+    The manifest it replaces is added to the build history. Files that are
+    in neither the manifest nor the last keep_builds previous builds are deleted.
+
+    Args:
+        static_dir (str): Directory the source paths are relative to
+        dist_dir (str): Directory the bundles and manifest are written to
+        bundles (dict): Source paths by bundle name
+        keep_builds (int): Number of previous builds whose files are kept
+
+    Returns:
+        dict: Manifest entries by bundle name
+    """
+    previous = _read_json(os.path.join(dist_dir, MANIFEST_NAME), None)
+    history = _read_json(os.path.join(dist_dir, HISTORY_NAME), [])
+
+    manifest = {}
+    for name, sources in bundles.items():
+        data = bundle(static_dir, sources)
+        digest = hashlib.sha256(data).hexdigest()
+        stem, ext = os.path.splitext(name)
+        filename = f"{stem}.{digest[:12]}{ext}"
+        path = os.path.join(dist_dir, filename)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        variants = {'identity': len(data)}
+        if not os.path.exists(path):
+            _write(path, data)
+        # mtime=0 keeps the gzip output identical across builds of the same bundle
+        compressed = {'gzip': gzip.compress(data, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            compressed['br'] = brotli.compress(data, mode=brotli.MODE_TEXT, quality=11)
+        for encoding, suffix in ENCODINGS:
+            if encoding not in compressed:
+                continue
+            # Only keep a variant that is actually smaller than the plain file
+            if len(compressed[encoding]) < len(data):
+                _write(path + suffix, compressed[encoding])
+                variants[encoding] = len(compressed[encoding])
+
+        manifest[name] = {
+            'file': filename,
+            'sha256': digest,
+            'sources': list(sources),
+            'sizes': variants,
+        }
+        logging.info(f"Built {filename}: {len(data)} bytes, " +
+                     ', '.join(f"{encoding} {size}" for encoding, size in variants.items() if encoding != 'identity'))
+
+    # Newest first; rebuilding unchanged sources doesn't push out an older build
+    if previous and previous != manifest:
+        history.insert(0, previous)
+    history = [entries for entries in history if entries != manifest][:max(keep_builds, 0)]
+
+    # The history is written first so a reader of the new manifest finds it complete
+    _write(os.path.join(dist_dir, HISTORY_NAME), json.dumps(history, indent=2, sort_keys=True).encode('utf-8'))
+    _write(os.path.join(dist_dir, MANIFEST_NAME), json.dumps(manifest, indent=2, sort_keys=True).encode('utf-8'))
+    _remove_stale(dist_dir, [manifest] + history)
+    return manifest
+
+
+def _remove_stale(dist_dir, manifests):
+    """Delete built files that aren't referenced by any of the manifests"""
+    keep = {MANIFEST_NAME, HISTORY_NAME}
+    for manifest in manifests:
+        for entry in manifest.values():
+            keep.add(entry['file'])
+            keep.update(entry['file'] + suffix for _, suffix in ENCODINGS)
+    for directory, _, filenames in os.walk(dist_dir):
+        for filename in filenames:
+            path = os.path.join(directory, filename)
+            if os.path.relpath(path, dist_dir).replace(os.sep, '/') not in keep:
+                os.remove(path)
+
+
+def clean(dist_dir=DIST_DIR):
+    """
+    Delete the built bundles and manifest
+
+    Args:
+        dist_dir (str): Directory the bundles were written to
+
+    Returns:
+        int: Number of files deleted
+    """
+    removed = 0
+    for directory, _, filenames in os.walk(dist_dir, topdown=False):
+        for filename in filenames:
+            os.remove(os.path.join(directory, filename))
+            removed += 1
+        os.rmdir(directory)
+    return removed
+
+
+class AssetManifest:
+    """
+    Resolves bundle names to the URLs of their built files.
+
+    The manifest is re-read when a new build replaces it, checked at most every
+    check_interval seconds. Without a manifest, or with bundling disabled,
+    bundle names resolve to their individual source files. Files of the
+    previous builds in the history are still served, but never linked.
+    """
+
+    def __init__(self, static_dir=STATIC_DIR, dist_dir=DIST_DIR, bundles=BUNDLES, enabled=True,
+                 check_interval=2.0):
+        """
+        Initialize the manifest
+
+        Args:
+            static_dir (str): Directory the source paths are relative to
+            dist_dir (str): Directory holding the bundles and manifest
+            bundles (dict): Source paths by bundle name, used when the manifest is missing
+            enabled (bool): Whether to serve bundles at all
+            check_interval (float): Seconds between checks for a new manifest
+        """
+        self.static_dir = static_dir
+        self.dist_dir = dist_dir
+        self.bundles = bundles
+        self.enabled = enabled
+        self.check_interval = check_interval
+        self.reloads = 0
+        self._entries = {}
+        self._files = {}
+        self._mtime = None
+        self._checked = 0.0
+        self._lock = threading.Lock()
+
+    def _refresh(self):
+        """Load the manifest if it changed since the last check"""
+        now = time.monotonic()
+        if now - self._checked < self.check_interval:
+            return
+        with self._lock:
+            if now - self._checked < self.check_interval:
+                return
+            self._checked = now
+            path = os.path.join(self.dist_dir, MANIFEST_NAME)
+            try:
+                mtime = os.path.getmtime(path)
+            except OSError:
+                self._entries, self._files, self._mtime = {}, {}, None
+                return
+            if mtime == self._mtime:
+                return
+            try:
+                with open(path) as f:
+                    entries = json.load(f)
+            except (OSError, ValueError) as e:
+                logging.error(f"Error loading asset manifest: {str(e)}")
+                return
+            files = {}
+            for previous in reversed(_read_json(os.path.join(self.dist_dir, HISTORY_NAME), [])):
+                files.update((entry['file'], entry) for entry in previous.values())
+            files.update((entry['file'], entry) for entry in entries.values())
+            self._entries = entries
+            self._files = files
+            self._mtime = mtime
+            self.reloads += 1
+            self._warn_if_stale(entries, mtime)
+
+    def _warn_if_stale(self, entries, mtime):
+        """Log bundles whose sources were edited after the build"""
+        for name, entry in entries.items():
+            for source in entry['sources']:
+                try:
+                    if os.path.getmtime(os.path.join(self.static_dir, source)) > mtime:
+                        logging.warning(f"{source} changed since {name} was built, run 'python assets.py build'")
+                        break
+                except OSError:
+                    continue
+
+    def urls(self, name):
+        """
+        Get the URLs to load for a bundle, for use in templates
+
+        Args:
+            name (str): Bundle name, e.g. js/main.js
+
+        Returns:
+            list: The fingerprinted bundle URL, or the static URLs of its source files
+        """
+        from flask import url_for
+
+        if self.enabled:
+            self._refresh()
+            entry = self._entries.get(name)
+            if entry is not None:
+                return [url_for('asset', filename=entry['file'])]
+        return [url_for('static', filename=source) for source in self.bundles.get(name, [name])]
+
+    def lookup(self, filename):
+        """
+        Find a built bundle file
+
+        Args:
+            filename (str): Fingerprinted file name relative to the dist directory
+
+        Returns:
+            tuple: (path, mimetype, sha256, available encodings) or None if the
+                   file isn't part of the current or a kept previous build
+        """
+        self._refresh()
+        entry = self._files.get(filename)
+        if entry is None:
+            return None
+        mimetype = MIMETYPES.get(os.path.splitext(filename)[1], 'application/octet-stream')
+        return os.path.join(self.dist_dir, filename), mimetype, entry['sha256'], entry['sizes']
+
+    def stats(self):
+        """
+        Get the state of the manifest
+
+        Returns:
+            dict: Whether bundles are enabled, number of built bundles, reloads and bytes per encoding
+        """
+        self._refresh()
+        totals = {}
+        for entry in self._entries.values():
+            for encoding, size in entry['sizes'].items():
+                totals[encoding] = totals.get(encoding, 0) + size
+        return {
+            'enabled': self.enabled,
+            'bundles': len(self._entries),
+            'reloads': self.reloads,
+            'bytes': totals,
+        }
+
+
+def choose_encoding(accept_encodings, available):
+    """
+    Pick the pre-compressed variant to send
+
+    Args:
+        accept_encodings: The request's parsed Accept-Encoding header
+        available (dict): Sizes of the built variants by encoding
+
+    Returns:
+        tuple: (encoding, file suffix), or (None, '') for the plain file
+    """
+    for encoding, suffix in ENCODINGS:
+        if encoding in available and accept_encodings.quality(encoding) > 0:
+            return encoding, suffix
+    return None, ''
+
+
+def main(argv=None):
+    """Command line entry point for building the static bundles"""
+    parser = argparse.ArgumentParser(description='Build the minified, fingerprinted static bundles')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    build_parser = subparsers.add_parser('build', help='bundle, minify and compress the JS and CSS and write the manifest')
+    build_parser.add_argument('--keep', type=int, default=KEEP_BUILDS,
+                              help=f"previous builds whose files are kept (default {KEEP_BUILDS})")
+    subparsers.add_parser('clean', help='delete the built bundles so pages load the source files')
+    args = parser.parse_args(argv)
+
+    if args.command == 'clean':
+        print(f"Deleted {clean()} files.")
+        return 0
+
+    manifest = build(keep_builds=args.keep)
+    for name, entry in sorted(manifest.items()):
+        sizes = entry['sizes']
+        source_bytes = sum(os.path.getsize(os.path.join(STATIC_DIR, source)) for source in entry['sources'])
+        encoded = ', '.join(f"{encoding} {size}" for encoding, size in sizes.items() if encoding != 'identity')
+        print(f"{name} -> {entry['file']}: {source_bytes} -> {sizes['identity']} bytes ({encoded})")
+    if brotli is None:
+        print("brotli is not installed, only gzip variants were written (pip install '.[assets]').")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
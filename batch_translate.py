@@ -0,0 +1,369 @@
+"""
+Offline translation of text corpora into sign playlists, without the web app.
+
+Input lines are read lazily, lemmatized and resolved against the video catalog
+in chunks on a process pool, and written back in input order as JSON lines, so
+memory stays bounded by the number of chunks in flight:
+
+    python batch_translate.py course.txt -o playlists.jsonl --stats coverage.json
+    python batch_translate.py lessons.jsonl --text-field body --workers 8 --chunk-size 200
+"""
+import os
+import sys
+import json
+import logging
+import argparse
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from nlp_resources import missing_resources, warmup
+from phrase_matcher import get_phrase_matcher
+from utils import process_words
+from video_catalog import get_video_catalog
+
+ROOT_PATH = os.path.dirname(os.path.abspath(__file__))
+VIDEO_DIR = 'static/videos/sign_language/'
+
+
+def load_vocabulary(database_url):
+    """
+    Load the words that have a video from the vocabulary table
+
+    Args:
+        database_url (str): SQLAlchemy database URL
+
+    Returns:
+        dict: Video paths keyed by normalized word
+    """
+    from sqlalchemy import create_engine, text
+
+    engine = create_engine(database_url)
+    try:
+        with engine.connect() as connection:
+            rows = connection.execute(text(
+                "SELECT word_normalized, video_path FROM sign_language_entry "
+                "WHERE video_path IS NOT NULL AND word_normalized IS NOT NULL"
+            ))
+            return {word: video_path for word, video_path in rows}
+    finally:
+        engine.dispose()
+
+
+class SignTranslator:
+    """
+    Turns text into sign playlists using the video catalog directly.
+
+    Works outside a Flask app context: phrase clips are matched first, then
+    words with a video in the vocabulary table, and the rest are fingerspelled
+    when every character has a clip.
+    """
+
+    def __init__(self, root_path=ROOT_PATH, video_dir=VIDEO_DIR, vocabulary=None):
+        """
+        Initialize the translator
+
+        Args:
+            root_path (str): Application root path the video directory is relative to
+            video_dir (str): Directory path where videos are stored
+            vocabulary (dict): Optional video paths keyed by normalized word
+        """
+        self.catalog = get_video_catalog(root_path, video_dir)
+        self.matcher = get_phrase_matcher(self.catalog, process_words)
+        self.vocabulary = vocabulary or {}
+
+    def translate(self, text):
+        """
+        Translate one text
+
+        Args:
+            text (str): Text to translate
+
+        Returns:
+            dict: playlist of clips in play order, each with the words it signs,
+                  its kind (sign, vocabulary or fingerspell) and video path and
+                  title, plus the list of words that couldn't be signed
+        """
+        words = text.split()
+        processed = process_words(words)
+        base_words = [p[0] if p else None for p in processed]
+
+        playlist = []
+        missing = []
+        for segment in self.matcher.segment(base_words):
+            word = ' '.join(w for w in base_words[segment['start']:segment['end']] if w)
+            if not word:
+                continue
+            if segment['video_path']:
+                playlist.append({'word': word, 'kind': 'sign', 'video_path': segment['video_path'],
+                                 'video_title': segment['video_title']})
+                continue
+
+            video_path = self.vocabulary.get(word.lower())
+            if video_path:
+                playlist.append({'word': word, 'kind': 'vocabulary', 'video_path': video_path,
+                                 'video_title': os.path.splitext(os.path.basename(video_path))[0]})
+                continue
+
+            letters = self.matcher.fingerspell(word)
+            if letters:
+                playlist.extend({'word': word, 'kind': 'fingerspell', 'video_path': video_path,
+                                 'video_title': video_title} for video_path, video_title in letters)
+            else:
+                missing.append(word)
+        return {'words': [w for w in base_words if w], 'playlist': playlist, 'missing': missing}
+
+
+# Translator of each worker process, created once by the pool initializer
+_translator = None
+
+
+def _init_worker(root_path, video_dir, vocabulary, quiet):
+    global _translator
+    if quiet:
+        # The NLTK fallback would otherwise log an error for every line
+        logging.disable(logging.ERROR)
+    warmup()
+    _translator = SignTranslator(root_path, video_dir, vocabulary)
+
+
+def _translate_chunk(records):
+    """Translate a chunk of (id, text) records in a worker"""
+    return [dict(id=record_id, **_translator.translate(text)) for record_id, text in records]
+
+
+def read_records(stream, text_field=None, id_field='id'):
+    """
+    Read (id, text) records lazily from plain text or JSON lines
+
+    Args:
+        stream: Text stream to read
+        text_field (str): Field holding the text in JSON lines, None reads plain text lines
+        id_field (str): Field holding the record id in JSON lines, line numbers are used otherwise
+
+    Yields:
+        tuple: (id, text) for every non-empty line
+    """
+    for line_number, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+        if text_field is None:
+            yield line_number, line
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            logging.warning(f"Skipping invalid JSON on line {line_number}")
+            continue
+        text = record.get(text_field) if isinstance(record, dict) else None
+        if isinstance(text, str) and text.strip():
+            yield record.get(id_field, line_number), text
+
+
+def chunked(iterable, size):
+    """Group an iterable into lists of at most size items"""
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class SpaceSaving:
+    """
+    Space-Saving summary of the most frequent items in a stream.
+
+    Keeps at most capacity counters. An unseen item replaces the smallest
+    counter and inherits its count as an overestimate, so every item whose true
+    count exceeds total / capacity is guaranteed to be tracked.
+    """
+
+    def __init__(self, capacity=100):
+        self.capacity = capacity
+        self.counts = {}
+        self.errors = {}
+        self._lock = threading.Lock()
+
+    def offer(self, item, count=1):
+        """
+        Count occurrences of an item
+
+        Args:
+            item: Item seen in the stream
+            count (int): Number of occurrences
+        """
+        with self._lock:
+            if item in self.counts:
+                self.counts[item] += count
+            elif len(self.counts) < self.capacity:
+                self.counts[item] = count
+                self.errors[item] = 0
+            else:
+                victim = min(self.counts, key=self.counts.get)
+                floor = self.counts.pop(victim)
+                self.errors.pop(victim)
+                self.counts[item] = floor + count
+                self.errors[item] = floor
+
+    def top(self, n=10):
+        """
+        Get the most frequent items
+
+        Args:
+            n (int): Number of items returned
+
+        Returns:
+            list: (item, estimated count, maximum overestimate) tuples, most frequent first
+        """
+        with self._lock:
+            ranked = sorted(self.counts.items(), key=lambda item: (-item[1], item[0]))[:n]
+            return [(item, count, self.errors[item]) for item, count in ranked]
+
+
+class CoverageStats:
+    """Running totals of how much of a corpus could be signed"""
+
+    def __init__(self, top_missing=100):
+        self.texts = 0
+        self.words = 0
+        self.clips = {'sign': 0, 'vocabulary': 0, 'fingerspell': 0}
+        self.missing = 0
+        self.missing_words = SpaceSaving(top_missing * 10)
+        self.top_missing = top_missing
+
+    def add(self, result):
+        self.texts += 1
+        self.words += len(result['words'])
+        for clip in result['playlist']:
+            self.clips[clip['kind']] += 1
+        self.missing += len(result['missing'])
+        for word in result['missing']:
+            self.missing_words.offer(word)
+
+    def report(self):
+        """
+        Get the totals
+
+        Returns:
+            dict: Texts and words processed, clips by kind, words without any
+                  sign and the most frequent of them
+        """
+        return {
+            'texts': self.texts,
+            'words': self.words,
+            'clips': dict(self.clips),
+            'missing': self.missing,
+            'coverage': round(1 - self.missing / self.words, 4) if self.words else None,
+            'top_missing': [{'word': word, 'count': count} for word, count, _ in
+                            self.missing_words.top(self.top_missing)],
+        }
+
+
+def translate_stream(records, out, workers=None, chunk_size=100, vocabulary=None,
+                     root_path=ROOT_PATH, video_dir=VIDEO_DIR, quiet=False):
+    """
+    Translate records and write one JSON line per record, in input order
+
+    At most two chunks per worker are in flight, so memory use doesn't grow
+    with the size of the input.
+
+    Args:
+        records (iterable): (id, text) records
+        out: Text stream the JSON lines are written to
+        workers (int): Worker processes, 0 translates in this process
+        chunk_size (int): Records sent to a worker at a time
+        vocabulary (dict): Optional video paths keyed by normalized word
+        root_path (str): Application root path the video directory is relative to
+        video_dir (str): Directory path where videos are stored
+        quiet (bool): Silence per-line errors in the workers
+
+    Returns:
+        CoverageStats: Totals for the translated records
+    """
+    stats = CoverageStats()
+
+    def write(results):
+        for result in results:
+            stats.add(result)
+            out.write(json.dumps(result, ensure_ascii=False))
+            out.write('\n')
+
+    chunks = chunked(records, chunk_size)
+    if workers == 0:
+        # The worker setup runs in this process, so undo its logging changes afterwards
+        disabled = logging.root.manager.disable
+        try:
+            _init_worker(root_path, video_dir, vocabulary, quiet)
+            for chunk in chunks:
+                write(_translate_chunk(chunk))
+        finally:
+            logging.disable(disabled)
+        return stats
+
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(root_path, video_dir, vocabulary, quiet)) as executor:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(_translate_chunk, chunk))
+            if len(pending) >= workers * 2:
+                write(pending.popleft().result())
+        while pending:
+            write(pending.popleft().result())
+    return stats
+
+
+def main(argv=None):
+    """Command line entry point for translating a corpus"""
+    parser = argparse.ArgumentParser(description='Translate a text corpus into sign playlists')
+    parser.add_argument('input', help="text or JSON lines file, '-' reads standard input")
+    parser.add_argument('-o', '--output', default='-', help="JSON lines output file, '-' writes standard output")
+    parser.add_argument('--text-field', help='read JSON lines and translate this field, default for .jsonl input is "text"')
+    parser.add_argument('--id-field', default='id')
+    parser.add_argument('--workers', type=int, default=None, help='worker processes, 0 runs in this process')
+    parser.add_argument('--chunk-size', type=int, default=100)
+    parser.add_argument('--database', default=os.environ.get('DATABASE_URL'),
+                        help='database URL whose vocabulary videos are used, defaults to DATABASE_URL')
+    parser.add_argument('--stats', help='write coverage stats as JSON to this file')
+    parser.add_argument('--allow-fallback', action='store_true',
+                        help='run with whitespace tokenizing if NLTK resources are missing')
+    args = parser.parse_args(argv)
+
+    missing = missing_resources()
+    if missing and not args.allow_fallback:
+        print(f"Missing NLTK resources: {', '.join(missing)}. Run 'python nlp_resources.py download' "
+              f"or pass --allow-fallback.", file=sys.stderr)
+        return 1
+
+    vocabulary = load_vocabulary(args.database) if args.database else None
+    text_field = args.text_field or ('text' if args.input.endswith('.jsonl') else None)
+
+    source = sys.stdin if args.input == '-' else open(args.input, encoding='utf-8')
+    out = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+    try:
+        stats = translate_stream(
+            read_records(source, text_field, args.id_field), out,
+            workers=args.workers, chunk_size=args.chunk_size, vocabulary=vocabulary,
+            quiet=bool(missing),
+        )
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if out is not sys.stdout:
+            out.close()
+
+    report = stats.report()
+    if args.stats:
+        with open(args.stats, 'w') as f:
+            json.dump(report, f, indent=2)
+    print(f"Translated {report['texts']} texts, {report['words']} words, {report['missing']} without a sign "
+          f"(coverage {report['coverage']}).", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
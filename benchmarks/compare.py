@@ -0,0 +1,42 @@
+"""
+Compare two saved benchmark baselines and flag regressions:
+
+    python -m benchmarks.compare baseline.json current.json --metric p95_ms --threshold 0.1
+
+Exits with status 1 when any case got slower than the threshold allows.
+"""
+import sys
+import argparse
+
+from benchmarks.harness import load_results, compare_results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compare two benchmark baselines')
+    parser.add_argument('baseline')
+    parser.add_argument('current')
+    parser.add_argument('--metric', default='p95_ms',
+                        choices=('mean_ms', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms'))
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help='relative slowdown reported as a regression')
+    args = parser.parse_args(argv)
+
+    baseline = load_results(args.baseline)
+    current = load_results(args.current)
+    print(f"{args.metric}: {baseline['environment'].get('commit')} -> {current['environment'].get('commit')}")
+
+    rows = compare_results(baseline, current, args.metric, args.threshold)
+    width = max([len(row[0]) for row in rows] + [4])
+    regressions = 0
+    for case, old, new, change, regressed in rows:
+        if change is None:
+            print(f"{case:<{width}} {'-' if old is None else f'{old:.3f}':>10} {'-' if new is None else f'{new:.3f}':>10}")
+            continue
+        regressions += regressed
+        flag = '  REGRESSION' if regressed else ''
+        print(f"{case:<{width}} {old:>10.3f} {new:>10.3f} {change * 100:>+8.1f}%{flag}")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
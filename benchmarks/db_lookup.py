@@ -0,0 +1,57 @@
+"""
+Benchmark case-insensitive vocabulary lookups as the table grows.
+
+Compares the indexed word_normalized column with the old lower(word) filter on
+a throwaway SQLite database:
+
+    python -m benchmarks.db_lookup --sizes 1000 10000 100000
+"""
+import sys
+import time
+import random
+import argparse
+
+from benchmarks.harness import scratch_environment
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark vocabulary lookups at several table sizes')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--lookups', type=int, default=500)
+    args = parser.parse_args(argv)
+
+    # Point the app at scratch storage before it is imported
+    scratch_environment()
+
+    from sqlalchemy import insert
+    from app import app, db
+    from models import SignLanguageEntry, normalize_word
+
+    print(f"{'entries':>10} {'indexed (us)':>14} {'lower() scan (us)':>18}")
+    with app.app_context():
+        count = 0
+        for size in sorted(args.sizes):
+            rows = [{'word': f"Word{i}", 'category': f"Category{i % 50}"} for i in range(count, size)]
+            for start in range(0, len(rows), 10000):
+                db.session.execute(insert(SignLanguageEntry), rows[start:start + 10000])
+            db.session.commit()
+            count = size
+
+            words = [f"WORD{random.randrange(size)}" for _ in range(args.lookups)]
+
+            start = time.perf_counter()
+            for word in words:
+                SignLanguageEntry.query.filter(SignLanguageEntry.word_normalized == normalize_word(word)).first()
+            indexed = (time.perf_counter() - start) / len(words)
+
+            start = time.perf_counter()
+            for word in words:
+                SignLanguageEntry.query.filter(db.func.lower(SignLanguageEntry.word) == db.func.lower(word)).first()
+            scan = (time.perf_counter() - start) / len(words)
+
+            print(f"{size:>10} {indexed * 1e6:>14.1f} {scan * 1e6:>18.1f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,68 @@
+"""
+Benchmark the bigram fuzzy search index against a linear scan at several vocabulary sizes:
+
+    python -m benchmarks.fuzzy_search --sizes 100 1000 10000 100000
+"""
+import sys
+import time
+import random
+import string
+import argparse
+
+from fuzzy_search import NGramIndex, levenshtein, allowed_distance
+
+
+def random_word(rng):
+    return ''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 10)))
+
+
+def misspell(word, rng):
+    """Apply one random edit to a word"""
+    position = rng.randrange(len(word))
+    edit = rng.choice(('insert', 'delete', 'replace'))
+    if edit == 'insert':
+        return word[:position] + rng.choice(string.ascii_lowercase) + word[position:]
+    if edit == 'delete' and len(word) > 1:
+        return word[:position] + word[position + 1:]
+    return word[:position] + rng.choice(string.ascii_lowercase) + word[position + 1:]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the bigram fuzzy search index against a linear scan')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000, 100000])
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--max-distance', type=int, default=2,
+                        help='largest distance for long queries, like FUZZY_MAX_DISTANCE')
+    parser.add_argument('--seed', type=int, default=1606)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    print(f"{'words':>8} {'build (ms)':>11} {'index (us)':>13} {'linear (us)':>12}")
+    for size in args.sizes:
+        words = list({random_word(rng) for _ in range(size)})
+        queries = [misspell(rng.choice(words), rng) for _ in range(args.queries)]
+        # Search with the distance the app allows for each query's length
+        distances = [allowed_distance(query, args.max_distance) for query in queries]
+
+        start = time.perf_counter()
+        index = NGramIndex()
+        for word in words:
+            index.add(word)
+        build = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for query, distance in zip(queries, distances):
+            index.search(query, distance)
+        indexed = (time.perf_counter() - start) / len(queries)
+
+        start = time.perf_counter()
+        for query, distance in list(zip(queries, distances))[:max(1, len(queries) // 10)]:
+            [word for word in words if levenshtein(query, word, distance) <= distance]
+        linear = (time.perf_counter() - start) / max(1, len(queries) // 10)
+
+        print(f"{len(words):>8} {build * 1000:>11.1f} {indexed * 1e6:>13.1f} {linear * 1e6:>12.1f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,185 @@
+"""
+Shared helpers for the benchmarks: timing, percentiles, a scratch app that uses
+the offline speech engines, and JSON baselines that can be compared between
+commits.
+"""
+import os
+import sys
+import json
+import time
+import platform
+import tempfile
+import subprocess
+from datetime import datetime, timezone
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+
+def percentile(sorted_samples, fraction):
+    """
+    Get a percentile of already sorted samples, interpolating between neighbours
+
+    Args:
+        sorted_samples (list): Samples in ascending order
+        fraction (float): Percentile as a fraction, e.g. 0.95
+
+    Returns:
+        float: The percentile, or None without samples
+    """
+    if not sorted_samples:
+        return None
+    position = (len(sorted_samples) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_samples) - 1)
+    return sorted_samples[lower] + (sorted_samples[upper] - sorted_samples[lower]) * (position - lower)
+
+
+def summarize(samples, elapsed=None, errors=0):
+    """
+    Summarize latency samples
+
+    Args:
+        samples (list): Latencies in seconds
+        elapsed (float): Wall clock seconds the samples were taken over, defaults to their sum
+        errors (int): Number of failed operations
+
+    Returns:
+        dict: Count, errors, throughput per second and mean/p50/p95/p99/max latency in milliseconds
+    """
+    ordered = sorted(samples)
+    elapsed = elapsed if elapsed is not None else sum(ordered)
+
+    def ms(value):
+        return round(value * 1000, 4) if value is not None else None
+
+    return {
+        'count': len(ordered),
+        'errors': errors,
+        'throughput': round(len(ordered) / elapsed, 2) if elapsed else None,
+        'mean_ms': ms(sum(ordered) / len(ordered)) if ordered else None,
+        'p50_ms': ms(percentile(ordered, 0.50)),
+        'p95_ms': ms(percentile(ordered, 0.95)),
+        'p99_ms': ms(percentile(ordered, 0.99)),
+        'max_ms': ms(ordered[-1]) if ordered else None,
+    }
+
+
+def measure(fn, iterations=1000, warmup=10):
+    """
+    Time repeated calls of a function
+
+    Args:
+        fn (callable): Function called with no arguments
+        iterations (int): Number of timed calls
+        warmup (int): Number of untimed calls first
+
+    Returns:
+        dict: Summary as returned by summarize
+    """
+    for _ in range(warmup):
+        fn()
+    samples = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return summarize(samples, time.perf_counter() - started)
+
+
+def scratch_environment():
+    """
+    Point the app at a throwaway database and cache directories and at the
+    offline speech engines. Must run before the app is imported.
+
+    Returns:
+        str: The scratch directory
+    """
+    scratch = tempfile.mkdtemp(prefix='sign-bench-')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(scratch, 'bench.db')}"
+    os.environ['TTS_BACKEND'] = 'stub'
+    os.environ['STT_BACKEND'] = 'stub'
+    os.environ['TTS_CACHE_DIR'] = os.path.join(scratch, 'tts_cache')
+    os.environ['SENTENCE_CACHE_DIR'] = os.path.join(scratch, 'sentence_cache')
+    return scratch
+
+
+def environment_info():
+    """Describe the code and machine the results were measured on"""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(RESULTS_DIR), check=True).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+    }
+
+
+def save_results(name, results, path=None):
+    """
+    Write benchmark results as a JSON baseline
+
+    Args:
+        name (str): Benchmark suite name
+        results (dict): Summaries keyed by case name
+        path (str): Output file, defaults to results/<name>-<commit>.json
+
+    Returns:
+        str: The file written
+    """
+    info = environment_info()
+    if path is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        path = os.path.join(RESULTS_DIR, f"{name}-{info['commit'] or 'local'}.json")
+    with open(path, 'w') as f:
+        json.dump({'suite': name, 'environment': info, 'results': results}, f, indent=2, sort_keys=True)
+    return path
+
+
+def load_results(path):
+    """Read a JSON baseline written by save_results"""
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare_results(baseline, current, metric='p95_ms', threshold=0.10):
+    """
+    Compare a metric of two result sets
+
+    Args:
+        baseline (dict): Baseline file contents
+        current (dict): Current file contents
+        metric (str): Summary field compared
+        threshold (float): Relative increase counted as a regression
+
+    Returns:
+        list: (case, baseline value, current value, relative change, regressed) tuples
+    """
+    rows = []
+    old_results = baseline['results']
+    for case, summary in sorted(current['results'].items()):
+        old = old_results.get(case, {}).get(metric)
+        new = summary.get(metric)
+        if old is None or new is None:
+            rows.append((case, old, new, None, False))
+            continue
+        change = (new - old) / old if old else 0.0
+        rows.append((case, old, new, change, change > threshold))
+    return rows
+
+
+def print_table(results, out=sys.stdout):
+    """Print summaries as an aligned table"""
+    width = max([len(case) for case in results] + [4])
+    out.write(f"{'case':<{width}} {'count':>7} {'err':>5} {'ops/s':>10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}\n")
+    for case, summary in results.items():
+        def cell(key):
+            value = summary.get(key)
+            return '-' if value is None else f"{value:.3f}" if isinstance(value, float) else str(value)
+        out.write(f"{case:<{width}} {summary['count']:>7} {summary['errors']:>5} {cell('throughput'):>10} "
+                  f"{cell('p50_ms'):>9} {cell('p95_ms'):>9} {cell('p99_ms'):>9}\n")
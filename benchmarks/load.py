@@ -0,0 +1,206 @@
+"""
+Load test of the HTTP endpoints with the offline speech engines.
+
+Each scenario is run with a number of concurrent clients, either through the
+Flask test client or against a local threaded WSGI server over real sockets:
+
+    python -m benchmarks.load --requests 500 --concurrency 8 --save
+    python -m benchmarks.load --transport http --scenarios find_sign_video text_to_speech
+"""
+import io
+import sys
+import json
+import math
+import time
+import wave
+import random
+import argparse
+import threading
+import http.client
+
+from benchmarks.harness import scratch_environment, summarize, print_table, save_results
+from benchmarks.micro import SENTENCES
+
+
+def silent_wav(seconds=1.0, rate=16000):
+    """Build a mono 16-bit WAV file with a quiet tone"""
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(rate)
+        frames = bytearray()
+        for i in range(int(seconds * rate)):
+            frames += int(200 * math.sin(i / 10)).to_bytes(2, 'little', signed=True)
+        f.writeframes(bytes(frames))
+    return buffer.getvalue()
+
+
+def multipart(field, filename, content, content_type='audio/wav'):
+    """Encode a single file upload as multipart/form-data"""
+    boundary = 'sign-bench-boundary'
+    body = (
+        f"--{boundary}\r\nContent-Disposition: form-data; name=\"{field}\"; filename=\"{filename}\"\r\n"
+        f"Content-Type: {content_type}\r\n\r\n"
+    ).encode() + content + f"\r\n--{boundary}--\r\n".encode()
+    return body, f"multipart/form-data; boundary={boundary}"
+
+
+def scenarios(rng, wav):
+    """
+    Build the request generators, each returning (method, path, body, content type)
+
+    Args:
+        rng (random.Random): Source of randomness for picking inputs
+        wav (bytes): Audio uploaded to the speech-to-text endpoint
+    """
+    words = ' '.join(SENTENCES).replace(',', '').replace('?', '').split()
+    upload, upload_type = multipart('audio', 'speech.wav', wav)
+
+    def post_json(path, payload):
+        return 'POST', path, json.dumps(payload).encode(), 'application/json'
+
+    return {
+        'find_sign_video': lambda: post_json('/api/find-sign-video', {'text': rng.choice(words)}),
+        'find_sign_videos': lambda: post_json('/api/find-sign-videos', {'text': rng.choice(SENTENCES)}),
+        'sign_playlist': lambda: post_json('/api/sign-playlist', {'text': rng.choice(SENTENCES)}),
+        # A small set of phrases so the speech cache sees both hits and misses
+        'text_to_speech': lambda: post_json('/api/text-to-speech', {'text': f"{rng.choice(words)} {rng.randrange(20)}"}),
+        'speech_to_text': lambda: ('POST', '/api/speech-to-text', upload, upload_type),
+        'exercises': lambda: ('GET', '/exercises', None, None),
+        'quiz': lambda: ('GET', '/quiz', None, None),
+    }
+
+
+class TestClientTransport:
+    """Sends requests through the Flask test client, without sockets"""
+
+    def __init__(self, app):
+        self.app = app
+
+    def client(self):
+        return self.app.test_client()
+
+    @staticmethod
+    def send(client, method, path, body, content_type):
+        response = client.open(path, method=method, data=body, content_type=content_type)
+        response.get_data()
+        return response.status_code
+
+    def close(self):
+        pass
+
+
+class HTTPTransport:
+    """Sends requests over keep-alive connections to a local threaded WSGI server"""
+
+    def __init__(self, app):
+        from werkzeug.serving import make_server
+        self.server = make_server('127.0.0.1', 0, app, threaded=True)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def client(self):
+        return http.client.HTTPConnection('127.0.0.1', self.server.server_port, timeout=60)
+
+    @staticmethod
+    def send(client, method, path, body, content_type):
+        headers = {'Content-Type': content_type} if content_type else {}
+        client.request(method, path, body=body, headers=headers)
+        response = client.getresponse()
+        response.read()
+        return response.status
+
+    def close(self):
+        self.server.shutdown()
+
+
+def run_scenario(transport, make_request, requests, concurrency):
+    """
+    Send requests from concurrent clients and time each one
+
+    Returns:
+        dict: Summary with latency percentiles, throughput and error count
+    """
+    samples = []
+    errors = [0]
+    lock = threading.Lock()
+    remaining = iter(range(requests))
+
+    def worker():
+        client = transport.client()
+        local = []
+        local_errors = 0
+        while True:
+            with lock:
+                if next(remaining, None) is None:
+                    break
+                request = make_request()
+            start = time.perf_counter()
+            try:
+                status = transport.send(client, *request)
+            except Exception:
+                status = None
+                client = transport.client()
+            local.append(time.perf_counter() - start)
+            if status is None or status >= 400:
+                local_errors += 1
+        with lock:
+            samples.extend(local)
+            errors[0] += local_errors
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return summarize(samples, time.perf_counter() - started, errors[0])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Load test the API endpoints with offline speech engines')
+    parser.add_argument('--transport', choices=('test-client', 'http'), default='test-client')
+    parser.add_argument('--scenarios', nargs='+', help='scenarios to run, all by default')
+    parser.add_argument('--requests', type=int, default=300, help='requests per scenario')
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--warmup', type=int, default=20, help='untimed requests per scenario')
+    parser.add_argument('--seed', type=int, default=1606)
+    parser.add_argument('--save', nargs='?', const='', default=None, metavar='PATH',
+                        help='write a JSON baseline, to benchmarks/results by default')
+    args = parser.parse_args(argv)
+
+    scratch_environment()
+    from app import app, activity_sink
+    from seed_database import seed_database
+
+    with app.app_context():
+        seed_database()
+
+    rng = random.Random(args.seed)
+    available = scenarios(rng, silent_wav())
+    names = args.scenarios or list(available)
+    unknown = [name for name in names if name not in available]
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)}")
+
+    transport = TestClientTransport(app) if args.transport == 'test-client' else HTTPTransport(app)
+    results = {}
+    try:
+        for name in names:
+            if args.warmup:
+                run_scenario(transport, available[name], args.warmup, 1)
+            results[f"{args.transport}.{name}[c={args.concurrency}]"] = run_scenario(
+                transport, available[name], args.requests, args.concurrency)
+    finally:
+        transport.close()
+        activity_sink.flush(5)
+
+    print_table(results)
+    if args.save is not None:
+        print(f"Saved {save_results('load', results, args.save or None)}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,99 @@
+"""
+Micro-benchmarks of the request building blocks: the NLP pipeline, video
+catalog and phrase lookups, fuzzy suggestions and vocabulary queries at scaled
+table sizes. Runs against a scratch database:
+
+    python -m benchmarks.micro --sizes 1000 10000 --save
+    python -m benchmarks.compare benchmarks/results/micro-abc1234.json benchmarks/results/micro-def5678.json
+"""
+import sys
+import random
+import argparse
+
+from benchmarks.harness import scratch_environment, measure, print_table, save_results
+
+SENTENCES = [
+    "Hello, my name is Sam and I am learning sign language",
+    "Thank you for helping me study today",
+    "How are you doing this morning?",
+    "They walked home after college to wash their hands",
+    "Computers are changing how we talk and learn",
+]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Micro-benchmark the translation building blocks')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000],
+                        help='vocabulary table sizes for the database cases')
+    parser.add_argument('--iterations', type=int, default=500)
+    parser.add_argument('--seed', type=int, default=1606)
+    parser.add_argument('--save', nargs='?', const='', default=None, metavar='PATH',
+                        help='write a JSON baseline, to benchmarks/results by default')
+    args = parser.parse_args(argv)
+
+    scratch_environment()
+    from sqlalchemy import insert
+    from app import app, db, sign_catalog, fuzzy_matcher
+    from models import SignLanguageEntry, normalize_word
+    from utils import (process_text, process_words, configure_text_caches, find_sign_phrases,
+                       sign_video_catalog)
+
+    rng = random.Random(args.seed)
+    iterations = args.iterations
+    results = {}
+
+    with app.app_context():
+        catalog = sign_video_catalog()
+        titles = [title for title, _ in catalog.entries()]
+        sentence_words = [sentence.split() for sentence in SENTENCES]
+
+        # NLP pipeline, with and without the text caches
+        texts = iter(rng.choice(SENTENCES) for _ in range(iterations * 4))
+        configure_text_caches(text_cache_size=0, lemma_cache_size=0)
+        results['process_text.uncached'] = measure(lambda: process_text(next(texts)), iterations, warmup=5)
+        configure_text_caches(text_cache_size=4096, lemma_cache_size=16384)
+        results['process_text.cached'] = measure(lambda: process_text(next(texts)), iterations, warmup=20)
+        results['process_words.sentence'] = measure(
+            lambda: process_words(rng.choice(sentence_words)), iterations)
+
+        # In-memory catalog lookups
+        results['video_catalog.lookup'] = measure(
+            lambda: catalog.lookup(rng.choice(titles).lower()), iterations * 10)
+        processed = [[p[0] if p else None for p in process_words(words)] for words in sentence_words]
+        results['phrase_matcher.segment'] = measure(lambda: find_sign_phrases(rng.choice(processed)), iterations)
+
+        count = 0
+        for size in sorted(args.sizes):
+            rows = [{'word': f"Word{i}", 'word_normalized': f"word{i}", 'category': f"Category{i % 50}"}
+                    for i in range(count, size)]
+            for start in range(0, len(rows), 10000):
+                db.session.execute(insert(SignLanguageEntry), rows[start:start + 10000])
+            db.session.commit()
+            count = size
+
+            def lookup():
+                word = normalize_word(f"WORD{rng.randrange(size)}")
+                SignLanguageEntry.query.filter(SignLanguageEntry.word_normalized == word).first()
+
+            def reload():
+                sign_catalog.invalidate()
+                sign_catalog.get()
+
+            results[f"db.word_lookup[{size}]"] = measure(lookup, iterations)
+            results[f"sign_catalog.reload[{size}]"] = measure(reload, max(5, iterations // 50), warmup=1)
+            results[f"sign_catalog.get[{size}]"] = measure(sign_catalog.get, iterations * 10)
+
+            queries = [f"wrd{rng.randrange(size)}" for _ in range(iterations)]
+            fuzzy_matcher.suggest('warmup', catalog)
+            query_iter = iter(queries * 2)
+            results[f"fuzzy.suggest[{size}]"] = measure(
+                lambda: fuzzy_matcher.suggest(next(query_iter), catalog), iterations, warmup=1)
+
+    print_table(results)
+    if args.save is not None:
+        print(f"Saved {save_results('micro', results, args.save or None)}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,147 @@
+"""
+Benchmark read throughput of several worker processes while another process
+keeps committing activity rows, with SQLite's default rollback journal and with
+the WAL, pragma and read-only pool setup from sqlite_tuning:
+
+    python -m benchmarks.sqlite_concurrency --readers 4 --seconds 5
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+import multiprocessing
+
+from sqlalchemy import create_engine, text
+
+from benchmarks.harness import summarize, print_table
+from sqlite_tuning import CONNECTION_PRAGMAS, install_pragmas, enable_wal, create_read_engine
+
+LOOKUP = text("SELECT id, word, video_path FROM sign_language_entry WHERE word_normalized = :word")
+INSERT = text("INSERT INTO session_activity (session_id, word_searched, timestamp) "
+              "VALUES (:session_id, :word, CURRENT_TIMESTAMP)")
+
+
+def prepare_database(path, size, tuned):
+    """Create and fill a scratch database like the app's vocabulary and activity tables"""
+    engine = create_engine(f"sqlite:///{path}")
+    if tuned:
+        install_pragmas(engine, CONNECTION_PRAGMAS)
+        enable_wal(engine)
+    with engine.begin() as connection:
+        connection.execute(text(
+            "CREATE TABLE sign_language_entry (id INTEGER PRIMARY KEY, word VARCHAR(100), "
+            "word_normalized VARCHAR(100), category VARCHAR(50), video_path VARCHAR(255))"))
+        connection.execute(text("CREATE INDEX ix_word_normalized ON sign_language_entry (word_normalized)"))
+        connection.execute(text(
+            "CREATE TABLE session_activity (id INTEGER PRIMARY KEY, session_id VARCHAR(100), "
+            "word_searched VARCHAR(100), timestamp DATETIME)"))
+        connection.execute(
+            text("INSERT INTO sign_language_entry (word, word_normalized, category) VALUES (:w, :n, :c)"),
+            [{'w': f"Word{i}", 'n': f"word{i}", 'c': f"Category{i % 50}"} for i in range(size)])
+    engine.dispose()
+
+
+def reader(path, tuned, size, seconds, start_at, results):
+    """Run indexed lookups until the time is up, recording each latency"""
+    if tuned:
+        engine = create_read_engine(create_engine(f"sqlite:///{path}").url, pool_size=1)
+    else:
+        engine = create_engine(f"sqlite:///{path}")
+    rng = random.Random(os.getpid())
+    samples = []
+    errors = 0
+    with engine.connect() as connection:
+        while time.time() < start_at:
+            time.sleep(0.001)
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                connection.execute(LOOKUP, {'word': f"word{rng.randrange(size)}"}).fetchall()
+                connection.commit()
+            except Exception:
+                errors += 1
+                connection.rollback()
+            samples.append(time.perf_counter() - start)
+    results.put((samples, errors))
+
+
+def writer(path, tuned, seconds, start_at, results):
+    """Commit one activity row at a time, like a request that logs its search"""
+    engine = create_engine(f"sqlite:///{path}")
+    if tuned:
+        install_pragmas(engine, CONNECTION_PRAGMAS)
+    commits = 0
+    errors = 0
+    with engine.connect() as connection:
+        while time.time() < start_at:
+            time.sleep(0.001)
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            try:
+                connection.execute(INSERT, {'session_id': 'bench', 'word': 'hello'})
+                connection.commit()
+                commits += 1
+            except Exception:
+                errors += 1
+                connection.rollback()
+    results.put((commits, errors))
+
+
+def run(mode, readers, seconds, size, with_writer):
+    """Run one configuration and summarize the reads"""
+    tuned = mode == 'tuned'
+    path = os.path.join(tempfile.mkdtemp(prefix='sign-sqlite-'), 'bench.db')
+    prepare_database(path, size, tuned)
+
+    context = multiprocessing.get_context('spawn')
+    read_results = context.Queue()
+    write_results = context.Queue()
+    start_at = time.time() + 2.0
+    processes = [context.Process(target=reader, args=(path, tuned, size, seconds, start_at, read_results))
+                 for _ in range(readers)]
+    if with_writer:
+        processes.append(context.Process(target=writer, args=(path, tuned, seconds, start_at, write_results)))
+    for process in processes:
+        process.start()
+
+    samples = []
+    errors = 0
+    for _ in range(readers):
+        worker_samples, worker_errors = read_results.get()
+        samples.extend(worker_samples)
+        errors += worker_errors
+    commits = write_results.get() if with_writer else (0, 0)
+    for process in processes:
+        process.join()
+
+    summary = summarize(samples, seconds, errors)
+    summary['writer_commits'], summary['writer_errors'] = commits
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark SQLite reads under concurrent activity logging')
+    parser.add_argument('--readers', type=int, default=4, help='reader processes, like gunicorn workers')
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--size', type=int, default=10000, help='vocabulary rows')
+    args = parser.parse_args(argv)
+
+    results = {}
+    for mode in ('default', 'tuned'):
+        for with_writer in (False, True):
+            case = f"{mode}.{'with' if with_writer else 'without'}_writer[r={args.readers}]"
+            results[case] = run(mode, args.readers, args.seconds, args.size, with_writer)
+
+    print_table(results)
+    for case, summary in results.items():
+        if summary['writer_commits'] or summary['writer_errors']:
+            print(f"{case}: writer committed {summary['writer_commits']} rows "
+                  f"({summary['writer_errors']} errors)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,137 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+from request_metrics import stage
+
+
+class PoolSaturated(Exception):
+    """Raised when the pool already has as many calls as it accepts"""
+
+
+class EngineTimeout(Exception):
+    """Raised when a call doesn't finish within its timeout"""
+
+
+class EnginePool:
+    """
+    Bounded thread pool for blocking calls to external speech engines.
+
+    At most max_workers calls run at once and at most max_queue more wait for a
+    worker. Calls beyond that are rejected immediately so requests can fail fast
+    instead of piling up behind slow engines. A call that times out keeps its slot
+    until the engine returns, so a hung engine can't push the pool past its bound.
+    """
+
+    def __init__(self, name, max_workers=4, max_queue=8, timeout=15.0):
+        """
+        Initialize the pool
+
+        Args:
+            name (str): Name used for the worker threads and in logs
+            max_workers (int): Maximum number of calls running at once
+            max_queue (int): Maximum number of calls waiting for a worker
+            timeout (float): Default seconds to wait for a call to finish
+        """
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue)
+        self._lock = threading.Lock()
+
+        self.in_flight = 0
+        self.running = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.timeouts = 0
+
+    def run(self, fn, *args, timeout=None, **kwargs):
+        """
+        Run a blocking call on the pool and wait for its result
+
+        Args:
+            fn (callable): Function to call
+            *args: Positional arguments for the function
+            timeout (float): Seconds to wait, defaults to the pool timeout
+            **kwargs: Keyword arguments for the function
+
+        Returns:
+            The function's return value
+
+        Raises:
+            PoolSaturated: If the pool has no free slot
+            EngineTimeout: If the call doesn't finish in time
+        """
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise PoolSaturated(f"{self.name} pool is saturated")
+
+        with self._lock:
+            self.in_flight += 1
+            self.submitted += 1
+
+        try:
+            future = self._executor.submit(self._call, fn, args, kwargs)
+        except Exception:
+            self._release(failed=True)
+            raise
+
+        try:
+            with stage('engine'):
+                return future.result(timeout=self.timeout if timeout is None else timeout)
+        except FutureTimeoutError:
+            with self._lock:
+                self.timeouts += 1
+            logging.error(f"{self.name} call timed out")
+            raise EngineTimeout(f"{self.name} engine timed out")
+
+    def _call(self, fn, args, kwargs):
+        """Run a call on a worker thread, releasing its slot when it finishes"""
+        with self._lock:
+            self.running += 1
+        failed = True
+        try:
+            result = fn(*args, **kwargs)
+            failed = False
+            return result
+        finally:
+            with self._lock:
+                self.running -= 1
+            self._release(failed)
+
+    def _release(self, failed):
+        """Free a slot and count the call as completed or failed"""
+        with self._lock:
+            self.in_flight -= 1
+            if failed:
+                self.failed += 1
+            else:
+                self.completed += 1
+        self._slots.release()
+
+    def stats(self):
+        """
+        Get utilization counters for the pool
+
+        Returns:
+            dict: Current load and totals of submitted, completed, failed, rejected and timed out calls
+        """
+        with self._lock:
+            return {
+                'max_workers': self.max_workers,
+                'max_queue': self.max_queue,
+                'running': self.running,
+                'queued': self.in_flight - self.running,
+                'utilization': self.running / self.max_workers,
+                'submitted': self.submitted,
+                'completed': self.completed,
+                'failed': self.failed,
+                'rejected': self.rejected,
+                'timeouts': self.timeouts,
+            }
@@ -0,0 +1,358 @@
+import threading
+
+# Number of the longest posting lists left out of the bigram count per query
+MAX_SKIPPED_POSTINGS = 2
+
+# Suffixes stripped to find the base form of inflected words, longest first
+SUFFIXES = ('ing', 'ies', 'ed', 'es', 'er', 'ly', 's')
+
+
+def levenshtein(a, b, max_distance=None):
+    """
+    Compute the edit distance between two strings
+
+    Args:
+        a (str): First string
+        b (str): Second string
+        max_distance (int): Stop early and return max_distance + 1 once the
+                            distance is known to exceed this
+
+    Returns:
+        int: Number of single character insertions, deletions and substitutions
+    """
+    if len(a) < len(b):
+        a, b = b, a
+    if max_distance is not None and len(a) - len(b) > max_distance:
+        return max_distance + 1
+
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (char_a != char_b),
+            ))
+        if max_distance is not None and min(current) > max_distance:
+            return max_distance + 1
+        previous = current
+    return previous[-1]
+
+
+def pattern_masks(pattern):
+    """
+    Precompute the character bitmasks of a pattern for bounded_levenshtein
+
+    Args:
+        pattern (str): Word compared against many others
+
+    Returns:
+        dict: Bitmask of the positions of each character in the pattern
+    """
+    masks = {}
+    for i, char in enumerate(pattern):
+        masks[char] = masks.get(char, 0) | (1 << i)
+    return masks
+
+
+def bounded_levenshtein(pattern, masks, text, max_distance):
+    """
+    Compute the edit distance between a pattern and a text, up to a limit
+
+    Uses Myers' bit-parallel algorithm, which updates a whole column of the
+    edit distance matrix with a handful of integer operations per character,
+    and stops as soon as the distance can no longer come within the limit.
+
+    Args:
+        pattern (str): First string
+        masks (dict): pattern_masks(pattern)
+        text (str): Second string
+        max_distance (int): Largest distance of interest
+
+    Returns:
+        int: The edit distance, or max_distance + 1 if it exceeds max_distance
+    """
+    m = len(pattern)
+    n = len(text)
+    if abs(m - n) > max_distance:
+        return max_distance + 1
+    if m == 0:
+        return n
+
+    full = (1 << m) - 1
+    last = 1 << (m - 1)
+    positive, negative = full, 0
+    score = m
+    for position, char in enumerate(text, 1):
+        eq = masks.get(char, 0)
+        xv = eq | negative
+        xh = (((eq & positive) + positive) ^ positive) | eq
+        horizontal_positive = negative | (~(xh | positive) & full)
+        horizontal_negative = positive & xh
+        if horizontal_positive & last:
+            score += 1
+        elif horizontal_negative & last:
+            score -= 1
+        # Each remaining character can lower the distance by at most one
+        if score - (n - position) > max_distance:
+            return max_distance + 1
+        horizontal_positive = ((horizontal_positive << 1) | 1) & full
+        horizontal_negative = (horizontal_negative << 1) & full
+        positive = horizontal_negative | (~(xv | horizontal_positive) & full)
+        negative = horizontal_positive & xv
+    return score if score <= max_distance else max_distance + 1
+
+
+def stem_candidates(word):
+    """
+    Guess base forms of an inflected word by stripping common suffixes
+
+    Args:
+        word (str): Lowercased word
+
+    Returns:
+        list: Possible base forms, e.g. "studies" gives "study" and "studi"
+    """
+    candidates = []
+    for suffix in SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 2:
+            stem = word[:-len(suffix)]
+            candidates.append(stem)
+            if suffix == 'ies':
+                candidates.append(stem + 'y')
+            elif suffix in ('ing', 'ed', 'er'):
+                # "making" -> "make", "running" -> "run"
+                candidates.append(stem + 'e')
+                if len(stem) > 2 and stem[-1] == stem[-2]:
+                    candidates.append(stem[:-1])
+    return candidates
+
+
+def bigrams(word):
+    """
+    Split a word into bigrams, padded at both ends and numbered per repeat
+
+    Numbering repeated bigrams makes set intersection count shared bigrams the
+    way a multiset would, which the count filter below relies on.
+
+    Args:
+        word (str): Word to split
+
+    Returns:
+        set: (bigram, occurrence) pairs
+    """
+    padded = f"^{word}$"
+    seen = {}
+    grams = set()
+    for i in range(len(padded) - 1):
+        gram = padded[i:i + 2]
+        occurrence = seen.get(gram, 0)
+        seen[gram] = occurrence + 1
+        grams.add((gram, occurrence))
+    return grams
+
+
+def allowed_distance(query, max_distance):
+    """
+    Scale the edit distance accepted for a query with its length
+
+    Short words have too few letters for a typo to leave them recognizable,
+    and too few bigrams for the index's count filter, which would otherwise
+    fall back to comparing every word of similar length.
+
+    Args:
+        query (str): Word being searched for
+        max_distance (int): Largest edit distance accepted for long words
+
+    Returns:
+        int: 0 for words of up to 2 characters, at most 1 up to 5, max_distance beyond
+    """
+    if len(query) <= 2:
+        return 0
+    if len(query) <= 5:
+        return min(1, max_distance)
+    return max_distance
+
+
+class NGramIndex:
+    """
+    Bigram index for finding words within an edit distance of a query.
+
+    Each edit changes at most two bigrams, so a word within distance k of the
+    query shares at least max(len(query), len(word)) + 1 - 2k of its bigrams.
+    Only words passing
+    that count filter are checked with an exact edit distance. Postings are
+    split by word length, so words too long or short to be within the distance
+    are never counted.
+    """
+
+    def __init__(self):
+        self.words = []
+        self.postings = {}
+        self.by_length = {}
+
+    def add(self, word):
+        """
+        Add a word to the index
+
+        Args:
+            word (str): Word to add
+        """
+        word_id = len(self.words)
+        self.words.append(word)
+        self.by_length.setdefault(len(word), []).append(word_id)
+        for gram in bigrams(word):
+            self.postings.setdefault(gram, {}).setdefault(len(word), []).append(word_id)
+
+    def __len__(self):
+        return len(self.words)
+
+    def _candidates(self, query, max_distance):
+        """Get the ids of words that can be within the edit distance of the query"""
+        length = len(query)
+        threshold = length + 1 - 2 * max_distance
+        if threshold <= 0:
+            # Too short for the count filter, fall back to words of similar length
+            return [
+                word_id
+                for size in range(max(0, length - max_distance), length + max_distance + 1)
+                for word_id in self.by_length.get(size, ())
+            ]
+
+        grams = [self.postings[gram] for gram in bigrams(query) if gram in self.postings]
+        candidates = []
+        for size in range(max(0, length - max_distance), length + max_distance + 1):
+            # Longer words must share more bigrams
+            size_threshold = max(length, size) + 1 - 2 * max_distance
+            postings = sorted((by_size[size] for by_size in grams if size in by_size), key=len)
+            # Leave out the longest lists, usually common bigrams like "^s", and
+            # lower the threshold to match. This keeps every word that can pass
+            # the full filter and the exact distance check drops the rest
+            skipped = min(MAX_SKIPPED_POSTINGS, size_threshold - 1, len(postings))
+            counts = {}
+            for word_ids in postings[:len(postings) - skipped]:
+                for word_id in word_ids:
+                    counts[word_id] = counts.get(word_id, 0) + 1
+            required = size_threshold - skipped
+            candidates.extend(word_id for word_id, count in counts.items() if count >= required)
+        return candidates
+
+    def search(self, query, max_distance):
+        """
+        Find every word within an edit distance of the query
+
+        Args:
+            query (str): Word to search for
+            max_distance (int): Largest edit distance to accept
+
+        Returns:
+            list: (distance, word) pairs, closest first
+        """
+        results = []
+        masks = pattern_masks(query)
+        for word_id in self._candidates(query, max_distance):
+            word = self.words[word_id]
+            distance = bounded_levenshtein(query, masks, word, max_distance)
+            if distance <= max_distance:
+                results.append((distance, word))
+        results.sort()
+        return results
+
+
+class FuzzyMatcher:
+    """
+    Suggests signs for words that have no exact match.
+
+    Words from the video catalog and the vocabulary table are indexed by their
+    bigrams, so near misses like "helo" are found without scanning the whole
+    vocabulary. Inflected forms like "studying" are also tried against the
+    index with their suffixes stripped. The index is rebuilt when either
+    source changes.
+    """
+
+    def __init__(self, sign_catalog, max_distance=2, limit=5):
+        """
+        Initialize the matcher
+
+        Args:
+            sign_catalog (SignCatalogService): Source of vocabulary entries
+            max_distance (int): Largest edit distance suggested for words longer
+                                than 5 characters, shorter words accept less
+            limit (int): Maximum number of suggestions returned
+        """
+        self.sign_catalog = sign_catalog
+        self.max_distance = max_distance
+        self.limit = limit
+        self._lock = threading.Lock()
+        self._state = (NGramIndex(), {})
+        self._version = None
+
+    def _build(self, video_catalog, snapshot, version):
+        """Index the words of every video and vocabulary entry"""
+        terms = {}
+        for title, (video_path, video_title) in video_catalog.entries():
+            terms.setdefault(title.lower(), {
+                'word': title,
+                'video_path': video_path,
+                'video_title': video_title,
+                'source': 'video',
+            })
+        for entry in snapshot.entries:
+            terms.setdefault(entry.word.lower(), {
+                'word': entry.word,
+                'video_path': entry.video_path,
+                'video_title': entry.word,
+                'source': 'vocabulary',
+            })
+
+        index = NGramIndex()
+        for term in terms:
+            index.add(term)
+
+        # Swap both together so concurrent readers never mix old and new data
+        self._state = (index, terms)
+        self._version = version
+
+    def _index(self, video_catalog):
+        """Get the bigram index, rebuilding it if a source has changed"""
+        video_catalog.refresh_if_stale()
+        snapshot = self.sign_catalog.get()
+        version = (id(video_catalog), video_catalog.reloads, snapshot.version)
+        if self._version != version:
+            with self._lock:
+                if self._version != version:
+                    self._build(video_catalog, snapshot, version)
+        return self._state
+
+    def suggest(self, word, video_catalog):
+        """
+        Rank the indexed signs closest to a word
+
+        Args:
+            word (str): Word without an exact match
+            video_catalog (VideoCatalog): Catalog providing the videos
+
+        Returns:
+            list: Suggestion dicts with word, video_path, video_title, source and
+                  distance, closest first and signs with videos before others
+        """
+        if not word:
+            return []
+        index, terms = self._index(video_catalog)
+        query = word.lower()
+
+        scored = {}
+        for distance, term in index.search(query, allowed_distance(query, self.max_distance)):
+            scored[term] = distance
+        # A matching base form is a better suggestion than any misspelling
+        for stem in stem_candidates(query):
+            if stem in terms:
+                scored[stem] = min(scored.get(stem, 1), 0.5)
+        scored.pop(query, None)
+
+        ranked = sorted(
+            scored.items(),
+            key=lambda item: (item[1], terms[item[0]]['video_path'] is None, abs(len(item[0]) - len(query)), item[0])
+        )
+        return [dict(terms[term], distance=distance) for term, distance in ranked[:self.limit]]
@@ -0,0 +1,45 @@
+# Gunicorn picks this file up automatically from the working directory
+import os
+
+# Load the app once in the master so every worker shares it copy-on-write
+preload_app = True
+
+
+def on_starting(server):
+    """Load the NLTK models and build the static bundles before workers are forked"""
+    from nlp_resources import warmup, load_times
+
+    if warmup():
+        server.log.info(f"Loaded NLTK models in {load_times['total'] * 1000:.1f} ms")
+    else:
+        server.log.warning("NLTK resources are missing, run 'python nlp_resources.py verify'")
+
+    # Rebuild the static bundles so a deploy never serves stale ones. The
+    # previous builds stay on disk for pages cached before the deploy.
+    from assets import build, KEEP_BUILDS
+    try:
+        manifest = build(keep_builds=int(os.environ.get("ASSET_KEEP_BUILDS", KEEP_BUILDS)))
+        server.log.info(f"Built {len(manifest)} static bundles")
+    except Exception as e:
+        server.log.error(f"Error building static bundles, serving source files: {str(e)}")
+
+
+def post_fork(server, worker):
+    """
+    Drop the database connections the master opened while loading the app
+
+    SQLite handles must never be shared across a fork, so each worker opens
+    its own connections on first use. close=False leaves the master's
+    connections alone instead of closing them from the child.
+    """
+    from app import app, db, read_write_db
+
+    with app.app_context():
+        db.engine.dispose(close=False)
+    if read_write_db.read_engine is not None:
+        read_write_db.read_engine.dispose(close=False)
+
+# Threaded workers keep cheap lookups responsive while other threads wait on the
+# bounded speech engine pool
+worker_class = "gthread"
+threads = 8
@@ -1,15 +1,31 @@
 from datetime import datetime
+from sqlalchemy.orm import validates
 from app import db
 
+def normalize_word(word):
+    """Normalize a word for case-insensitive lookups"""
+    return word.strip().lower() if word else word
+
+def _default_word_normalized(context):
+    """Fill word_normalized on inserts, including bulk inserts that bypass the ORM"""
+    return normalize_word(context.get_current_parameters().get('word'))
+
 class SignLanguageEntry(db.Model):
     """Sign language entry model for storing sign language vocabulary"""
     id = db.Column(db.Integer, primary_key=True)
     word = db.Column(db.String(100), nullable=False)
+    word_normalized = db.Column(db.String(100), nullable=True, index=True, default=_default_word_normalized)  # Lowercased word for indexed lookups
     category = db.Column(db.String(50), nullable=True)
     difficulty = db.Column(db.String(20), default='beginner')  # beginner, intermediate, advanced
     video_path = db.Column(db.String(255), nullable=True)      # Path to the sign language video if available
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    @validates('word')
+    def _set_word_normalized(self, key, word):
+        """Keep the normalized lookup column in sync when the word changes"""
+        self.word_normalized = normalize_word(word)
+        return word
+    
     def __repr__(self):
         """Return string representation of the model"""
         return f"<SignLanguageEntry {self.word}>"
@@ -21,8 +37,68 @@ class SessionActivity(db.Model):
     word_searched = db.Column(db.String(100), nullable=True)
     text_to_speech_used = db.Column(db.Boolean, default=False)
     speech_to_text_used = db.Column(db.Boolean, default=False)
-    timestamp = db.Column(db.DateTime, default=datetime.utcnow)
+    timestamp = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    
+    __table_args__ = (
+        db.Index('ix_session_activity_session_id_timestamp', 'session_id', 'timestamp'),
+        db.Index('ix_session_activity_word_searched_timestamp', 'word_searched', 'timestamp'),
+    )
+    
+    def __repr__(self):
+        """Return string representation of the model"""
+        return f"<SessionActivity {self.id}>"
+
+
+class ReviewCard(db.Model):
+    """Spaced repetition card tracking one learner's progress on one sign"""
+    id = db.Column(db.Integer, primary_key=True)
+    session_id = db.Column(db.String(100), nullable=False)  # Learner's session identifier
+    category = db.Column(db.String(50), nullable=False, default='')
+    word = db.Column(db.String(100), nullable=False)
+    ease_factor = db.Column(db.Float, nullable=False, default=2.5)
+    interval_days = db.Column(db.Integer, nullable=False, default=0)  # Current interval in days
+    repetitions = db.Column(db.Integer, nullable=False, default=0)  # Number of correct repetitions in a row
+    due_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    last_reviewed_at = db.Column(db.DateTime, nullable=True)
+    
+    __table_args__ = (
+        db.UniqueConstraint('session_id', 'category', 'word', name='uq_review_card_session_category_word'),
+        # Due cards for a learner are read straight off this index in due order
+        db.Index('ix_review_card_session_id_due_at', 'session_id', 'due_at'),
+    )
+    
+    def to_dict(self):
+        """Return the card as a JSON-serializable dict"""
+        return {
+            'category': self.category,
+            'word': self.word,
+            'easeFactor': self.ease_factor,
+            'interval': self.interval_days,
+            'repetitions': self.repetitions,
+            'dueDate': self.due_at.isoformat() + 'Z',
+            'lastReviewed': self.last_reviewed_at.isoformat() + 'Z' if self.last_reviewed_at else None,
+        }
+    
+    def __repr__(self):
+        """Return string representation of the model"""
+        return f"<ReviewCard {self.category}-{self.word}>"
+
+class ActivityRollup(db.Model):
+    """Pre-aggregated activity counts per time bucket, with word '' holding the feature totals"""
+    id = db.Column(db.Integer, primary_key=True)
+    granularity = db.Column(db.String(10), nullable=False)  # hour, day or total
+    bucket_start = db.Column(db.DateTime, nullable=False)
+    word = db.Column(db.String(100), nullable=False, default='')
+    searches = db.Column(db.Integer, nullable=False, default=0)
+    text_to_speech_uses = db.Column(db.Integer, nullable=False, default=0)
+    speech_to_text_uses = db.Column(db.Integer, nullable=False, default=0)
+    
+    __table_args__ = (
+        db.UniqueConstraint('granularity', 'bucket_start', 'word', name='uq_activity_rollup_bucket_word'),
+        # Most searched words are read straight off this index
+        db.Index('ix_activity_rollup_bucket_searches', 'granularity', 'bucket_start', 'searches'),
+    )
     
     def __repr__(self):
         """Return string representation of the model"""
-        return f"<SessionActivity {self.id}>"
\ No newline at end of file
+        return f"<ActivityRollup {self.granularity} {self.bucket_start} {self.word}>"
@@ -0,0 +1,173 @@
+"""
+Lazy loading of the NLTK models used by the text processing pipeline.
+
+Nothing is loaded or downloaded at import time. Models are loaded on first use,
+or up front by calling warmup() before gunicorn forks its workers so they share
+the loaded models copy-on-write. Missing resources are reported by the verify
+command instead of being downloaded while serving requests:
+
+    python nlp_resources.py verify
+    python nlp_resources.py download
+    python nlp_resources.py warmup --max-seconds 5
+"""
+import sys
+import time
+import logging
+import argparse
+import threading
+
+import nltk
+from nltk.stem import WordNetLemmatizer
+from nltk.tag.perceptron import PerceptronTagger
+
+# NLTK packages required by process_text, mapped to their data paths
+REQUIRED_RESOURCES = {
+    'punkt_tab': 'tokenizers/punkt_tab',
+    'averaged_perceptron_tagger_eng': 'taggers/averaged_perceptron_tagger_eng',
+    'wordnet': 'corpora/wordnet',
+}
+
+_lock = threading.Lock()
+_tagger = None
+_lemmatizer = None
+_load_error = None
+
+# Seconds spent loading each model, filled in as models are loaded
+load_times = {}
+
+
+def missing_resources():
+    """
+    Find the required NLTK resources that are not installed
+
+    Returns:
+        list: Names of the missing NLTK packages
+    """
+    missing = []
+    for name, path in REQUIRED_RESOURCES.items():
+        try:
+            nltk.data.find(path)
+        except LookupError:
+            missing.append(name)
+    return missing
+
+
+def _load():
+    """Load the tagger and lemmatizer, remembering a failure so it isn't retried per request"""
+    global _tagger, _lemmatizer, _load_error
+    with _lock:
+        if _tagger is not None or _load_error is not None:
+            return
+        try:
+            start = time.perf_counter()
+            tagger = PerceptronTagger()
+            load_times['tagger'] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            lemmatizer = WordNetLemmatizer()
+            # WordNet is loaded lazily by NLTK, force it in now
+            lemmatizer.lemmatize('warming')
+            load_times['lemmatizer'] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            nltk.word_tokenize('Warm up the tokenizer.')
+            load_times['tokenizer'] = time.perf_counter() - start
+        except LookupError as e:
+            _load_error = LookupError(
+                f"NLTK resources are missing ({', '.join(missing_resources()) or e}); "
+                f"run 'python nlp_resources.py download'"
+            )
+            logging.error(str(_load_error))
+            return
+
+        _tagger = tagger
+        _lemmatizer = lemmatizer
+
+
+def _ensure_loaded():
+    """Load the models on first use, raising LookupError if they are unavailable"""
+    if _tagger is None:
+        _load()
+        if _load_error is not None:
+            raise _load_error
+
+
+def get_tagger():
+    """
+    Get the shared perceptron POS tagger, loading it on first use
+
+    Returns:
+        PerceptronTagger: The English POS tagger
+    """
+    _ensure_loaded()
+    return _tagger
+
+
+def get_lemmatizer():
+    """
+    Get the shared WordNet lemmatizer, loading WordNet on first use
+
+    Returns:
+        WordNetLemmatizer: The lemmatizer
+    """
+    _ensure_loaded()
+    return _lemmatizer
+
+
+def warmup():
+    """
+    Load every model up front, e.g. in the gunicorn master before workers fork
+
+    Returns:
+        bool: True if all models were loaded, False if resources are missing
+    """
+    start = time.perf_counter()
+    _load()
+    load_times['total'] = time.perf_counter() - start
+    return _load_error is None
+
+
+def reset():
+    """Forget loaded models and previous failures so the next use loads them again"""
+    global _tagger, _lemmatizer, _load_error
+    with _lock:
+        _tagger = None
+        _lemmatizer = None
+        _load_error = None
+        load_times.clear()
+
+
+def main(argv=None):
+    """Command line entry point for verifying, downloading and warming NLTK resources"""
+    parser = argparse.ArgumentParser(description='Manage the NLTK resources used for text processing')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('verify', help='report missing NLTK resources')
+    subparsers.add_parser('download', help='download missing NLTK resources')
+    warmup_parser = subparsers.add_parser('warmup', help='load every model and report load times')
+    warmup_parser.add_argument('--max-seconds', type=float, default=None,
+                               help='fail if loading takes longer than this')
+    args = parser.parse_args(argv)
+
+    if args.command == 'download':
+        for name in missing_resources():
+            nltk.download(name)
+
+    missing = missing_resources()
+    if missing:
+        print(f"Missing NLTK resources: {', '.join(missing)}")
+        return 1
+    print('All NLTK resources are installed.')
+
+    if args.command == 'warmup':
+        if not warmup():
+            return 1
+        for name, seconds in load_times.items():
+            print(f"{name}: {seconds * 1000:.1f} ms")
+        if args.max_seconds is not None and load_times['total'] > args.max_seconds:
+            print(f"Startup took {load_times['total']:.2f}s, more than the allowed {args.max_seconds:.2f}s")
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,204 @@
+import logging
+import threading
+
+
+class PhraseTrie:
+    """Token trie mapping word sequences to sign videos"""
+
+    def __init__(self):
+        self.root = {}
+
+    def insert(self, tokens, video):
+        """
+        Add a phrase to the trie, keeping the first video inserted for a phrase
+
+        Args:
+            tokens (list): Lowercased words of the phrase
+            video (tuple): (path, title) of the video for the phrase
+        """
+        if not tokens:
+            return
+        node = self.root
+        for token in tokens:
+            node = node.setdefault(token, {})
+        node.setdefault(None, video)
+
+    def matches(self, tokens, start):
+        """
+        Find every phrase in the trie that starts at a position
+
+        Args:
+            tokens (list): Lowercased words to match against
+            start (int): Index of the first word to match
+
+        Yields:
+            tuple: (end, video) for each phrase covering tokens[start:end]
+        """
+        node = self.root
+        for end in range(start, len(tokens)):
+            token = tokens[end]
+            if token is None:
+                return
+            node = node.get(token)
+            if node is None:
+                return
+            if None in node:
+                yield end + 1, node[None]
+
+
+class PhraseMatcher:
+    """
+    Segments sentences into the fewest sign clips available in a video catalog.
+
+    Every clip title is indexed in a token trie both as written and in its
+    lemmatized form, so "Thank You" and "Does Not" match processed input. Because
+    phrases are at most a few words long the segmentation is linear in the length
+    of the sentence.
+    """
+
+    def __init__(self, catalog, normalize=None):
+        """
+        Initialize the matcher
+
+        Args:
+            catalog (VideoCatalog): Catalog providing the clips
+            normalize (callable): Optional function mapping a list of titles to one
+                                  list of processed words per title
+        """
+        self.catalog = catalog
+        self.normalize = normalize
+        self._lock = threading.Lock()
+        self._trie = None
+        self._catalog_version = None
+
+    def _build(self):
+        """Rebuild the phrase trie from the catalog titles"""
+        version = self.catalog.reloads
+        entries = self.catalog.entries()
+        titles = [title for title, _ in entries]
+
+        normalized = []
+        if self.normalize:
+            try:
+                normalized = self.normalize(titles)
+            except Exception as e:
+                logging.error(f"Error normalizing video titles: {str(e)}")
+
+        trie = PhraseTrie()
+        for title, video in entries:
+            trie.insert(title.lower().split(), video)
+        for (title, video), tokens in zip(entries, normalized):
+            trie.insert([token.lower() for token in tokens], video)
+
+        self._trie = trie
+        self._catalog_version = version
+
+    def _get_trie(self):
+        """Get the phrase trie, rebuilding it if the catalog has been reloaded"""
+        self.catalog.refresh_if_stale()
+        if self._trie is None or self._catalog_version != self.catalog.reloads:
+            with self._lock:
+                if self._trie is None or self._catalog_version != self.catalog.reloads:
+                    self._build()
+        return self._trie
+
+    def segment(self, words):
+        """
+        Split processed words into the fewest catalog clips
+
+        Args:
+            words (list): Processed words, None entries are never matched
+
+        Returns:
+            list: Segments as dicts with start, end, video_path and video_title,
+                  where video_path is None for words that have no clip
+        """
+        trie = self._get_trie()
+        tokens = [word.lower() if word else None for word in words]
+        count = len(tokens)
+
+        # best[i] holds (clips needed for tokens[i:], end of first segment, video)
+        best = [None] * (count + 1)
+        best[count] = (0, count, None)
+        for start in range(count - 1, -1, -1):
+            # An unmatched word always costs one entry
+            choice = (best[start + 1][0] + 1, start + 1, None)
+            for end, video in trie.matches(tokens, start):
+                cost = best[end][0] + 1
+                # Prefer longer phrases when the clip count is the same
+                if cost < choice[0] or (cost == choice[0] and (choice[2] is None or end > choice[1])):
+                    choice = (cost, end, video)
+            best[start] = choice
+
+        segments = []
+        start = 0
+        hits = misses = 0
+        while start < count:
+            _, end, video = best[start]
+            video_path, video_title = video if video else (None, None)
+            if video:
+                hits += 1
+            elif tokens[start] is not None:
+                misses += 1
+            segments.append({
+                'start': start,
+                'end': end,
+                'video_path': video_path,
+                'video_title': video_title,
+            })
+            start = end
+        # Keep the catalog's hit rate meaningful, the trie bypasses lookup()
+        self.catalog.record(hits, misses)
+        return segments
+
+    def fingerspell(self, word):
+        """
+        Spell a word with the single character clips
+
+        The bundled video set only has clips for the digits 0-9, so numbers are
+        spelled out but words return an empty list until letter clips (A.mp4,
+        B.mp4, ...) are added to the video directory.
+
+        Args:
+            word (str): Word to spell
+
+        Returns:
+            list: (path, title) for each character, or an empty list if any
+                  character has no clip
+        """
+        if not word:
+            return []
+        clips = []
+        for char in word:
+            if not char.isalnum():
+                continue
+            video_path, video_title = self.catalog.lookup(char)
+            if not video_path:
+                return []
+            clips.append((video_path, video_title))
+        return clips
+
+
+_matchers = {}
+_matchers_lock = threading.Lock()
+
+
+def get_phrase_matcher(catalog, normalize=None):
+    """
+    Get the shared phrase matcher for a catalog, building it on first use
+
+    Args:
+        catalog (VideoCatalog): Catalog providing the clips
+        normalize (callable): Optional function mapping titles to processed words
+
+    Returns:
+        PhraseMatcher: The matcher for the catalog
+    """
+    matcher = _matchers.get(id(catalog))
+    if matcher is None:
+        with _matchers_lock:
+            matcher = _matchers.get(id(catalog))
+            if matcher is None:
+                matcher = PhraseMatcher(catalog, normalize)
+                _matchers[id(catalog)] = matcher
+    return matcher
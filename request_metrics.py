@@ -0,0 +1,268 @@
+import os
+import time
+import logging
+import cProfile
+import threading
+import itertools
+from contextlib import contextmanager
+from functools import wraps
+
+from flask import g, request, has_request_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Upper bounds of the latency histogram buckets, in seconds
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Upper bounds of the queries per request histogram buckets
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 25, 50, 100)
+
+
+class Histogram:
+    """Cumulative histogram with one series per label set, in Prometheus style"""
+
+    def __init__(self, name, help_text, label_names, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def observe(self, labels, value):
+        """
+        Record one observation
+
+        Args:
+            labels (tuple): Label values, in the order of label_names
+            value (float): Observed value
+        """
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * len(self.buckets), 0, 0.0]
+            counts = series[0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            series[1] += 1
+            series[2] += value
+
+    def render(self):
+        """
+        Format the histogram in the Prometheus text exposition format
+
+        Returns:
+            list: Lines of the exposition
+        """
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = [(labels, list(counts), count, total) for labels, (counts, count, total) in self._series.items()]
+        for labels, counts, count, total in sorted(series):
+            base = ','.join(f'{name}="{escape_label(value)}"' for name, value in zip(self.label_names, labels))
+            prefix = f"{base}," if base else ''
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f'{self.name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_bucket{{{prefix}le="+Inf"}} {count}')
+            lines.append(f"{self.name}_count{{{base}}} {count}")
+            lines.append(f"{self.name}_sum{{{base}}} {total:.6f}")
+        return lines
+
+
+def escape_label(value):
+    """Escape a label value for the Prometheus text format"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_gauges(prefix, stats):
+    """
+    Format a stats dict as Prometheus gauges, one per numeric value
+
+    Nested dicts become name suffixes, e.g. {'text': {'hits': 3}} with prefix
+    sign_text_cache gives sign_text_cache_text_hits 3.
+
+    Args:
+        prefix (str): Metric name prefix
+        stats (dict): Stats as returned by the components' stats() methods
+
+    Returns:
+        list: Lines of the exposition
+    """
+    lines = []
+    for key, value in stats.items():
+        name = f"{prefix}_{key}"
+        if isinstance(value, dict):
+            lines.extend(format_gauges(name, value))
+        elif isinstance(value, (bool, int, float)):
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {float(value):g}")
+    return lines
+
+
+class RequestStats:
+    """
+    Time spent in each stage of one request and the number of database queries.
+
+    Stage times are exclusive: time spent in a stage nested inside another,
+    such as NLP called from the video lookup, counts only towards the inner one.
+    """
+
+    __slots__ = ('started', 'stages', 'queries', 'profiler', 'open_stages')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages = {}
+        self.queries = 0
+        self.profiler = None
+        # Time already counted by nested stages, for each stage being timed, innermost last
+        self.open_stages = []
+
+    def add(self, stage_name, seconds):
+        self.stages[stage_name] = self.stages.get(stage_name, 0.0) + seconds
+        if self.open_stages:
+            self.open_stages[-1] += seconds
+
+
+def current_stats():
+    """Get the stats of the request being handled, or None outside requests"""
+    if not has_request_context():
+        return None
+    return g.get('_request_stats')
+
+
+@contextmanager
+def stage(name):
+    """
+    Add the time spent in a block to a stage of the current request
+
+    Args:
+        name (str): Stage name, e.g. nlp or engine
+    """
+    stats = current_stats()
+    if stats is None:
+        yield
+        return
+    stats.open_stages.append(0.0)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        nested = stats.open_stages.pop()
+        stats.add(name, elapsed - nested)
+        # The enclosing stage was only charged for our exclusive time so far
+        if stats.open_stages:
+            stats.open_stages[-1] += nested
+
+
+def timed_stage(name):
+    """Decorator adding the time spent in a function to a stage of the current request"""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class RequestMetrics:
+    """
+    Per-route latency histograms and stage breakdowns for a Flask app.
+
+    Each request's total latency, the time spent in each stage (NLP, video
+    lookup, database, speech engine) and its number of database queries are
+    recorded into histograms. Every Nth request can also be run under cProfile
+    with its stats dumped to disk; when disabled this costs one comparison per
+    request.
+    """
+
+    def __init__(self, app, profile_every=0, profile_dir=None):
+        """
+        Initialize the metrics and register the request hooks on the app
+
+        Args:
+            app (Flask): Application to instrument
+            profile_every (int): Profile every Nth request, 0 disables profiling
+            profile_dir (str): Directory the .prof files are written to
+        """
+        self.profile_every = profile_every
+        self.profile_dir = profile_dir or os.path.join(app.instance_path, 'profiles')
+        self._counter = itertools.count(1)
+
+        self.latency = Histogram(
+            'sign_http_request_duration_seconds', 'Request latency by route',
+            ('endpoint', 'method', 'status'), LATENCY_BUCKETS)
+        self.stage_latency = Histogram(
+            'sign_http_request_stage_seconds', 'Time spent in each stage of a request by route',
+            ('endpoint', 'stage'), LATENCY_BUCKETS)
+        self.queries = Histogram(
+            'sign_http_request_db_queries', 'Database queries per request by route',
+            ('endpoint',), QUERY_BUCKETS)
+
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        event.listen(Engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', self._after_cursor_execute)
+
+    def _before_request(self):
+        stats = RequestStats()
+        g._request_stats = stats
+        if self.profile_every and next(self._counter) % self.profile_every == 0:
+            stats.profiler = cProfile.Profile()
+            stats.profiler.enable()
+
+    def _after_request(self, response):
+        stats = g.pop('_request_stats', None)
+        if stats is None:
+            return response
+        elapsed = time.perf_counter() - stats.started
+        # Label by route pattern, not path, so the number of series stays bounded
+        endpoint = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+
+        self.latency.observe((endpoint, request.method, str(response.status_code)), elapsed)
+        for stage_name, seconds in stats.stages.items():
+            self.stage_latency.observe((endpoint, stage_name), seconds)
+        self.queries.observe((endpoint,), stats.queries)
+
+        if stats.profiler is not None:
+            stats.profiler.disable()
+            self._dump_profile(stats.profiler, request.endpoint or 'unmatched')
+        return response
+
+    def _dump_profile(self, profiler, endpoint):
+        """Write a request's profile for inspection with pstats or snakeviz"""
+        try:
+            os.makedirs(self.profile_dir, exist_ok=True)
+            filename = f"{time.strftime('%Y%m%d-%H%M%S')}-{endpoint}-{os.getpid()}-{threading.get_ident()}.prof"
+            profiler.dump_stats(os.path.join(self.profile_dir, filename))
+        except OSError as e:
+            logging.error(f"Error writing request profile: {str(e)}")
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        stats = current_stats()
+        if stats is not None:
+            stats.queries += 1
+            # Kept on the execution context, which is discarded when the query
+            # fails, so a failed query can't leave a start time behind
+            if context is not None:
+                context._query_started = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, '_query_started', None)
+        if started is not None:
+            stats = current_stats()
+            if stats is not None:
+                stats.add('db', time.perf_counter() - started)
+
+    def render(self):
+        """
+        Format the request histograms in the Prometheus text exposition format
+
+        Returns:
+            list: Lines of the exposition
+        """
+        return self.latency.render() + self.stage_latency.render() + self.queries.render()
@@ -2,14 +2,18 @@ import os
 import uuid
 import logging
 from datetime import datetime
-import tempfile
-from flask import render_template, request, jsonify, send_file, session
-from gtts import gTTS
+from flask import render_template, request, jsonify, send_file, session, url_for, redirect, abort, Response
 import speech_recognition as sr
+from werkzeug.exceptions import RequestEntityTooLarge
 
-from app import app, db
-from models import SignLanguageEntry, SessionActivity
-from utils import process_text, find_sign_video
+from app import app, db, activity_sink, tts_cache, stt_backend, speech_pool, sign_catalog, fuzzy_matcher, usage_analytics, sentence_stitcher, request_metrics, read_write_db, asset_manifest
+from models import SignLanguageEntry, normalize_word
+from engine_pool import PoolSaturated, EngineTimeout
+from srs import due_cards, sync_reviews
+from stt_engine import StageTimer, UploadTooLarge, UnreadableAudio, read_upload, decode_audio
+from utils import process_text, process_words, find_sign_phrases, fingerspell_word, video_manifest, sign_video_catalog, text_cache_stats
+from request_metrics import format_gauges
+from assets import choose_encoding
 
 # Generate or get session ID
 def get_session_id():
@@ -29,65 +33,89 @@ def about():
     """Render the about page"""
     return render_template('about.html')
 
+def render_catalog_page(render):
+    """Render a catalog page, from the page cache unless the session has flashed messages"""
+    if session.get('_flashes'):
+        return render(sign_catalog.get())
+    return sign_catalog.render_cached(request.full_path, render)
+
 @app.route('/exercises')
 def exercises():
     """Render the exercises page"""
-    # Get categories and exercises from database
-    categories = db.session.query(SignLanguageEntry.category).distinct().all()
-    categories = [c[0] for c in categories if c[0]]  # Remove None values
-    
-    exercises_data = {}
-    for category in categories:
-        exercises = SignLanguageEntry.query.filter_by(category=category).all()
-        exercises_data[category] = exercises
-    
-    return render_template('exercises.html', categories=categories, exercises_data=exercises_data)
+    # Get categories and exercises from the in-memory catalog
+    return render_catalog_page(lambda catalog: render_template(
+        'exercises.html',
+        categories=list(catalog.categories),
+        exercises_data=catalog.by_category
+    ))
 
 @app.route('/quiz')
 def quiz():
     """Render the quiz page"""
     # Get categories for the quiz page
-    categories = db.session.query(SignLanguageEntry.category).distinct().all()
-    categories = [c[0] for c in categories if c[0]]  # Remove None values
-    
-    return render_template('quiz.html', categories=categories)
+    return render_catalog_page(lambda catalog: render_template(
+        'quiz.html',
+        categories=list(catalog.categories)
+    ))
 
 # API endpoints
-@app.route('/api/text-to-speech', methods=['POST'])
+def engine_busy_response(error):
+    """Build the response telling clients to retry when the speech engines are saturated"""
+    response = jsonify({'error': str(error)})
+    response.status_code = 503
+    response.headers['Retry-After'] = '1'
+    return response
+
+def send_speech(audio_path, audio_key):
+    """Send a cached speech file, letting clients revalidate it by its content key"""
+    return send_file(
+        audio_path,
+        mimetype='audio/mp3',
+        as_attachment=True,
+        download_name='speech.mp3',
+        etag=audio_key,
+        conditional=True,
+        max_age=86400
+    )
+
+@app.route('/api/text-to-speech', methods=['GET', 'POST'])
 def text_to_speech():
     """Convert text to speech and return audio file"""
     try:
-        data = request.get_json()
-        text = data.get('text', '')
+        # GET requests can be cached and revalidated by the browser
+        if request.method == 'GET':
+            text = request.args.get('text', '')
+        else:
+            data = request.get_json()
+            text = data.get('text', '')
         
         if not text:
             return jsonify({'error': 'No text provided'}), 400
         
         # Log activity
-        session_id = get_session_id()
-        activity = SessionActivity(
-            session_id=session_id,
+        activity_sink.record(
+            session_id=get_session_id(),
             text_to_speech_used=True,
             timestamp=datetime.utcnow()
         )
-        db.session.add(activity)
-        db.session.commit()
         
-        # Create a temporary file for the audio
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.mp3') as temp_file:
-            temp_filename = temp_file.name
-            
-            # Generate speech from text
-            tts = gTTS(text=text, lang='en', slow=False)
-            tts.save(temp_filename)
-            
-            # Return the audio file
-            return send_file(
-                temp_filename,
-                mimetype='audio/mp3',
-                as_attachment=True,
-                download_name='speech.mp3'
-            )
+        # Reuse the speech if this text was spoken before, otherwise synthesize
+        # it on the speech engine pool
+        audio_path, audio_key = tts_cache.lookup(text, lang='en', slow=False)
+        if audio_path is None:
+            audio_path, audio_key = speech_pool.run(tts_cache.get, text, lang='en', slow=False)
+        
+        try:
+            return send_speech(audio_path, audio_key)
+        except FileNotFoundError:
+            # Another worker evicted the file since the lookup, synthesize it again
+            tts_cache.forget(audio_key)
+            audio_path, audio_key = speech_pool.run(tts_cache.get, text, lang='en', slow=False)
+            return send_speech(audio_path, audio_key)
+    except PoolSaturated as e:
+        return engine_busy_response(e)
+    except EngineTimeout as e:
+        return jsonify({'error': str(e)}), 504
     except Exception as e:
         logging.error(f"Error in text_to_speech: {str(e)}")
         return jsonify({'error': str(e)}), 500
@@ -99,41 +127,50 @@ def speech_to_text():
         if 'audio' not in request.files:
             return jsonify({'error': 'No audio file provided'}), 400
         
-        audio_file = request.files['audio']
+        timer = StageTimer()
         
-        # Save the file temporarily
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as temp_file:
-            temp_filename = temp_file.name
-            audio_file.save(temp_filename)
-            
-            # Initialize recognizer
-            recognizer = sr.Recognizer()
-            
-            # Load audio file
-            with sr.AudioFile(temp_filename) as source:
-                audio_data = recognizer.record(source)
-                
-                # Convert speech to text
-                text = recognizer.recognize_google(audio_data)
-                
-                # Process the text
-                processed_text = ' '.join(process_text(text))
-                
-                # Log activity
-                session_id = get_session_id()
-                activity = SessionActivity(
-                    session_id=session_id,
-                    speech_to_text_used=True,
-                    word_searched=text[:100],  # Store first 100 chars
-                    timestamp=datetime.utcnow()
-                )
-                db.session.add(activity)
-                db.session.commit()
-                
-                return jsonify({
-                    'original_text': text,
-                    'processed_text': processed_text
-                })
+        # Bodies over MAX_CONTENT_LENGTH were rejected before parsing, this
+        # also holds the audio file itself to its own limit
+        audio_buffer = read_upload(request.files['audio'].stream, app.config['STT_MAX_UPLOAD_BYTES'])
+        timer.mark('upload')
+        
+        # Load audio file
+        audio_data = decode_audio(audio_buffer)
+        timer.mark('decode')
+        
+        # Convert speech to text
+        text = speech_pool.run(stt_backend.recognize, audio_data)
+        timer.mark('recognize')
+        
+        # Process the text
+        processed_text = ' '.join(process_text(text))
+        timer.mark('nlp')
+        
+        # Log activity
+        activity_sink.record(
+            session_id=get_session_id(),
+            speech_to_text_used=True,
+            word_searched=text[:100],  # Store first 100 chars
+            timestamp=datetime.utcnow()
+        )
+        
+        logging.debug(f"speech_to_text timings: {timer.server_timing()}")
+        response = jsonify({
+            'original_text': text,
+            'processed_text': processed_text
+        })
+        response.headers['Server-Timing'] = timer.server_timing()
+        return response
+    except RequestEntityTooLarge:
+        return jsonify({'error': f"Request body exceeds {app.config['MAX_CONTENT_LENGTH']} bytes"}), 413
+    except UploadTooLarge as e:
+        return jsonify({'error': str(e)}), 413
+    except PoolSaturated as e:
+        return engine_busy_response(e)
+    except EngineTimeout as e:
+        return jsonify({'error': str(e)}), 504
+    except UnreadableAudio as e:
+        return jsonify({'error': str(e)}), 400
     except sr.UnknownValueError:
         return jsonify({'error': 'Could not understand audio'}), 400
     except sr.RequestError as e:
@@ -142,14 +179,6 @@ def speech_to_text():
     except Exception as e:
         logging.error(f"Error in speech_to_text: {str(e)}")
         return jsonify({'error': str(e)}), 500
-    finally:
-        # Clean up temp file
-        if 'temp_filename' in locals():
-            try:
-                if os.path.exists(temp_filename):
-                    os.unlink(temp_filename)
-            except Exception as e:
-                logging.error(f"Error removing temp file: {str(e)}")
 
 @app.route('/api/find-sign-video', methods=['POST'])
 def find_sign_language_video():
@@ -166,51 +195,467 @@ def find_sign_language_video():
         if not processed_words:
             return jsonify({'error': 'No valid words found'}), 400
             
-        # For simplicity, we'll just use the first word
-        word = processed_words[0]
+        # Use the first word, or the first phrase when a phrase clip such as
+        # "Thank You" covers the start of the text
+        segment = find_sign_phrases(processed_words)[0]
+        word = ' '.join(processed_words[segment['start']:segment['end']])
         
         # Log activity
-        session_id = get_session_id()
-        activity = SessionActivity(
-            session_id=session_id,
-            word_searched=word,
+        activity_sink.record(
+            session_id=get_session_id(),
+            word_searched=word[:100],
             timestamp=datetime.utcnow()
         )
-        db.session.add(activity)
-        db.session.commit()
         
-        # Try to find a video for the word
-        video_path, video_title = find_sign_video(word)
+        video_path, video_title = segment['video_path'], segment['video_title']
         
         if video_path:
             # Return the video path and the exact video title
             return jsonify({
                 'word': word,
-                'video_path': '/' + video_path,
+                'video_path': video_url(video_path),
                 'video_title': video_title
             })
         else:
             # Check if the word exists in the database
-            entry = SignLanguageEntry.query.filter(
-                db.func.lower(SignLanguageEntry.word) == db.func.lower(word)
-            ).first()
+            video_path, video_title = stored_sign_video(word)
             
-            if entry and entry.video_path:
-                # Extract the video title from the path
-                filename = os.path.basename(entry.video_path)
-                video_title = os.path.splitext(filename)[0]  # Remove the extension
-                
+            if video_path:
                 return jsonify({
                     'word': word,
-                    'video_path': entry.video_path,
+                    'video_path': video_url(video_path),
                     'video_title': video_title
                 })
             else:
-                # No video found
+                # No video found, fall back to fingerspelling when possible and
+                # suggest close matches
                 return jsonify({
                     'word': word,
-                    'video_path': None
+                    'video_path': None,
+                    'fingerspelling': fingerspelling_clips(word),
+                    'suggestions': sign_suggestions(word)
                 })
     except Exception as e:
         logging.error(f"Error in find_sign_language_video: {str(e)}")
-        return jsonify({'error': str(e)}), 500
\ No newline at end of file
+        return jsonify({'error': str(e)}), 500
+
+def stored_sign_video(word):
+    """Get the (video path, title) a vocabulary row links for a word, or (None, None)"""
+    entry = read_write_db.read_session.query(SignLanguageEntry).filter(
+        SignLanguageEntry.word_normalized == normalize_word(word)
+    ).first()
+    if entry and entry.video_path:
+        # Extract the video title from the path, without the extension
+        filename = os.path.basename(entry.video_path)
+        return entry.video_path, os.path.splitext(filename)[0]
+    return None, None
+
+def sign_suggestions(word):
+    """Get ranked signs close to a word that has no exact match"""
+    suggestions = fuzzy_matcher.suggest(word, sign_video_catalog())
+    for suggestion in suggestions:
+        if suggestion['source'] == 'video':
+            suggestion['video_path'] = video_url(suggestion['video_path'])
+    return suggestions
+
+def fingerspelling_clips(word):
+    """Get the single character clips spelling a word, if every character has one"""
+    return [
+        {'video_path': video_url(video_path), 'video_title': video_title}
+        for video_path, video_title in fingerspell_word(word)
+    ]
+
+def resolve_sign_playlist(words):
+    """
+    Resolve the sign videos for every word of a sentence
+    
+    Args:
+        words (list): Words of the sentence, in order
+        
+    Returns:
+        tuple: (playlist, base_words, sources) where playlist has one item per
+               word as returned to the client, base_words the processed form of
+               each word, and sources the (video_path, video_title) clips each
+               word plays, in order
+    """
+    # Tokenize, tag and lemmatize the whole sentence in one pass, keeping the
+    # first base form of each input word like the single-word endpoint does
+    processed = process_words(words)
+    base_words = [p[0] if p else None for p in processed]
+    sources = [[] for _ in words]
+    
+    # Match phrase clips first so e.g. "thank you" plays as one video; words
+    # covered by a phrase are marked so the client skips them
+    playlist = [{'input': original, 'word': word, 'video_path': None}
+                for original, word in zip(words, base_words)]
+    missing = set()
+    for segment in find_sign_phrases(base_words):
+        item = playlist[segment['start']]
+        if segment['video_path']:
+            item['video_path'] = video_url(segment['video_path'])
+            item['video_title'] = segment['video_title']
+            sources[segment['start']].append((segment['video_path'], segment['video_title']))
+            if segment['end'] - segment['start'] > 1:
+                item['word'] = ' '.join(base_words[segment['start']:segment['end']])
+                item['span'] = segment['end'] - segment['start']
+                for covered in playlist[segment['start'] + 1:segment['end']]:
+                    covered['covered'] = True
+        elif item['word']:
+            missing.add(normalize_word(item['word']))
+    
+    # Resolve all catalog misses against the database with a single query
+    if missing:
+        entries = read_write_db.read_session.query(SignLanguageEntry).filter(
+            SignLanguageEntry.word_normalized.in_(missing),
+            SignLanguageEntry.video_path.isnot(None)
+        ).all()
+        # Rows may store the path with a leading slash, sources are root relative
+        entry_paths = {entry.word_normalized: entry.video_path.lstrip('/') for entry in entries}
+    else:
+        entry_paths = {}
+    
+    for index, item in enumerate(playlist):
+        if not item['word'] or item['video_path'] or item.get('covered'):
+            continue
+        entry_path = entry_paths.get(normalize_word(item['word']))
+        if entry_path:
+            filename = os.path.basename(entry_path)
+            item['video_path'] = video_url(entry_path)
+            item['video_title'] = os.path.splitext(filename)[0]
+            sources[index].append((entry_path, item['video_title']))
+        else:
+            # Fall back to fingerspelling with the single character clips, which
+            # only covers numbers until letter clips are added
+            letters = fingerspell_word(item['word'])
+            item['fingerspelling'] = [
+                {'video_path': video_url(video_path), 'video_title': video_title}
+                for video_path, video_title in letters
+            ]
+            item['suggestions'] = sign_suggestions(item['word'])
+            sources[index].extend(letters)
+    
+    return playlist, base_words, sources
+
+def log_searches(base_words):
+    """Log every searched word of a sentence as one batch"""
+    session_id = get_session_id()
+    timestamp = datetime.utcnow()
+    activity_sink.record_many([
+        {'session_id': session_id, 'word_searched': word[:100], 'timestamp': timestamp}
+        for word in base_words if word
+    ])
+
+def request_words():
+    """Get the words of a sentence from a JSON request, or None if there are none"""
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return None
+    words = data.get('words')
+    if words is None:
+        text = data.get('text', '')
+        if not isinstance(text, str):
+            return None
+        words = text.split()
+    
+    if not isinstance(words, list) or not any(isinstance(w, str) and w.strip() for w in words):
+        return None
+    return [w if isinstance(w, str) else '' for w in words]
+
+@app.route('/api/find-sign-videos', methods=['POST'])
+def find_sign_language_videos():
+    """Find sign language videos for every word of a sentence in one request"""
+    try:
+        words = request_words()
+        if words is None:
+            return jsonify({'error': 'No text provided'}), 400
+        
+        playlist, base_words, _ = resolve_sign_playlist(words)
+        log_searches(base_words)
+        
+        return jsonify({'playlist': playlist})
+    except Exception as e:
+        logging.error(f"Error in find_sign_language_videos: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+def clip_manifest(video_path, video_title):
+    """Get the URL, size and duration of a clip, from the video manifest if it's there"""
+    video_path = video_path.lstrip('/')
+    filename = os.path.basename(video_path)
+    entry = video_manifest().get(filename)
+    if entry and entry['path'] == video_path:
+        return {
+            'url': url_for('sign_video', fingerprint=entry['fingerprint'], filename=filename),
+            'title': video_title,
+            'size': entry['size'],
+            'duration': entry['duration'],
+            'fingerprint': entry['fingerprint'],
+        }
+    return {
+        'url': '/' + video_path.lstrip('/'),
+        'title': video_title,
+        'size': None,
+        'duration': None,
+        'fingerprint': None,
+    }
+
+@app.route('/api/sign-playlist', methods=['POST'])
+def sign_playlist():
+    """
+    Return the ordered clips signing a sentence, with preload hints for the first
+    clips and a single stitched video once the sentence is popular
+    """
+    try:
+        words = request_words()
+        if words is None:
+            return jsonify({'error': 'No text provided'}), 400
+        
+        playlist, base_words, sources = resolve_sign_playlist(words)
+        log_searches(base_words)
+        
+        # Flatten into the clips played back to back, each with its offset in
+        # the sentence so a client can follow along in a stitched video
+        clips = []
+        paths = []
+        offset = 0.0
+        for index, word_clips in enumerate(sources):
+            for video_path, video_title in word_clips:
+                clip = clip_manifest(video_path, video_title)
+                clip['index'] = index
+                clip['start'] = offset
+                if offset is not None and clip['duration'] is not None:
+                    offset = round(offset + clip['duration'], 3)
+                else:
+                    offset = None
+                clips.append(clip)
+                paths.append(os.path.join(app.root_path, video_path))
+        
+        # Stitch only sequences whose every clip is fingerprinted, so the key
+        # changes whenever a clip does
+        stitched = None
+        if clips and all(clip['fingerprint'] for clip in clips):
+            key = sentence_stitcher.make_key([clip['fingerprint'] for clip in clips])
+            if sentence_stitcher.request(key, paths):
+                stitched = url_for('stitched_sentence', key=key)
+        
+        response = jsonify({
+            'playlist': playlist,
+            'clips': clips,
+            'duration': offset if clips else None,
+            'size': sum(clip['size'] or 0 for clip in clips),
+            'stitched': stitched,
+        })
+        
+        # Let the browser start fetching the first clips before the page asks for them
+        preload = clips[:1] if stitched else clips[:app.config["SIGN_PRELOAD_CLIPS"]]
+        urls = [stitched] if stitched else list(dict.fromkeys(clip['url'] for clip in preload))
+        if urls:
+            response.headers['Link'] = ', '.join(f'<{url}>; rel=preload; as=video; type="video/mp4"' for url in urls)
+        return response
+    except Exception as e:
+        logging.error(f"Error in sign_playlist: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+# Sign video serving
+VIDEO_MAX_AGE = 365 * 24 * 60 * 60
+
+def video_url(video_path):
+    """
+    Get the fingerprinted URL for a catalog video, which can be cached forever
+    
+    Args:
+        video_path (str): Path of the video relative to the application root,
+                          database rows may store it with a leading slash
+        
+    Returns:
+        str: URL containing the video's content hash, or the plain static URL if
+             the video isn't in the manifest
+    """
+    video_path = video_path.lstrip('/')
+    filename = os.path.basename(video_path)
+    entry = video_manifest().get(filename)
+    if entry and entry['path'] == video_path:
+        return url_for('sign_video', fingerprint=entry['fingerprint'], filename=filename)
+    return '/' + video_path.lstrip('/')
+
+@app.route('/videos/<fingerprint>/<path:filename>')
+def sign_video(fingerprint, filename):
+    """Serve a sign video with range support and immutable caching"""
+    entry = video_manifest().get(filename)
+    if entry is None:
+        abort(404)
+    
+    # An old fingerprint means the clip changed, point the client at the new one
+    if fingerprint != entry['fingerprint']:
+        return redirect(url_for('sign_video', fingerprint=entry['fingerprint'], filename=filename))
+    
+    response = send_file(
+        os.path.join(app.root_path, entry['path']),
+        mimetype='video/mp4',
+        etag=entry['sha256'],
+        conditional=True,
+        max_age=VIDEO_MAX_AGE
+    )
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
+@app.route('/sentences/<key>.mp4')
+def stitched_sentence(key):
+    """Serve a stitched sentence video, which never changes for its key"""
+    if len(key) != 64 or any(c not in '0123456789abcdef' for c in key):
+        abort(404)
+    path = sentence_stitcher.lookup(key)
+    if path is None:
+        abort(404)
+    response = send_file(path, mimetype='video/mp4', etag=key, conditional=True, max_age=VIDEO_MAX_AGE)
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
+# Static bundle serving
+ASSET_MAX_AGE = 365 * 24 * 60 * 60
+
+@app.route('/assets/<path:filename>')
+def asset(filename):
+    """Serve a built static bundle, pre-compressed in the best encoding the client accepts"""
+    found = asset_manifest.lookup(filename)
+    if found is None:
+        abort(404)
+    path, mimetype, sha256, sizes = found
+    encoding, suffix = choose_encoding(request.accept_encodings, sizes)
+    
+    response = send_file(
+        path + suffix,
+        mimetype=mimetype,
+        etag=f"{sha256}-{encoding or 'identity'}",
+        conditional=True,
+        max_age=ASSET_MAX_AGE
+    )
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
+@app.route('/api/video-manifest')
+def video_manifest_api():
+    """Return the size, duration and fingerprinted URL of every sign video"""
+    videos = [
+        {
+            'title': entry['title'],
+            'url': url_for('sign_video', fingerprint=entry['fingerprint'], filename=filename),
+            'size': entry['size'],
+            'duration': entry['duration'],
+            'sha256': entry['sha256'],
+        }
+        for filename, entry in sorted(video_manifest().entries().items())
+    ]
+    return jsonify({'videos': videos})
+
+# Spaced repetition
+def card_payload(card):
+    """
+    Get a review card with the URL of its sign video, so showing a card isn't
+    logged as a search
+    
+    Args:
+        card (ReviewCard): Card to serialize
+        
+    Returns:
+        dict: The card's fields plus videoUrl, None when the sign has no video
+    """
+    payload = card.to_dict()
+    payload['videoUrl'] = None
+    processed_words = process_text(card.word)
+    if processed_words:
+        segment = find_sign_phrases(processed_words)[0]
+        video_path = segment['video_path']
+        if not video_path:
+            video_path, _ = stored_sign_video(' '.join(processed_words[segment['start']:segment['end']]))
+        if video_path:
+            payload['videoUrl'] = video_url(video_path)
+    return payload
+
+@app.route('/api/srs/due')
+def srs_due_cards():
+    """Return the learner's cards that are due for review, most overdue first"""
+    try:
+        limit = min(max(int(request.args.get('limit', 20)), 1), 100)
+        cards = due_cards(get_session_id(), limit=limit)
+        return jsonify({'cards': [card_payload(card) for card in cards]})
+    except ValueError:
+        return jsonify({'error': 'Invalid limit'}), 400
+    except Exception as e:
+        logging.error(f"Error in srs_due_cards: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/srs/sync', methods=['POST'])
+def srs_sync():
+    """Add cards and record a batch of review results in one request"""
+    try:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({'error': 'Expected a JSON object'}), 400
+        cards = data.get('cards', [])
+        reviews = data.get('reviews', [])
+        
+        if not isinstance(cards, list) or not isinstance(reviews, list):
+            return jsonify({'error': 'cards and reviews must be lists'}), 400
+        for item in cards + reviews:
+            if not isinstance(item, dict) or not isinstance(item.get('word'), str) or not item['word'] or len(item['word']) > 100:
+                return jsonify({'error': 'Every card needs a word of at most 100 characters'}), 400
+            category = item.get('category')
+            if category is not None and (not isinstance(category, str) or len(category) > 50):
+                return jsonify({'error': 'Card categories must be strings of at most 50 characters'}), 400
+        for review in reviews:
+            if not isinstance(review.get('quality'), int) or not 0 <= review['quality'] <= 5:
+                return jsonify({'error': 'Review quality must be an integer from 0 to 5'}), 400
+            if review.get('reviewedAt') is not None and not isinstance(review['reviewedAt'], str):
+                return jsonify({'error': 'reviewedAt must be an ISO 8601 timestamp'}), 400
+        
+        session_id = get_session_id()
+        updated = sync_reviews(session_id, cards=cards, reviews=reviews)
+        
+        return jsonify({
+            'cards': [card_payload(card) for card in updated],
+            'due': [card_payload(card) for card in due_cards(session_id, limit=20)]
+        })
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({'error': f'Invalid review: {str(e)}'}), 400
+    except Exception as e:
+        db.session.rollback()
+        logging.error(f"Error in srs_sync: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/analytics/summary')
+def analytics_summary():
+    """Return usage totals, recent hourly activity and the most searched words"""
+    try:
+        hours = min(max(int(request.args.get('hours', 24)), 1), 24 * 14)
+        top = min(max(int(request.args.get('top', 10)), 1), 100)
+        return jsonify(usage_analytics.summary(hours=hours, top=top))
+    except ValueError:
+        return jsonify({'error': 'Invalid hours or top'}), 400
+    except Exception as e:
+        logging.error(f"Error in analytics_summary: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/metrics')
+def metrics():
+    """Expose request histograms and cache, pool and queue counters in the Prometheus text format"""
+    lines = request_metrics.render()
+    for prefix, stats in (
+        ('sign_text_cache', text_cache_stats()),
+        ('sign_video_catalog', sign_video_catalog().stats()),
+        ('sign_vocabulary_catalog', sign_catalog.stats()),
+        ('sign_tts_cache', tts_cache.stats()),
+        ('sign_sentence_cache', sentence_stitcher.stats()),
+        ('sign_speech_pool', speech_pool.stats()),
+        ('sign_activity_sink', activity_sink.stats()),
+        ('sign_database', read_write_db.stats()),
+        ('sign_assets', asset_manifest.stats()),
+    ):
+        lines.extend(format_gauges(prefix, stats))
+    return Response('\n'.join(lines) + '\n', mimetype='text/plain; version=0.0.4')
@@ -0,0 +1,45 @@
+import logging
+
+from sqlalchemy import inspect, text
+
+
+def upgrade_schema(db):
+    """
+    Bring tables created by older versions up to the current models
+
+    db.create_all() only creates missing tables, so columns and indexes added to
+    existing models are applied here. Every step checks the live schema first, so
+    this is safe to run on each startup against SQLite and PostgreSQL.
+
+    Args:
+        db (SQLAlchemy): Database extension whose models define the schema
+    """
+    from models import normalize_word
+
+    engine = db.engine
+    inspector = inspect(engine)
+
+    with engine.begin() as connection:
+        if inspector.has_table('sign_language_entry'):
+            columns = {column['name'] for column in inspector.get_columns('sign_language_entry')}
+            if 'word_normalized' not in columns:
+                logging.info("Adding sign_language_entry.word_normalized")
+                connection.execute(text("ALTER TABLE sign_language_entry ADD COLUMN word_normalized VARCHAR(100)"))
+
+            # Fill the lookup column for rows written before it existed. SQLite's
+            # lower() only folds ASCII, so normalize in Python exactly like runtime
+            # lookups do. Once filled this reads nothing on later startups
+            rows = connection.execute(text(
+                "SELECT id, word FROM sign_language_entry WHERE word_normalized IS NULL"))
+            updates = [{'id': row_id, 'normalized': normalize_word(word)} for row_id, word in rows]
+            if updates:
+                connection.execute(
+                    text("UPDATE sign_language_entry SET word_normalized = :normalized WHERE id = :id"),
+                    updates
+                )
+                logging.info(f"Backfilled word_normalized for {len(updates)} entries")
+
+        # Create indexes declared on the models that the database doesn't have yet
+        for table in db.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(connection, checkfirst=True)
@@ -2,16 +2,12 @@ import os
 import logging
 from app import app, db
 from models import SignLanguageEntry
+from utils import sign_video_catalog
+from vocabulary_import import VocabularyImporter
 
 def seed_database():
-    """Seed the database with initial sign language vocabulary"""
+    """Seed the database with initial sign language vocabulary and link the sign videos"""
     try:
-        # Check if we already have entries
-        existing_count = SignLanguageEntry.query.count()
-        if existing_count > 0:
-            print(f"Database already has {existing_count} entries. Skipping seed operation.")
-            return
-
         print("Seeding database with initial sign language vocabulary...")
         
         # Create a list of sign language entries
@@ -83,14 +79,11 @@ def seed_database():
             {"word": "Family", "category": "Family", "difficulty": "beginner"},
         ]
         
-        # Add all entries to database
-        for entry_data in entries:
-            entry = SignLanguageEntry(**entry_data)
-            db.session.add(entry)
-        
-        # Commit the changes
-        db.session.commit()
-        print(f"Successfully added {len(entries)} sign language entries to the database.")
+        # Sync the entries and every sign video, only writing what's missing or changed
+        importer = VocabularyImporter(db, SignLanguageEntry, video_catalog=sign_video_catalog())
+        report = importer.sync(entries)
+        print(f"Added {report['inserted']} and updated {report['updated']} sign language entries, "
+              f"{report['unchanged']} already up to date.")
         
     except Exception as e:
         db.session.rollback()
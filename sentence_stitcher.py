@@ -0,0 +1,250 @@
+import os
+import shutil
+import hashlib
+import logging
+import tempfile
+import threading
+import subprocess
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from caching import LRUCache, MISSING
+
+
+class SentenceStitcher:
+    """
+    Cache of frequently requested sentences stitched into a single MP4.
+
+    Each sentence is keyed by the fingerprints of its clips in order, so a
+    stitched file never goes stale. Once a sequence has been requested
+    min_requests times it is concatenated in the background with ffmpeg's
+    concat demuxer, copying the streams without re-encoding. Without ffmpeg
+    stitching is disabled and clients play the clips one by one.
+
+    The cache directory may be shared by several worker processes, so the
+    in-memory index is reconciled with the directory on every lookup.
+    """
+
+    def __init__(self, cache_dir, ffmpeg=None, min_requests=3, max_bytes=512 * 1024 * 1024,
+                 tracked_sentences=10000, timeout=60.0):
+        """
+        Initialize the stitcher, indexing any files already on disk
+
+        Args:
+            cache_dir (str): Directory the stitched MP4 files are stored in
+            ffmpeg (str): Path of the ffmpeg binary, looked up on PATH by default
+            min_requests (int): Requests for a sequence before it is stitched
+            max_bytes (int): Maximum total size of the stitched files
+            tracked_sentences (int): Number of sequences whose request counts are kept
+            timeout (float): Maximum seconds one ffmpeg run may take
+        """
+        self.cache_dir = cache_dir
+        self.ffmpeg = ffmpeg or shutil.which('ffmpeg')
+        self.min_requests = min_requests
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._requests = LRUCache(tracked_sentences)
+        self._pending = set()
+        self._failed = set()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='sentence-stitcher')
+        self.total_bytes = 0
+
+        self.stitched = 0
+        self.failures = 0
+        self.evictions = 0
+
+        if not self.ffmpeg:
+            logging.info("ffmpeg not found, sentence stitching is disabled")
+        os.makedirs(cache_dir, exist_ok=True)
+        self._scan()
+
+    @property
+    def enabled(self):
+        return bool(self.ffmpeg)
+
+    @staticmethod
+    def make_key(fingerprints):
+        """
+        Build the cache key for a clip sequence
+
+        Args:
+            fingerprints (list): Content fingerprints of the clips, in play order
+
+        Returns:
+            str: Hex SHA-256 digest identifying the sequence
+        """
+        return hashlib.sha256('\0'.join(fingerprints).encode('ascii')).hexdigest()
+
+    def path_for(self, key):
+        """
+        Get the file path for a cache key
+
+        Args:
+            key (str): Cache key
+
+        Returns:
+            str: Path of the stitched MP4 file for the key
+        """
+        return os.path.join(self.cache_dir, f"{key}.mp4")
+
+    def _scan(self):
+        """Index existing files, oldest first so they are evicted first"""
+        found = []
+        for filename in os.listdir(self.cache_dir):
+            key, ext = os.path.splitext(filename)
+            if ext != '.mp4':
+                continue
+            try:
+                stat = os.stat(os.path.join(self.cache_dir, filename))
+            except OSError:
+                continue
+            found.append((stat.st_mtime, key, stat.st_size))
+
+        for _, key, size in sorted(found):
+            self._entries[key] = size
+            self.total_bytes += size
+        self._evict()
+
+    def _evict(self):
+        """Remove least recently used files until the cache fits its size limit"""
+        while self.total_bytes > self.max_bytes and len(self._entries) > 1:
+            key, size = self._entries.popitem(last=False)
+            self.total_bytes -= size
+            self.evictions += 1
+            try:
+                os.unlink(self.path_for(key))
+            except OSError as e:
+                logging.error(f"Error removing stitched sentence {key}: {str(e)}")
+
+    def _cached_path(self, key):
+        """
+        Get the path of a stitched file, reconciling the index with the directory.
+        Must be called with the lock held.
+
+        Args:
+            key (str): Cache key
+
+        Returns:
+            str: Path of the stitched MP4 file, or None if it isn't on disk
+        """
+        path = self.path_for(key)
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            size = None
+
+        if key in self._entries:
+            if size is None:
+                # Another worker evicted the file
+                self.total_bytes -= self._entries.pop(key)
+                return None
+            self._entries.move_to_end(key)
+            return path
+
+        if size is None:
+            return None
+        # Another worker stitched the file
+        self._entries[key] = size
+        self.total_bytes += size
+        self._evict()
+        return path if key in self._entries else None
+
+    def lookup(self, key):
+        """
+        Get the stitched file for a sequence only if it already exists
+
+        Args:
+            key (str): Cache key
+
+        Returns:
+            str: Path of the stitched MP4 file, or None
+        """
+        with self._lock:
+            return self._cached_path(key)
+
+    def request(self, key, paths):
+        """
+        Count a request for a sequence and stitch it once it is popular enough
+
+        Args:
+            key (str): Cache key of the sequence
+            paths (list): Full paths of the clips, in play order
+
+        Returns:
+            str: Path of the stitched MP4 file if it is ready, otherwise None
+        """
+        path = self.lookup(key)
+        if path or not self.enabled or len(paths) < 2:
+            return path
+
+        with self._lock:
+            count = self._requests.get(key)
+            count = 1 if count is MISSING else count + 1
+            self._requests.put(key, count)
+            if count < self.min_requests or key in self._pending or key in self._failed:
+                return None
+            self._pending.add(key)
+        self._executor.submit(self._stitch, key, list(paths))
+        return None
+
+    def _stitch(self, key, paths):
+        """Concatenate the clips into the cache directory with ffmpeg"""
+        output = self.path_for(key)
+        # Unique names, so processes stitching the same sentence don't share files
+        fd, list_file = tempfile.mkstemp(dir=self.cache_dir, prefix=f"{key}.", suffix='.txt')
+        os.close(fd)
+        fd, temp_file = tempfile.mkstemp(dir=self.cache_dir, prefix=f"{key}.", suffix='.tmp')
+        os.close(fd)
+        try:
+            with open(list_file, 'w') as f:
+                for path in paths:
+                    escaped = path.replace("'", "'\\''")
+                    f.write(f"file '{escaped}'\n")
+            subprocess.run(
+                [self.ffmpeg, '-v', 'error', '-y', '-f', 'concat', '-safe', '0', '-i', list_file,
+                 '-c', 'copy', '-movflags', '+faststart', '-f', 'mp4', temp_file],
+                check=True, capture_output=True, timeout=self.timeout,
+            )
+            os.replace(temp_file, output)
+            size = os.path.getsize(output)
+            with self._lock:
+                self.total_bytes += size - self._entries.pop(key, 0)
+                self._entries[key] = size
+                self.stitched += 1
+                self._evict()
+            logging.debug(f"Stitched {len(paths)} clips into {output}")
+        except (OSError, subprocess.SubprocessError) as e:
+            # Clips with mismatched codecs can't be stream copied, don't retry them
+            with self._lock:
+                self._failed.add(key)
+                self.failures += 1
+            stderr = getattr(e, 'stderr', None)
+            logging.error(f"Error stitching sentence {key}: {str(e)} {stderr.decode(errors='replace') if stderr else ''}")
+        finally:
+            with self._lock:
+                self._pending.discard(key)
+            for leftover in (list_file, temp_file):
+                if os.path.exists(leftover):
+                    os.unlink(leftover)
+
+    def stats(self):
+        """
+        Get counters for the stitcher
+
+        Returns:
+            dict: Whether stitching is enabled, files cached and their size,
+                  sequences stitched, failed and waiting
+        """
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'entries': len(self._entries),
+                'bytes': self.total_bytes,
+                'stitched': self.stitched,
+                'failures': self.failures,
+                'evictions': self.evictions,
+                'pending': len(self._pending),
+            }
@@ -0,0 +1,160 @@
+import time
+import logging
+import threading
+from types import MappingProxyType
+from collections import namedtuple
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from caching import LRUCache, MISSING
+
+# Read-only copy of a vocabulary row, usable in templates like the model
+CatalogEntry = namedtuple('CatalogEntry', ['id', 'word', 'category', 'difficulty', 'video_path'])
+
+# Immutable view of the vocabulary grouped by category
+CatalogSnapshot = namedtuple('CatalogSnapshot', ['version', 'entries', 'categories', 'by_category'])
+
+
+class SignCatalogService:
+    """
+    In-memory, read-only copy of the vocabulary grouped by category.
+
+    The whole table is loaded with one query into immutable tuples, so pages can
+    read categories and their entries without touching the database. Commits that
+    change the model invalidate the snapshot in this process, and a TTL bounds how
+    long other processes keep serving an old one.
+    """
+
+    def __init__(self, db, model, ttl=60.0, page_cache_size=0, read_db=None):
+        """
+        Initialize the service and start watching for changes to the model
+
+        Args:
+            db (SQLAlchemy): Database extension
+            model: Vocabulary model class
+            ttl (float): Seconds a snapshot is served before it is reloaded
+            page_cache_size (int): Number of rendered pages to cache, 0 disables it
+            read_db (ReadWriteDatabase): Optional source of a read-only session to load from
+        """
+        self.db = db
+        self.read_db = read_db
+        self.model = model
+        self.ttl = ttl
+        self.pages = LRUCache(page_cache_size)
+
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._loaded_at = 0.0
+        self._version = 0
+        self.loads = 0
+
+        event.listen(Session, 'after_flush', self._after_flush)
+        event.listen(Session, 'do_orm_execute', self._on_execute)
+        event.listen(Session, 'after_commit', self._after_commit)
+        event.listen(Session, 'after_rollback', self._after_rollback)
+
+    def _touches_model(self, instances):
+        return any(isinstance(instance, self.model) for instance in instances)
+
+    def _after_flush(self, session, flush_context):
+        """Remember that the session changed vocabulary rows"""
+        if self._touches_model(session.new) or self._touches_model(session.dirty) or self._touches_model(session.deleted):
+            session.info['sign_catalog_changed'] = True
+
+    def _on_execute(self, orm_execute_state):
+        """Remember bulk inserts, updates and deletes against the vocabulary table"""
+        if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+            return
+        mapper = orm_execute_state.bind_mapper
+        if mapper is not None and mapper.class_ is self.model:
+            orm_execute_state.session.info['sign_catalog_changed'] = True
+
+    def _after_commit(self, session):
+        if session.info.pop('sign_catalog_changed', False):
+            self.invalidate()
+
+    def _after_rollback(self, session):
+        session.info.pop('sign_catalog_changed', None)
+
+    def invalidate(self):
+        """Drop the current snapshot and cached pages so the next read reloads them"""
+        with self._lock:
+            self._snapshot = None
+        self.pages.clear()
+
+    def _load(self):
+        """Load every entry with a single query and group them by category"""
+        model = self.model
+        session = self.read_db.read_session if self.read_db is not None else self.db.session
+        rows = session.execute(
+            select(model.id, model.word, model.category, model.difficulty, model.video_path)
+            .order_by(model.id)
+        ).all()
+
+        entries = tuple(CatalogEntry(*row) for row in rows)
+        grouped = {}
+        for entry in entries:
+            if entry.category:
+                grouped.setdefault(entry.category, []).append(entry)
+
+        self._version += 1
+        self.loads += 1
+        logging.debug(f"Loaded {len(rows)} vocabulary entries in {len(grouped)} categories")
+        return CatalogSnapshot(
+            version=self._version,
+            entries=entries,
+            categories=tuple(grouped),
+            by_category=MappingProxyType({category: tuple(items) for category, items in grouped.items()}),
+        )
+
+    def get(self):
+        """
+        Get the current vocabulary snapshot, loading it if needed
+
+        Returns:
+            CatalogSnapshot: Version, all entries, category names and entries per category
+        """
+        snapshot = self._snapshot
+        if snapshot is not None and time.monotonic() - self._loaded_at < self.ttl:
+            return snapshot
+
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is None or time.monotonic() - self._loaded_at >= self.ttl:
+                snapshot = self._load()
+                self._snapshot = snapshot
+                self._loaded_at = time.monotonic()
+        return snapshot
+
+    def render_cached(self, key, render):
+        """
+        Render a page, reusing the output while the snapshot is unchanged
+
+        Args:
+            key (str): Identifies the page, e.g. the request path and query string
+            render (callable): Function rendering the page from a snapshot
+
+        Returns:
+            str: The rendered page
+        """
+        snapshot = self.get()
+        cache_key = (snapshot.version, key)
+        page = self.pages.get(cache_key)
+        if page is MISSING:
+            page = render(snapshot)
+            self.pages.put(cache_key, page)
+        return page
+
+    def stats(self):
+        """
+        Get counters for the service
+
+        Returns:
+            dict: Snapshot version, number of loads and page cache stats
+        """
+        return {
+            'version': self._version,
+            'loads': self.loads,
+            'pages': self.pages.stats(),
+        }
@@ -0,0 +1,165 @@
+import logging
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import scoped_session, sessionmaker
+
+# Pragmas set on every connection. WAL lets readers run while the activity
+# writer commits, and NORMAL sync is durable in WAL mode except on power loss.
+CONNECTION_PRAGMAS = {
+    'busy_timeout': 5000,
+    'synchronous': 'NORMAL',
+    'cache_size': -20000,
+    'temp_store': 'MEMORY',
+    'mmap_size': 256 * 1024 * 1024,
+    'foreign_keys': 'ON',
+}
+
+
+def is_sqlite_file(url):
+    """
+    Check whether a database URL points at an SQLite file
+
+    Args:
+        url (sqlalchemy.engine.URL): Database URL
+
+    Returns:
+        bool: True for file databases, False for other backends and in-memory SQLite
+    """
+    return url.get_backend_name() == 'sqlite' and url.database not in (None, '', ':memory:')
+
+
+def install_pragmas(engine, pragmas, read_only=False):
+    """
+    Set pragmas on every new connection of an engine
+
+    Args:
+        engine (Engine): SQLite engine
+        pragmas (dict): Pragma values keyed by name
+        read_only (bool): Also reject writes on these connections
+    """
+    statements = [f"PRAGMA {name}={value}" for name, value in pragmas.items()]
+    if read_only:
+        statements.append("PRAGMA query_only=ON")
+
+    @event.listens_for(engine, 'connect')
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+        finally:
+            cursor.close()
+
+
+def enable_wal(engine):
+    """
+    Switch the database to write-ahead logging, which persists in the file
+
+    Args:
+        engine (Engine): SQLite engine with write access
+
+    Returns:
+        str: The journal mode now in effect
+    """
+    with engine.connect() as connection:
+        mode = connection.exec_driver_sql("PRAGMA journal_mode=WAL").scalar()
+    if str(mode).lower() != 'wal':
+        logging.warning(f"Could not enable WAL for {engine.url.database}, journal mode is {mode}")
+    return mode
+
+
+def create_read_engine(url, pool_size=8, pragmas=CONNECTION_PRAGMAS):
+    """
+    Create a pooled engine whose connections can only read
+
+    Args:
+        url (sqlalchemy.engine.URL): URL of the SQLite file
+        pool_size (int): Number of pooled read connections
+        pragmas (dict): Pragmas set on every connection
+
+    Returns:
+        Engine: The read-only engine
+    """
+    engine = create_engine(
+        url,
+        pool_size=pool_size,
+        max_overflow=pool_size,
+        pool_pre_ping=True,
+        connect_args={'check_same_thread': False},
+    )
+    install_pragmas(engine, pragmas, read_only=True)
+    return engine
+
+
+class ReadWriteDatabase:
+    """
+    Separate read and write connection pools for an SQLite deployment.
+
+    The Flask-SQLAlchemy session keeps writing through the app's engine, which
+    is limited to a small pool so writers in this process queue for the single
+    SQLite write lock instead of failing on it. Hot read paths use the session
+    from this object, backed by a larger pool of read-only connections that run
+    concurrently with writes under WAL. For other databases, or when tuning is
+    disabled, reads simply use the Flask-SQLAlchemy session.
+    """
+
+    def __init__(self, app, db, enabled=True, read_pool_size=8, pragmas=CONNECTION_PRAGMAS):
+        """
+        Initialize the database split
+
+        Args:
+            app (Flask): Application whose database is tuned
+            db (SQLAlchemy): Database extension, already initialized with the app
+            enabled (bool): Whether to tune SQLite databases at all
+            read_pool_size (int): Number of pooled read connections
+            pragmas (dict): Pragmas set on every connection
+        """
+        self.db = db
+        self.read_engine = None
+        self._read_session = None
+
+        with app.app_context():
+            engine = db.engine
+        self.enabled = enabled and is_sqlite_file(engine.url)
+        if not self.enabled:
+            return
+
+        install_pragmas(engine, pragmas)
+        # Pragmas only apply to connections opened after this point
+        engine.dispose()
+        self.journal_mode = enable_wal(engine)
+
+        self.read_engine = create_read_engine(engine.url, read_pool_size, pragmas)
+        self._read_session = scoped_session(sessionmaker(bind=self.read_engine))
+        app.teardown_appcontext(self._remove_session)
+        logging.info(f"SQLite tuned: journal_mode={self.journal_mode}, {read_pool_size} read connections")
+
+    def _remove_session(self, exception=None):
+        self._read_session.remove()
+
+    @property
+    def read_session(self):
+        """
+        Get the session for queries that only read committed data
+
+        Returns:
+            Session: Session on the read-only pool, or the Flask-SQLAlchemy session
+        """
+        if self._read_session is None:
+            return self.db.session
+        return self._read_session
+
+    def stats(self):
+        """
+        Get the state of the connection pools
+
+        Returns:
+            dict: Whether the split is enabled and the status of both pools
+        """
+        if not self.enabled:
+            return {'enabled': False}
+        return {
+            'enabled': True,
+            'write_pool_checked_out': self.db.engine.pool.checkedout(),
+            'read_pool_checked_out': self.read_engine.pool.checkedout(),
+        }
@@ -0,0 +1,130 @@
+from datetime import datetime, timedelta, timezone
+
+from app import db
+from models import ReviewCard
+
+# Ease factor new cards start with and the lowest it can drop to
+INITIAL_EASE_FACTOR = 2.5
+MIN_EASE_FACTOR = 1.3
+
+
+def apply_review(card, quality, reviewed_at):
+    """
+    Update a card's schedule with the SM-2 algorithm, matching the browser version
+
+    Args:
+        card (ReviewCard): Card that was reviewed
+        quality (int): Quality of the response from 0 (forgot) to 5 (perfect)
+        reviewed_at (datetime): When the review happened, in UTC
+    """
+    if quality >= 3:
+        # Correct response
+        if card.repetitions == 0:
+            card.interval_days = 1
+        elif card.repetitions == 1:
+            card.interval_days = 6
+        else:
+            card.interval_days = round(card.interval_days * card.ease_factor)
+        card.repetitions += 1
+    else:
+        # Incorrect response, reset repetitions
+        card.repetitions = 0
+        card.interval_days = 0
+
+    card.ease_factor = max(MIN_EASE_FACTOR, card.ease_factor + (0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02)))
+    card.last_reviewed_at = reviewed_at
+    card.due_at = reviewed_at + timedelta(days=card.interval_days)
+
+
+def parse_timestamp(value, default):
+    """
+    Parse an ISO 8601 timestamp from the client into a naive UTC datetime
+
+    Args:
+        value (str): Timestamp such as "2025-05-12T10:00:00.000Z", or None
+        default (datetime): Value used when no timestamp is given
+
+    Returns:
+        datetime: The parsed timestamp
+    """
+    if not value:
+        return default
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    # Never schedule from the future because of a skewed client clock
+    return min(parsed, default)
+
+
+def due_cards(session_id, limit=20, now=None):
+    """
+    Get a learner's due cards, most overdue first
+
+    Args:
+        session_id (str): Learner's session identifier
+        limit (int): Maximum number of cards returned
+        now (datetime): Current UTC time
+
+    Returns:
+        list: Due ReviewCard rows read in order from the (session_id, due_at) index
+    """
+    now = now or datetime.utcnow()
+    return (ReviewCard.query
+            .filter(ReviewCard.session_id == session_id, ReviewCard.due_at <= now)
+            .order_by(ReviewCard.due_at)
+            .limit(limit)
+            .all())
+
+
+def sync_reviews(session_id, cards=(), reviews=(), now=None):
+    """
+    Add cards and apply a batch of reviews with one read and one commit
+
+    Args:
+        session_id (str): Learner's session identifier
+        cards (list): Dicts with category and word of cards to add
+        reviews (list): Dicts with category, word, quality and optional reviewedAt,
+                        applied in order
+        now (datetime): Current UTC time
+
+    Returns:
+        list: Every card added or reviewed, in its updated state
+    """
+    now = now or datetime.utcnow()
+    wanted = {}
+    for item in list(cards) + list(reviews):
+        key = (item.get('category') or '', item['word'])
+        wanted.setdefault(key, None)
+
+    if not wanted:
+        return []
+
+    # Load every referenced card in one query
+    existing = ReviewCard.query.filter(
+        ReviewCard.session_id == session_id,
+        ReviewCard.word.in_({word for _, word in wanted})
+    ).all()
+    for card in existing:
+        if (card.category, card.word) in wanted:
+            wanted[(card.category, card.word)] = card
+
+    for (category, word), card in wanted.items():
+        if card is None:
+            card = ReviewCard(
+                session_id=session_id,
+                category=category,
+                word=word,
+                ease_factor=INITIAL_EASE_FACTOR,
+                interval_days=0,
+                repetitions=0,
+                due_at=now,
+            )
+            db.session.add(card)
+            wanted[(category, word)] = card
+
+    for review in sorted(reviews, key=lambda r: parse_timestamp(r.get('reviewedAt'), now)):
+        card = wanted[(review.get('category') or '', review['word'])]
+        apply_review(card, int(review['quality']), parse_timestamp(review.get('reviewedAt'), now))
+
+    db.session.commit()
+    return list(wanted.values())
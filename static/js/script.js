@@ -266,68 +266,72 @@ function translateText() {
     window.videoSources = [];
     window.audioSources = [];
     let currentWordIndex = 0;
+    let currentClipIndex = 0;
     let videosLoaded = 0;
     
-    // Optimize loading by fetching videos and audio concurrently for each word
-    const fetchPromises = words.map((word, index) => {
-        // For each word, we'll create an object to store both video and audio
-        window.mediaResources = window.mediaResources || [];
+    // Every clip of the sentence in play order, and the whole sentence as one
+    // video once the server has stitched it
+    let sentenceClips = [];
+    let stitchedVideo = null;
+    const preloader = document.createElement('video');
+    preloader.preload = 'auto';
+    preloader.muted = true;
+    
+    // Initialise media resources for each word
+    window.mediaResources = [];
+    words.forEach((word, index) => {
         window.mediaResources[index] = {
             word: word,
             videoReady: false,
-            audioReady: false,
+            audioReady: true, // Audio generation completely removed as per user request
             videoPath: '',
             audioBlob: null,
             audioElement: null
         };
-        
-        // Create two promises for each word - one for video, one for audio
-        const videoPromise = fetch('/api/find-sign-video', {
-            method: 'POST',
-            headers: {
-                'Content-Type': 'application/json'
-            },
-            body: JSON.stringify({ text: word })
-        })
+    });
+    
+    // Resolve the playlist for the whole sentence with a single request
+    fetch('/api/sign-playlist', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json'
+        },
+        body: JSON.stringify({ words: words })
+    })
         .then(response => response.json())
         .then(data => {
-            // Store the video path and title
-            window.videoSources[index] = data.video_path || '';
-            window.mediaResources[index].videoPath = data.video_path || '';
-            window.mediaResources[index].videoTitle = data.video_title || word;
-            window.mediaResources[index].videoReady = true;
-            videosLoaded++;
-            
-            // Update the word item with a class if video is available
-            const wordItem = wordList.querySelector(`[data-index="${index}"]`);
-            if (wordItem) {
-                if (data.video_path) {
-                    wordItem.classList.add('has-video');
-                } else {
-                    wordItem.classList.add('no-video');
-                }
+            if (data.error) {
+                throw new Error(data.error);
             }
             
-            return data;
+            sentenceClips = data.clips || [];
+            stitchedVideo = data.stitched || null;
+            
+            (data.playlist || []).forEach((item, index) => {
+                // Words without a sign of their own are fingerspelled clip by clip
+                const clips = item.fingerspelling && item.fingerspelling.length ? item.fingerspelling : null;
+                const videoPath = item.video_path || (clips ? clips[0].video_path : '');
+                
+                // Store the video path and title
+                window.videoSources[index] = videoPath;
+                window.mediaResources[index].videoPath = videoPath;
+                window.mediaResources[index].videoTitle = item.video_title || words[index];
+                window.mediaResources[index].clips = clips;
+                window.mediaResources[index].videoReady = true;
+                videosLoaded++;
+                
+                // Update the word item with a class if video is available
+                const wordItem = wordList.querySelector(`[data-index="${index}"]`);
+                if (wordItem) {
+                    // Words covered by a phrase clip are signed by the preceding video
+                    if (videoPath || item.covered) {
+                        wordItem.classList.add('has-video');
+                    } else {
+                        wordItem.classList.add('no-video');
+                    }
+                }
+            });
         })
-        .catch(error => {
-            console.error(`Error fetching video for word "${word}":`, error);
-            window.videoSources[index] = '';
-            window.mediaResources[index].videoReady = true;
-            videosLoaded++;
-            return null;
-        });
-        
-        // Audio generation completely removed as per user request
-        const audioPromise = Promise.resolve(null);
-        window.mediaResources[index].audioReady = true;
-        
-        // Return a promise that resolves when both video and audio are ready
-        return Promise.all([videoPromise, audioPromise]);
-    });
-    
-    // After all videos are fetched
-    Promise.all(fetchPromises)
         .then(() => {
             // Hide both global and local loading indicators
             showLoading(false);
@@ -340,7 +344,9 @@ function translateText() {
                 
                 // Find the first video that exists
                 const firstVideoIndex = window.videoSources.findIndex(src => src);
-                if (firstVideoIndex >= 0) {
+                if (stitchedVideo) {
+                    playStitchedVideo();
+                } else if (firstVideoIndex >= 0) {
                     playVideoAtIndex(firstVideoIndex);
                 }
             } else {
@@ -367,12 +373,47 @@ function translateText() {
     if (videoPlayer) {
         // When video ends, play the next one
         videoPlayer.addEventListener('ended', function() {
+            // The stitched video already contains every clip
+            if (stitchedVideo && videoPlayer.currentSrc.endsWith(stitchedVideo)) {
+                return;
+            }
+            
+            // Play the remaining fingerspelling clips of the current word first
+            const clips = window.mediaResources[currentWordIndex] && window.mediaResources[currentWordIndex].clips;
+            if (clips && currentClipIndex + 1 < clips.length) {
+                currentClipIndex++;
+                videoPlayer.querySelector('source').src = clips[currentClipIndex].video_path;
+                videoPlayer.load();
+                preloadNextClip(clips[currentClipIndex].video_path);
+                videoPlayer.play().catch(e => {
+                    console.log("Error playing video:", e);
+                });
+                return;
+            }
+            
             const nextIndex = currentWordIndex + 1;
             if (nextIndex < words.length) {
                 playVideoAtIndex(nextIndex);
             }
         });
         
+        // Follow along in the stitched video using each clip's start time
+        videoPlayer.addEventListener('timeupdate', function() {
+            if (!stitchedVideo || !videoPlayer.currentSrc.endsWith(stitchedVideo)) {
+                return;
+            }
+            let index = -1;
+            sentenceClips.forEach(clip => {
+                if (clip.start !== null && clip.start <= videoPlayer.currentTime) {
+                    index = clip.index;
+                }
+            });
+            if (index >= 0 && index !== currentWordIndex) {
+                currentWordIndex = index;
+                highlightWord(index);
+            }
+        });
+        
         // Play/Pause button
         const playPauseBtn = document.getElementById('play-pause-btn');
         if (playPauseBtn) {
@@ -391,7 +432,11 @@ function translateText() {
         const restartBtn = document.getElementById('restart-btn');
         if (restartBtn) {
             restartBtn.addEventListener('click', function() {
-                playVideoAtIndex(0);
+                if (stitchedVideo) {
+                    playStitchedVideo();
+                } else {
+                    playVideoAtIndex(0);
+                }
             });
         }
     }
@@ -423,6 +468,7 @@ function translateText() {
             
             // Update current index
             currentWordIndex = index;
+            currentClipIndex = 0;
             
             // Get the preloaded media resources for this word
             const mediaResource = window.mediaResources && window.mediaResources[index];
@@ -437,8 +483,9 @@ function translateText() {
                 videoPlayer.appendChild(source);
             }
             
-            // Reset and load the video
+            // Reset and load the video, and start fetching the one after it
             videoPlayer.load();
+            preloadNextClip(videoPath);
             
             // Audio completely removed as per user request
             
@@ -467,21 +514,55 @@ function translateText() {
             }, 50);
             
             // Update active word highlighting
-            const wordItems = wordList.querySelectorAll('.word-item');
-            wordItems.forEach(item => {
-                item.classList.remove('active');
-            });
+            highlightWord(index);
+        }
+    }
+    
+    // Play the whole sentence as the single stitched video
+    function playStitchedVideo() {
+        currentWordIndex = 0;
+        let source = videoPlayer.querySelector('source');
+        if (!source) {
+            source = document.createElement('source');
+            source.type = 'video/mp4';
+            videoPlayer.appendChild(source);
+        }
+        source.src = stitchedVideo;
+        videoPlayer.load();
+        videoPlayer.play().catch(e => {
+            console.log("Error playing video:", e);
+        });
+        if (sentenceClips.length) {
+            highlightWord(sentenceClips[0].index);
+        }
+    }
+    
+    // Fetch the clip following the given one so the next transition doesn't stall
+    function preloadNextClip(videoPath) {
+        const position = sentenceClips.findIndex(clip => clip.url === videoPath);
+        const next = position >= 0 ? sentenceClips[position + 1] : null;
+        if (next && next.url !== videoPath && !preloader.src.endsWith(next.url)) {
+            preloader.src = next.url;
+            preloader.load();
+        }
+    }
+    
+    // Highlight the word at an index in the word list
+    function highlightWord(index) {
+        const wordItems = wordList.querySelectorAll('.word-item');
+        wordItems.forEach(item => {
+            item.classList.remove('active');
+        });
+        
+        const activeWord = wordList.querySelector(`[data-index="${index}"]`);
+        if (activeWord) {
+            activeWord.classList.add('active');
             
-            const activeWord = wordList.querySelector(`[data-index="${index}"]`);
-            if (activeWord) {
-                activeWord.classList.add('active');
-                
-                // Scroll to the active word if needed
-                activeWord.scrollIntoView({
-                    behavior: 'smooth',
-                    block: 'nearest'
-                });
-            }
+            // Scroll to the active word if needed
+            activeWord.scrollIntoView({
+                behavior: 'smooth',
+                block: 'nearest'
+            });
         }
     }
 }
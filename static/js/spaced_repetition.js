@@ -8,9 +8,12 @@
 class SpacedRepetitionSystem {
     constructor() {
         this.storageKey = 'sign_language_srs';
+        this.pendingKey = 'sign_language_srs_pending';
         this.cards = this.loadCards();
+        this.pending = this.loadPending();
         this.currentSession = [];
         this.sessionInProgress = false;
+        this.videoManifest = null;
     }
     
     /**
@@ -28,6 +31,138 @@ class SpacedRepetitionSystem {
         localStorage.setItem(this.storageKey, JSON.stringify(this.cards));
     }
     
+    /**
+     * Load changes not yet sent to the server from localStorage
+     */
+    loadPending() {
+        const savedPending = localStorage.getItem(this.pendingKey);
+        return savedPending ? JSON.parse(savedPending) : { cards: [], reviews: [] };
+    }
+    
+    /**
+     * Save changes not yet sent to the server to localStorage
+     */
+    savePending() {
+        localStorage.setItem(this.pendingKey, JSON.stringify(this.pending));
+    }
+    
+    /**
+     * Send new cards and review results to the server in one request, so progress
+     * follows the learner across devices
+     * @returns {Promise} - Resolves once the server state has been merged in
+     */
+    syncWithServer() {
+        const batch = this.pending;
+        if (batch.cards.length === 0 && batch.reviews.length === 0) {
+            return Promise.resolve(null);
+        }
+        
+        // Start a fresh batch so reviews made during the request aren't lost
+        this.pending = { cards: [], reviews: [] };
+        this.savePending();
+        
+        return fetch('/api/srs/sync', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json'
+            },
+            body: JSON.stringify(batch)
+        })
+            .then(response => {
+                if (!response.ok) {
+                    throw new Error(`Sync failed with status ${response.status}`);
+                }
+                return response.json();
+            })
+            .then(data => {
+                // The server schedule is authoritative
+                (data.cards || []).forEach(card => {
+                    this.cards[`${card.category}-${card.word}`] = card;
+                });
+                this.saveCards();
+                return data;
+            })
+            .catch(error => {
+                // Put the batch back to retry on the next sync
+                this.pending.cards = batch.cards.concat(this.pending.cards);
+                this.pending.reviews = batch.reviews.concat(this.pending.reviews);
+                this.savePending();
+                console.error('Error syncing spaced repetition progress:', error);
+                return null;
+            });
+    }
+    
+    /**
+     * Get the cards due for review from the server, which merges reviews made on
+     * every device, after sending this device's pending changes
+     * @param {number} limit - Maximum number of cards to return
+     * @returns {Promise} - Resolves to due card objects, most overdue first
+     */
+    loadDueCards(limit = 20) {
+        return this.syncWithServer()
+            .then(() => {
+                if (this.pending.cards.length > 0 || this.pending.reviews.length > 0) {
+                    // The sync failed, the server doesn't know this device's changes yet
+                    throw new Error('Pending changes could not be synced');
+                }
+                return fetch(`/api/srs/due?limit=${limit}`);
+            })
+            .then(response => {
+                if (!response.ok) {
+                    throw new Error(`Loading due cards failed with status ${response.status}`);
+                }
+                return response.json();
+            })
+            .then(data => {
+                const dueCards = (data.cards || []).map(card => {
+                    const id = `${card.category}-${card.word}`;
+                    this.cards[id] = card;
+                    return { id, ...card };
+                });
+                this.saveCards();
+                return dueCards;
+            })
+            .catch(error => {
+                // Work offline from the schedule stored on this device
+                console.error('Error loading due cards, using local schedule:', error);
+                return this.getDueCards(limit);
+            });
+    }
+    
+    /**
+     * Get the sign video URL for a card without logging a search. Cards from the
+     * server carry it, cards only known to this device are matched against the
+     * video manifest by title.
+     * @param {Object} card - Card object
+     * @returns {Promise} - Resolves to the video URL, or null if the sign has none
+     */
+    getVideoUrl(card) {
+        if (card.videoUrl !== undefined) {
+            return Promise.resolve(card.videoUrl);
+        }
+        if (!this.videoManifest) {
+            this.videoManifest = fetch('/api/video-manifest')
+                .then(response => {
+                    if (!response.ok) {
+                        throw new Error(`Loading the video manifest failed with status ${response.status}`);
+                    }
+                    return response.json();
+                })
+                .then(data => {
+                    const urls = {};
+                    (data.videos || []).forEach(video => {
+                        urls[video.title.toLowerCase()] = video.url;
+                    });
+                    return urls;
+                })
+                .catch(error => {
+                    this.videoManifest = null;
+                    throw error;
+                });
+        }
+        return this.videoManifest.then(urls => urls[card.word.toLowerCase()] || null);
+    }
+    
     /**
      * Add a new card or update an existing one
      * @param {string} category - Category the sign belongs to
@@ -47,6 +182,8 @@ class SpacedRepetitionSystem {
                 dueDate: new Date().toISOString(),  // Initially due immediately
                 lastReviewed: null
             };
+            this.pending.cards.push({ category, word });
+            this.savePending();
         }
         
         this.saveCards();
@@ -92,8 +229,15 @@ class SpacedRepetitionSystem {
         dueDate.setDate(dueDate.getDate() + card.interval);
         card.dueDate = dueDate.toISOString();
         
-        // Update card in storage
+        // Update card in storage and queue the review for the server
         this.saveCards();
+        this.pending.reviews.push({
+            category: card.category,
+            word: card.word,
+            quality,
+            reviewedAt: card.lastReviewed
+        });
+        this.savePending();
         
         // If this was part of a study session, update session
         if (this.sessionInProgress) {
@@ -126,10 +270,11 @@ class SpacedRepetitionSystem {
      * Start a spaced repetition study session
      * @param {number} newCardLimit - Maximum number of new cards to include
      * @param {number} totalCardLimit - Maximum total cards in session
+     * @param {Array} dueCards - Due cards to pick from, defaults to the local schedule
      */
-    startSession(newCardLimit = 5, totalCardLimit = 20) {
+    startSession(newCardLimit = 5, totalCardLimit = 20, dueCards = null) {
         // Get cards that are due
-        let dueCards = this.getDueCards();
+        dueCards = dueCards || this.getDueCards();
         
         // Separate into new and review cards
         const newCards = dueCards.filter(card => card.repetitions === 0);
@@ -217,6 +362,9 @@ class SpacedRepetitionSystem {
         this.sessionInProgress = false;
         this.currentSession = [];
         
+        // Send the whole session's reviews in one request
+        this.syncWithServer();
+        
         return stats;
     }
     
@@ -240,11 +388,19 @@ class SpacedRepetitionSystem {
     }
     
     /**
-     * Create and display the spaced repetition study UI
+     * Load the due cards and display the spaced repetition study UI
      */
     showStudyInterface() {
+        this.loadDueCards().then(dueCards => this.openStudySession(dueCards));
+    }
+    
+    /**
+     * Create and display the study UI for a session over the given due cards
+     * @param {Array} dueCards - Due cards, most overdue first
+     */
+    openStudySession(dueCards) {
         // Start a new session
-        const sessionInfo = this.startSession();
+        const sessionInfo = this.startSession(5, 20, dueCards);
         
         if (sessionInfo.totalCards === 0) {
             showFeedback('No cards available for study at this time. Check back later or add more signs to your practice list.', 'info');
@@ -407,11 +563,16 @@ class SpacedRepetitionSystem {
             categoryBadge.textContent = currentCard.category;
             categoryBadge.className = `badge badge-${currentCard.category.toLowerCase().replace(' ', '-')}`;
             
-            // Set video source
-            const videoPath = `/static/videos/sign_language/${currentCard.word.toLowerCase()}.mp4`;
+            // Set video source to the sign's fingerprinted URL
             const videoElement = document.getElementById('card-video');
-            videoElement.querySelector('source').src = videoPath;
-            videoElement.load();
+            this.getVideoUrl(currentCard)
+                .then(url => {
+                    if (url) {
+                        videoElement.querySelector('source').src = url;
+                        videoElement.load();
+                    }
+                })
+                .catch(error => console.error('Error loading sign video:', error));
             
             // Reset rating buttons
             document.querySelectorAll('.rating-btn').forEach(btn => {
@@ -0,0 +1,140 @@
+import io
+import time
+
+import speech_recognition as sr
+
+# Bytes read from the upload stream at a time
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+
+class UploadTooLarge(Exception):
+    """Raised when an uploaded audio file exceeds the size limit"""
+
+
+class UnreadableAudio(Exception):
+    """Raised when an uploaded file can't be decoded as audio"""
+
+
+class GoogleSTTBackend:
+    """Speech recognition with the Google Web Speech API"""
+
+    name = 'google'
+
+    def __init__(self):
+        self.recognizer = sr.Recognizer()
+
+    def recognize(self, audio_data):
+        """
+        Recognize speech in decoded audio
+
+        Args:
+            audio_data (sr.AudioData): Decoded audio
+
+        Returns:
+            str: The recognized text
+        """
+        return self.recognizer.recognize_google(audio_data)
+
+
+class StubSTTBackend:
+    """Offline stand-in that returns a fixed transcript, for tests and benchmarks"""
+
+    name = 'stub'
+
+    def __init__(self, text='hello my name'):
+        self.text = text
+
+    def recognize(self, audio_data):
+        """
+        Return the fixed transcript, or fail like the real engine on empty audio
+
+        Args:
+            audio_data (sr.AudioData): Decoded audio
+
+        Returns:
+            str: The fixed transcript
+        """
+        if not audio_data.frame_data:
+            raise sr.UnknownValueError()
+        return self.text
+
+
+STT_BACKENDS = {
+    'google': GoogleSTTBackend,
+    'stub': StubSTTBackend,
+}
+
+
+class StageTimer:
+    """Records how long each named stage of a request takes"""
+
+    def __init__(self):
+        self.durations = {}
+        self._last = time.perf_counter()
+
+    def mark(self, stage):
+        """
+        Record the time since the previous mark as the duration of a stage
+
+        Args:
+            stage (str): Name of the stage that just finished
+        """
+        now = time.perf_counter()
+        self.durations[stage] = now - self._last
+        self._last = now
+
+    def server_timing(self):
+        """
+        Format the durations for a Server-Timing header
+
+        Returns:
+            str: Header value with durations in milliseconds
+        """
+        return ', '.join(f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in self.durations.items())
+
+
+def read_upload(stream, max_bytes, chunk_size=UPLOAD_CHUNK_SIZE):
+    """
+    Read an uploaded file into memory in chunks, enforcing a size limit
+
+    Args:
+        stream: File-like object to read from
+        max_bytes (int): Maximum number of bytes accepted
+        chunk_size (int): Bytes read per call
+
+    Returns:
+        io.BytesIO: Buffer holding the upload, positioned at the start
+
+    Raises:
+        UploadTooLarge: If the upload is bigger than max_bytes
+    """
+    buffer = io.BytesIO()
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        if buffer.tell() + len(chunk) > max_bytes:
+            raise UploadTooLarge(f"Audio file exceeds {max_bytes} bytes")
+        buffer.write(chunk)
+    buffer.seek(0)
+    return buffer
+
+
+def decode_audio(buffer):
+    """
+    Decode WAV/AIFF/FLAC audio held in memory
+
+    Args:
+        buffer: File-like object holding the audio
+
+    Returns:
+        sr.AudioData: The decoded audio
+
+    Raises:
+        UnreadableAudio: If the data isn't in a supported audio format
+    """
+    try:
+        with sr.AudioFile(buffer) as source:
+            return sr.Recognizer().record(source)
+    except ValueError as e:
+        raise UnreadableAudio(str(e))
@@ -0,0 +1,25 @@
+import os
+import sys
+
+import pytest
+
+ROOT_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_PATH)
+
+from benchmarks.harness import scratch_environment  # noqa: E402
+
+# The app reads its configuration at import, so point it at scratch storage first
+scratch_environment()
+# Serve the source files whether or not static/dist has been built locally
+os.environ['ASSET_BUNDLES'] = '0'
+
+
+@pytest.fixture
+def app():
+    from app import app
+    return app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
@@ -0,0 +1,15 @@
+def test_rows_survive_a_failing_on_write(app):
+    from app import db
+    from activity_sink import ActivitySink
+    from models import SessionActivity
+
+    def fail(session, rows):
+        raise RuntimeError('rollup failed')
+
+    sink = ActivitySink(app, db, SessionActivity, on_write=fail)
+    sink._write([{'session_id': 'sink-test', 'word_searched': 'hello'}])
+
+    with app.app_context():
+        assert SessionActivity.query.filter_by(session_id='sink-test').count() == 1
+    assert sink.flushed == 1
+    assert sink.on_write_failed == 1
@@ -0,0 +1,16 @@
+def test_top_search_count_matches_totals(app):
+    from app import db, usage_analytics
+    from activity_sink import ActivitySink
+    from models import SessionActivity
+
+    with app.app_context():
+        before = usage_analytics.summary(top=1000)
+    sink = ActivitySink(app, db, SessionActivity, on_write=usage_analytics.record_rows)
+    sink._write([{'session_id': 'analytics-test', 'word_searched': 'zebra-crossing'} for _ in range(3)])
+
+    with app.app_context():
+        after = usage_analytics.summary(top=1000)
+    counts = {entry['word']: entry['count'] for entry in after['top_searches']}
+    searches = after['totals']['searches'] - before['totals']['searches']
+    assert searches == 3
+    assert counts['zebra-crossing'] == searches
@@ -0,0 +1,15 @@
+import os
+import subprocess
+import sys
+
+ROOT_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_app_imports_with_in_memory_sqlite():
+    env = dict(os.environ, DATABASE_URL='sqlite://')
+    result = subprocess.run(
+        [sys.executable, '-c', 'import app; print(app.read_write_db.enabled)'],
+        cwd=ROOT_PATH, env=env, capture_output=True, text=True, timeout=120,
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip().splitlines()[-1] == 'False'
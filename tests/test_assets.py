@@ -0,0 +1,29 @@
+import os
+
+
+def _build(tmp_path, version, keep_builds):
+    from assets import build
+
+    with open(tmp_path / 'static' / 'js' / 'app.js', 'w') as f:
+        f.write(f"var version = {version};\n")
+    return build(static_dir=str(tmp_path / 'static'), dist_dir=str(tmp_path / 'dist'),
+                 bundles={'js/app.js': ['js/app.js']}, keep_builds=keep_builds)
+
+
+def test_previous_builds_are_kept_and_served(tmp_path):
+    from assets import AssetManifest
+
+    os.makedirs(tmp_path / 'static' / 'js')
+    files = [_build(tmp_path, version, keep_builds=2)['js/app.js']['file'] for version in range(4)]
+    # Rebuilding unchanged sources keeps the same history
+    _build(tmp_path, 3, keep_builds=2)
+
+    dist = tmp_path / 'dist'
+    assert not os.path.exists(dist / files[0])
+    assert all(os.path.exists(dist / filename) for filename in files[1:])
+
+    manifest = AssetManifest(static_dir=str(tmp_path / 'static'), dist_dir=str(dist),
+                             bundles={'js/app.js': ['js/app.js']})
+    assert manifest.lookup(files[0]) is None
+    for filename in files[1:]:
+        assert manifest.lookup(filename)[0] == os.path.join(str(dist), filename)
@@ -0,0 +1,14 @@
+import io
+import json
+import logging
+
+from batch_translate import translate_stream
+
+
+def test_in_process_run_restores_logging():
+    out = io.StringIO()
+    stats = translate_stream([(1, 'hello'), (2, 'thank you')], out, workers=0, quiet=True)
+
+    assert stats.texts == 2
+    assert [json.loads(line)['id'] for line in out.getvalue().splitlines()] == [1, 2]
+    assert logging.getLogger().isEnabledFor(logging.ERROR)
@@ -0,0 +1,40 @@
+import random
+
+from fuzzy_search import NGramIndex, allowed_distance, bounded_levenshtein, levenshtein, pattern_masks
+
+
+def test_short_queries_do_not_suggest_unrelated_digits(app):
+    from app import fuzzy_matcher
+    from utils import sign_video_catalog
+
+    with app.app_context():
+        catalog = sign_video_catalog()
+        for query in ('I', 'x', 'ab'):
+            assert not [s for s in fuzzy_matcher.suggest(query, catalog) if s['word'].isdigit()]
+        assert 'Hello' in [s['word'] for s in fuzzy_matcher.suggest('helo', catalog)]
+
+
+def test_allowed_distance_scales_with_length():
+    assert [allowed_distance('x' * n, 2) for n in (1, 2, 3, 5, 6, 10)] == [0, 0, 1, 1, 2, 2]
+
+
+def test_bounded_levenshtein_matches_dynamic_programming():
+    rng = random.Random(1606)
+    for _ in range(2000):
+        a = ''.join(rng.choice('abc') for _ in range(rng.randint(0, 8)))
+        b = ''.join(rng.choice('abc') for _ in range(rng.randint(0, 8)))
+        k = rng.randint(0, 3)
+        assert bounded_levenshtein(a, pattern_masks(a), b, k) == min(levenshtein(a, b), k + 1)
+
+
+def test_index_finds_the_same_words_as_a_linear_scan():
+    rng = random.Random(1606)
+    words = list({''.join(rng.choice('abcde') for _ in range(rng.randint(1, 9))) for _ in range(500)})
+    index = NGramIndex()
+    for word in words:
+        index.add(word)
+    for _ in range(200):
+        query = ''.join(rng.choice('abcde') for _ in range(rng.randint(1, 10)))
+        distance = rng.randint(0, 3)
+        expected = sorted((d, word) for d, word in ((levenshtein(query, word), word) for word in words) if d <= distance)
+        assert index.search(query, distance) == expected
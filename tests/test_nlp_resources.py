@@ -0,0 +1,39 @@
+import pytest
+
+import nlp_resources
+
+
+class FakeTagger:
+    created = 0
+
+    def __init__(self):
+        FakeTagger.created += 1
+
+
+class FakeLemmatizer:
+    def lemmatize(self, word, pos='n'):
+        return word
+
+
+@pytest.fixture
+def fallback_resources(monkeypatch):
+    # Stand-ins for the NLTK models, so warmup runs without downloaded data
+    FakeTagger.created = 0
+    monkeypatch.setattr(nlp_resources, 'PerceptronTagger', FakeTagger)
+    monkeypatch.setattr(nlp_resources, 'WordNetLemmatizer', FakeLemmatizer)
+    monkeypatch.setattr(nlp_resources.nltk, 'word_tokenize', str.split)
+    nlp_resources.reset()
+    yield
+    nlp_resources.reset()
+
+
+def test_warmup_times_every_resource_once(fallback_resources):
+    assert nlp_resources.warmup()
+    assert set(nlp_resources.load_times) == {'tagger', 'lemmatizer', 'tokenizer', 'total'}
+    loaded = {name: seconds for name, seconds in nlp_resources.load_times.items() if name != 'total'}
+
+    # A second warmup finds the models loaded and loads nothing again
+    assert nlp_resources.warmup()
+    assert FakeTagger.created == 1
+    assert {name: seconds for name, seconds in nlp_resources.load_times.items() if name != 'total'} == loaded
+    assert isinstance(nlp_resources.get_tagger(), FakeTagger)
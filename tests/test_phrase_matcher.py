@@ -0,0 +1,26 @@
+from conftest import ROOT_PATH
+from phrase_matcher import PhraseMatcher
+from video_catalog import VideoCatalog
+
+
+def make_matcher():
+    return PhraseMatcher(VideoCatalog(ROOT_PATH))
+
+
+def test_fingerspelling_covers_digits_only():
+    matcher = make_matcher()
+    assert [title for _, title in matcher.fingerspell('2024')] == ['2', '0', '2', '4']
+    # The bundled video set has no letter clips
+    assert matcher.fingerspell('helo') == []
+
+
+def test_phrases_match_before_words():
+    segments = make_matcher().segment(['thank', 'you', 'hello'])
+    assert [(s['start'], s['end']) for s in segments] == [(0, 2), (2, 3)]
+    assert segments[0]['video_title'] == 'Thank You'
+
+
+def test_segment_counts_catalog_hits_and_misses():
+    matcher = make_matcher()
+    matcher.segment(['hello', 'qwertyuiop', None, 'good'])
+    assert (matcher.catalog.hits, matcher.catalog.misses) == (2, 1)
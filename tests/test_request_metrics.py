@@ -0,0 +1,48 @@
+import pytest
+from flask import g
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+import request_metrics
+from request_metrics import RequestStats, stage
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_nested_stages_are_counted_once(app, monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(request_metrics.time, 'perf_counter', clock)
+
+    with app.test_request_context():
+        g._request_stats = stats = RequestStats()
+        with stage('video_lookup'):
+            clock.now += 1
+            with stage('nlp'):
+                clock.now += 2
+                with stage('db'):
+                    clock.now += 4
+            clock.now += 8
+
+    assert stats.stages == {'video_lookup': 9, 'nlp': 2, 'db': 4}
+    assert stats.open_stages == []
+
+
+def test_failed_query_leaves_no_start_time(app):
+    engine = create_engine('sqlite://')
+
+    with app.test_request_context():
+        g._request_stats = stats = RequestStats()
+        with engine.connect() as connection:
+            with pytest.raises(OperationalError):
+                connection.execute(text('SELECT * FROM missing_table'))
+            connection.execute(text('SELECT 1'))
+            assert '_query_started' not in connection.info
+
+    assert stats.queries == 2
+    assert stats.stages['db'] < 1
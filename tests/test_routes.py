@@ -0,0 +1,54 @@
+import pytest
+
+
+@pytest.mark.parametrize('endpoint', ['/api/find-sign-videos', '/api/sign-playlist'])
+def test_non_string_text_is_rejected(client, endpoint):
+    response = client.post(endpoint, json={'text': 5})
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize('endpoint', ['/api/find-sign-videos', '/api/sign-playlist'])
+def test_non_json_body_is_rejected(client, endpoint):
+    response = client.post(endpoint, data='hello world', content_type='text/plain')
+    assert response.status_code == 400
+
+
+def test_sentence_lookup(client):
+    response = client.post('/api/find-sign-videos', json={'text': 'hello'})
+    assert response.status_code == 200
+    assert 'playlist' in response.get_json()
+
+
+def test_text_to_speech_survives_eviction_by_another_worker(client):
+    import os
+    from app import tts_cache
+
+    path, _ = tts_cache.get('evicted elsewhere')
+    os.unlink(path)
+    response = client.get('/api/text-to-speech?text=evicted+elsewhere')
+    assert response.status_code == 200
+    assert response.data
+
+
+def test_oversized_upload_is_rejected_before_parsing(app, client, monkeypatch):
+    import io
+
+    monkeypatch.setitem(app.config, 'MAX_CONTENT_LENGTH', 1024)
+    response = client.post('/api/speech-to-text', data={'audio': (io.BytesIO(b'\0' * 4096), 'speech.wav')},
+                           content_type='multipart/form-data')
+    assert response.status_code == 413
+    assert 'error' in response.get_json()
+
+
+def test_database_fallback_returns_fingerprinted_url(app, client):
+    from app import db
+    from models import SignLanguageEntry
+
+    with app.app_context():
+        db.session.add(SignLanguageEntry(word='Salutation', category='Test',
+                                         video_path='/static/videos/sign_language/Hello.mp4'))
+        db.session.commit()
+
+    data = client.post('/api/find-sign-video', json={'text': 'salutation'}).get_json()
+    assert data['video_path'].startswith('/videos/')
+    assert data['video_path'].endswith('/Hello.mp4')
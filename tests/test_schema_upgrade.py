@@ -0,0 +1,20 @@
+from sqlalchemy import text
+
+
+def test_backfill_matches_runtime_normalization(app):
+    from app import db
+    from models import normalize_word
+    from schema_upgrade import upgrade_schema
+
+    with app.app_context():
+        with db.engine.begin() as connection:
+            connection.execute(text(
+                "INSERT INTO sign_language_entry (word, category) VALUES ('  Ärger ', 'Test'), ('ÉCOLE', 'Test')"))
+            connection.execute(text(
+                "UPDATE sign_language_entry SET word_normalized = NULL WHERE category = 'Test'"))
+        upgrade_schema(db)
+        with db.engine.connect() as connection:
+            rows = connection.execute(text(
+                "SELECT word, word_normalized FROM sign_language_entry WHERE category = 'Test'")).all()
+
+    assert rows and all(normalized == normalize_word(word) for word, normalized in rows)
@@ -0,0 +1,34 @@
+import os
+import stat
+
+from sentence_stitcher import SentenceStitcher
+
+
+def _fake_ffmpeg(tmp_path):
+    # Writes the concat list into the output file, which is the last argument
+    script = tmp_path / 'ffmpeg'
+    script.write_text('#!/bin/sh\nfor last; do :; done\ncat "$9" > "$last"\n')
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+    return str(script)
+
+
+def test_workers_sharing_a_directory(tmp_path):
+    cache_dir = tmp_path / 'sentences'
+    ffmpeg = _fake_ffmpeg(tmp_path)
+    first = SentenceStitcher(str(cache_dir), ffmpeg=ffmpeg)
+    second = SentenceStitcher(str(cache_dir), ffmpeg=ffmpeg)
+
+    key = SentenceStitcher.make_key(['a', 'b'])
+    first._stitch(key, ['/clips/a.mp4', '/clips/b.mp4'])
+    assert os.listdir(cache_dir) == [f"{key}.mp4"]
+
+    # The second worker serves the file the first one stitched
+    path = second.lookup(key)
+    assert path == first.path_for(key)
+    assert "file '/clips/b.mp4'" in open(path).read()
+
+    # Once it is removed from the shared directory neither worker hands it out
+    os.unlink(path)
+    assert first.lookup(key) is None
+    assert second.lookup(key) is None
+    assert first.stats()['entries'] == 0
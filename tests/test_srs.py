@@ -0,0 +1,37 @@
+import pytest
+
+
+@pytest.mark.parametrize('payload', [
+    {'cards': [{'category': 5, 'word': 'Hello'}]},
+    {'reviews': [{'category': ['Greetings'], 'word': 'Hello', 'quality': 4}]},
+    {'reviews': [{'category': 'Greetings', 'word': 'Hello', 'quality': 4, 'reviewedAt': 1715508000}]},
+    {'reviews': [{'category': 'Greetings', 'word': 'Hello', 'quality': 4, 'reviewedAt': 'yesterday'}]},
+    ['not', 'an', 'object'],
+])
+def test_invalid_sync_is_rejected(client, payload):
+    assert client.post('/api/srs/sync', json=payload).status_code == 400
+
+
+def test_reviews_sync_into_the_due_schedule(client):
+    response = client.post('/api/srs/sync', json={
+        'cards': [{'category': 'Greetings', 'word': 'Hello'}, {'category': 'Greetings', 'word': 'Bye'}],
+        'reviews': [{'category': 'Greetings', 'word': 'Hello', 'quality': 5}],
+    })
+    assert response.status_code == 200
+    assert [card['word'] for card in response.get_json()['due']] == ['Bye']
+    assert [card['word'] for card in client.get('/api/srs/due').get_json()['cards']] == ['Bye']
+
+
+def test_pages_load_the_spaced_repetition_client(client):
+    assert 'js/spaced_repetition.js' in client.get('/').get_data(as_text=True)
+
+
+def test_due_cards_carry_their_video_without_logging_searches(client):
+    from app import activity_sink
+
+    client.post('/api/srs/sync', json={'cards': [{'category': 'Greetings', 'word': 'Hello'}]})
+    queued = activity_sink.queued
+    cards = client.get('/api/srs/due').get_json()['cards']
+    assert cards[0]['word'] == 'Hello'
+    assert cards[0]['videoUrl'].endswith('/Hello.mp4')
+    assert activity_sink.queued == queued
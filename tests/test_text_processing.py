@@ -0,0 +1,12 @@
+import utils
+
+
+def test_fallbacks_split_words_the_same_way(monkeypatch):
+    def broken_tagger():
+        raise LookupError('tagger unavailable')
+
+    monkeypatch.setattr(utils, 'get_tagger', broken_tagger)
+    text = 'Hello, (dear) world!'
+
+    assert utils.process_text(text) == ['hello', 'dear', 'world']
+    assert utils.process_words([text]) == [utils.process_text(text)]
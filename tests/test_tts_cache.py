@@ -0,0 +1,55 @@
+import os
+import threading
+
+import pytest
+
+from engine_pool import EngineTimeout
+from tts_cache import TTSCache, StubTTSBackend
+
+
+def test_workers_sharing_a_directory(tmp_path):
+    frame = len(StubTTSBackend.SILENT_FRAME)
+    first = TTSCache(str(tmp_path), backend=StubTTSBackend(), max_bytes=frame)
+    second = TTSCache(str(tmp_path), backend=StubTTSBackend(), max_bytes=frame)
+
+    path, _ = first.get('one')
+    # The second worker adopts the file instead of synthesizing it again
+    assert second.get('one')[0] == path
+    assert second.misses == 0
+
+    # Caching another text evicts the first file from the shared directory
+    second.get('two')
+    assert not os.path.exists(path)
+
+    # The first worker notices and synthesizes it again
+    assert first.lookup('one')[0] is None
+    path, _ = first.get('one')
+    assert os.path.exists(path)
+    assert first.misses == 2
+
+
+class HangingBackend(StubTTSBackend):
+    def __init__(self):
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def synthesize(self, text, lang, slow, path):
+        self.started.set()
+        self.release.wait()
+        super().synthesize(text, lang, slow, path)
+
+
+def test_waiting_for_a_hung_synthesis_times_out(tmp_path):
+    backend = HangingBackend()
+    cache = TTSCache(str(tmp_path), backend=backend, wait_timeout=0.05)
+    leader = threading.Thread(target=cache.get, args=('hello',))
+    leader.start()
+    backend.started.wait()
+
+    with pytest.raises(EngineTimeout):
+        cache.get('hello')
+    assert cache.stats()['wait_timeouts'] == 1
+
+    backend.release.set()
+    leader.join()
+    assert os.path.exists(cache.get('hello')[0])
@@ -0,0 +1,19 @@
+import struct
+
+from video_manifest import mp4_duration
+
+
+def box(box_type, payload=b''):
+    return struct.pack('>I4s', 8 + len(payload), box_type) + payload
+
+
+def test_duration_from_movie_header(tmp_path):
+    path = tmp_path / 'clip.mp4'
+    path.write_bytes(box(b'ftyp', b'isom') + box(b'moov', box(b'mvhd', b'\0' * 12 + struct.pack('>II', 1000, 2500))))
+    assert mp4_duration(str(path)) == 2.5
+
+
+def test_truncated_movie_header_has_no_duration(tmp_path):
+    path = tmp_path / 'clip.mp4'
+    path.write_bytes(box(b'moov', box(b'mvhd')))
+    assert mp4_duration(str(path)) is None
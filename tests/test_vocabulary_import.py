@@ -0,0 +1,23 @@
+def test_leading_slash_video_links_are_kept(app):
+    from app import db
+    from models import SignLanguageEntry
+    from utils import sign_video_catalog
+    from vocabulary_import import VocabularyImporter
+
+    with app.app_context():
+        db.session.add_all([
+            SignLanguageEntry(word='Salutation', category='Test',
+                              video_path='/static/videos/sign_language/Hello.mp4'),
+            SignLanguageEntry(word='Farewell', category='Test',
+                              video_path='/static/videos/sign_language/No-Such-Clip.mp4'),
+        ])
+        db.session.commit()
+
+        importer = VocabularyImporter(db, SignLanguageEntry, video_catalog=sign_video_catalog())
+        report = importer.sync()
+        links = dict(db.session.query(SignLanguageEntry.word, SignLanguageEntry.video_path)
+                     .filter(SignLanguageEntry.category == 'Test'))
+
+    assert links['Salutation'] == '/static/videos/sign_language/Hello.mp4'
+    assert links['Farewell'] is None
+    assert 'Salutation' not in {change['word'] for change in report['changes']}
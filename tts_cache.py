@@ -0,0 +1,323 @@
+import os
+import hashlib
+import logging
+import tempfile
+import threading
+from collections import OrderedDict
+
+from engine_pool import EngineTimeout
+
+
+class GTTSBackend:
+    """Speech synthesis with the Google Text-to-Speech service"""
+
+    name = 'gtts'
+
+    def synthesize(self, text, lang, slow, path):
+        """
+        Synthesize speech into an MP3 file
+
+        Args:
+            text (str): Text to speak
+            lang (str): Language code
+            slow (bool): Whether to speak slowly
+            path (str): File to write the MP3 to
+        """
+        from gtts import gTTS
+        gTTS(text=text, lang=lang, slow=slow).save(path)
+
+
+class StubTTSBackend:
+    """Offline stand-in that writes a short silent MP3, for tests and benchmarks"""
+
+    name = 'stub'
+
+    # One silent MPEG-1 Layer III frame (128 kbps, 44.1 kHz)
+    SILENT_FRAME = b'\xff\xfb\x90\x64' + b'\x00' * 413
+
+    def synthesize(self, text, lang, slow, path):
+        """
+        Write a silent MP3 whose length grows with the text
+
+        Args:
+            text (str): Text to speak
+            lang (str): Language code
+            slow (bool): Whether to speak slowly
+            path (str): File to write the MP3 to
+        """
+        frames = max(1, len(text) // 4) * (2 if slow else 1)
+        with open(path, 'wb') as f:
+            f.write(self.SILENT_FRAME * frames)
+
+
+TTS_BACKENDS = {
+    'gtts': GTTSBackend,
+    'stub': StubTTSBackend,
+}
+
+
+class TTSCache:
+    """
+    Content-addressed on-disk cache of synthesized speech.
+
+    Files are named by a hash of (text, lang, slow) and sharded into
+    subdirectories by the first two hex digits of the hash. The total size is
+    bounded by evicting the least recently used files, and concurrent requests
+    for the same missing entry wait for a single synthesis.
+
+    The directory is shared by every worker process while each keeps its own
+    index, so an indexed file is checked on disk before it is returned: files
+    another worker evicted are synthesized again, and files another worker
+    synthesized are adopted instead of being synthesized twice.
+    """
+
+    def __init__(self, cache_dir, backend=None, max_bytes=256 * 1024 * 1024, wait_timeout=15.0):
+        """
+        Initialize the cache, indexing any files already on disk
+
+        Args:
+            cache_dir (str): Directory the MP3 files are stored in
+            backend: Synthesis backend, defaults to GTTSBackend
+            max_bytes (int): Maximum total size of the cached files
+            wait_timeout (float): Seconds a request waits for another one synthesizing the same text
+        """
+        self.cache_dir = cache_dir
+        self.backend = backend or GTTSBackend()
+        self.max_bytes = max_bytes
+        self.wait_timeout = wait_timeout
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._pending = {}
+        self.total_bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.collapsed = 0
+        self.wait_timeouts = 0
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self._scan()
+
+    @staticmethod
+    def make_key(text, lang='en', slow=False):
+        """
+        Build the cache key for a synthesis request
+
+        Args:
+            text (str): Text to speak
+            lang (str): Language code
+            slow (bool): Whether to speak slowly
+
+        Returns:
+            str: Hex SHA-256 digest identifying the audio
+        """
+        return hashlib.sha256(f"{lang}\0{int(bool(slow))}\0{text}".encode('utf-8')).hexdigest()
+
+    def path_for(self, key):
+        """
+        Get the file path for a cache key
+
+        Args:
+            key (str): Cache key
+
+        Returns:
+            str: Path of the MP3 file for the key
+        """
+        return os.path.join(self.cache_dir, key[:2], f"{key}.mp3")
+
+    def _scan(self):
+        """Index existing files, oldest first so they are evicted first"""
+        found = []
+        for root, _, files in os.walk(self.cache_dir):
+            for filename in files:
+                key, ext = os.path.splitext(filename)
+                if ext != '.mp3':
+                    continue
+                try:
+                    stat = os.stat(os.path.join(root, filename))
+                except OSError:
+                    continue
+                found.append((stat.st_mtime, key, stat.st_size))
+
+        for _, key, size in sorted(found):
+            self._entries[key] = size
+            self.total_bytes += size
+        self._evict()
+
+    def _evict(self):
+        """Remove least recently used files until the cache fits its size limit"""
+        while self.total_bytes > self.max_bytes and len(self._entries) > 1:
+            key, size = self._entries.popitem(last=False)
+            self.total_bytes -= size
+            self.evictions += 1
+            try:
+                os.unlink(self.path_for(key))
+            except FileNotFoundError:
+                # Already evicted by another worker
+                pass
+            except OSError as e:
+                logging.error(f"Error removing cached speech {key}: {str(e)}")
+
+    def _cached_path(self, key):
+        """
+        Get the path of a cached file, reconciling the index with the directory.
+        Must be called with the lock held.
+
+        Args:
+            key (str): Cache key
+
+        Returns:
+            str: Path of the MP3 file, or None if it isn't on disk
+        """
+        path = self.path_for(key)
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            size = None
+
+        if key in self._entries:
+            if size is None:
+                # Another worker evicted the file
+                self.total_bytes -= self._entries.pop(key)
+                return None
+            self._entries.move_to_end(key)
+            return path
+
+        if size is None:
+            return None
+        # Another worker synthesized the file
+        self._entries[key] = size
+        self.total_bytes += size
+        self._evict()
+        return path if key in self._entries else None
+
+    def forget(self, key):
+        """
+        Drop a key from the index after its file was found missing
+
+        Args:
+            key (str): Cache key
+        """
+        with self._lock:
+            size = self._entries.pop(key, None)
+            if size is not None:
+                self.total_bytes -= size
+
+    def lookup(self, text, lang='en', slow=False):
+        """
+        Get the MP3 for a text only if it is already cached
+
+        Args:
+            text (str): Text to speak
+            lang (str): Language code
+            slow (bool): Whether to speak slowly
+
+        Returns:
+            tuple: (path, key) of the cached MP3 file, path is None on a miss
+        """
+        key = self.make_key(text, lang, slow)
+        with self._lock:
+            path = self._cached_path(key)
+            if path is not None:
+                self.hits += 1
+                return path, key
+        return None, key
+
+    def get(self, text, lang='en', slow=False):
+        """
+        Get the MP3 for a text, synthesizing it on a miss
+
+        Args:
+            text (str): Text to speak
+            lang (str): Language code
+            slow (bool): Whether to speak slowly
+
+        Returns:
+            tuple: (path, key) of the cached MP3 file
+
+        Raises:
+            EngineTimeout: If another request synthesizing the text doesn't finish in time
+        """
+        key = self.make_key(text, lang, slow)
+
+        with self._lock:
+            path = self._cached_path(key)
+            if path is not None:
+                self.hits += 1
+                return path, key
+
+            pending = self._pending.get(key)
+            if pending is None:
+                pending = self._pending[key] = {'event': threading.Event(), 'error': None}
+                leader = True
+                self.misses += 1
+            else:
+                leader = False
+                self.collapsed += 1
+
+        if not leader:
+            # Another request is already synthesizing this text. Don't wait forever
+            # on a hung backend call, that would hold this thread too
+            if not pending['event'].wait(self.wait_timeout):
+                with self._lock:
+                    self.wait_timeouts += 1
+                raise EngineTimeout("speech synthesis of the same text timed out")
+            if pending['error'] is not None:
+                raise pending['error']
+            return self.path_for(key), key
+
+        try:
+            path = self._synthesize(key, text, lang, slow)
+        except Exception as e:
+            pending['error'] = e
+            raise
+        finally:
+            with self._lock:
+                del self._pending[key]
+            pending['event'].set()
+        return path, key
+
+    def _synthesize(self, key, text, lang, slow):
+        """Synthesize into a temporary file and move it into place atomically"""
+        path = self.path_for(key)
+        shard = os.path.dirname(path)
+        os.makedirs(shard, exist_ok=True)
+
+        fd, temp_path = tempfile.mkstemp(dir=shard, suffix='.tmp')
+        os.close(fd)
+        try:
+            self.backend.synthesize(text, lang, slow, temp_path)
+            size = os.path.getsize(temp_path)
+            os.replace(temp_path, path)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+
+        with self._lock:
+            self._entries[key] = size
+            self.total_bytes += size
+            self._evict()
+        return path
+
+    def stats(self):
+        """
+        Get usage counters for the cache
+
+        Returns:
+            dict: Entries, total bytes, hits, misses, evictions, collapsed misses and
+                  waits for them that timed out
+        """
+        return {
+            'backend': getattr(self.backend, 'name', type(self.backend).__name__),
+            'entries': len(self._entries),
+            'bytes': self.total_bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'collapsed': self.collapsed,
+            'wait_timeouts': self.wait_timeouts,
+        }
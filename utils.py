@@ -1,34 +1,101 @@
 import nltk
-from nltk.stem import WordNetLemmatizer
 import os
 import logging
 from flask import current_app
 
-# Download NLTK data if not already downloaded
-try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    nltk.download('punkt')
+from caching import LRUCache, MISSING
+from nlp_resources import get_tagger, get_lemmatizer
+from video_catalog import get_video_catalog
+from phrase_matcher import get_phrase_matcher
+from video_manifest import get_video_manifest
+from request_metrics import timed_stage
 
-try:
-    nltk.data.find('taggers/averaged_perceptron_tagger')
-except LookupError:
-    nltk.download('averaged_perceptron_tagger')
-    
-# This is the correct name for the tagger model - using both to ensure compatibility
-try:
-    nltk.data.find('taggers/averaged_perceptron_tagger_eng')  
-except LookupError:
-    nltk.download('averaged_perceptron_tagger')
+# Cache of processed words per normalized input text, and of lemmas per (word, POS)
+text_cache = LRUCache(int(os.environ.get("TEXT_CACHE_SIZE", 4096)))
+lemma_cache = LRUCache(int(os.environ.get("LEMMA_CACHE_SIZE", 16384)))
 
-try:
-    nltk.data.find('corpora/wordnet')
-except LookupError:
-    nltk.download('wordnet')
+PUNCTUATION = '.,?!;:"\'()[]{}'
 
-# Initialize lemmatizer
-lemmatizer = WordNetLemmatizer()
+def is_punctuation(word):
+    """
+    Check whether a token consists only of punctuation
+    
+    Args:
+        word (str): Token to check
+        
+    Returns:
+        bool: True if every character is punctuation, False otherwise
+    """
+    return all(char in PUNCTUATION for char in word)
 
+def split_words(text):
+    """
+    Split text into lowercased words on whitespace, the fallback when NLTK fails
+    
+    Args:
+        text (str): Input text
+        
+    Returns:
+        list: Words with surrounding punctuation removed
+    """
+    return [w.strip(PUNCTUATION) for w in (text or '').lower().split() if w and not is_punctuation(w)]
+
+def lemmatize_tagged(word, tag):
+    """
+    Lemmatize a word based on its part-of-speech tag
+    
+    Args:
+        word (str): Lowercased word to lemmatize
+        tag (str): Penn Treebank POS tag for the word
+        
+    Returns:
+        str: The lemma of the word
+    """
+    if tag.startswith('N'):  # Noun
+        pos = 'n'
+    elif tag.startswith('V'):  # Verb
+        pos = 'v'
+    elif tag.startswith('J'):  # Adjective
+        pos = 'a'
+    elif tag.startswith('R'):  # Adverb
+        pos = 'r'
+    else:
+        pos = None
+    
+    key = (word, pos)
+    lemma = lemma_cache.get(key)
+    if lemma is MISSING:
+        lemmatizer = get_lemmatizer()
+        lemma = lemmatizer.lemmatize(word, pos) if pos else lemmatizer.lemmatize(word)
+        lemma_cache.put(key, lemma)
+    return lemma
+
+def configure_text_caches(text_cache_size=None, lemma_cache_size=None):
+    """
+    Resize the text processing caches, 0 disables a cache
+    
+    Args:
+        text_cache_size (int): Maximum number of cached input texts
+        lemma_cache_size (int): Maximum number of cached (word, POS) lemmas
+    """
+    if text_cache_size is not None:
+        text_cache.resize(text_cache_size)
+    if lemma_cache_size is not None:
+        lemma_cache.resize(lemma_cache_size)
+
+def text_cache_stats():
+    """
+    Get hit/miss counters for the text processing caches
+    
+    Returns:
+        dict: Stats for the text and lemma caches
+    """
+    return {
+        'text': text_cache.stats(),
+        'lemma': lemma_cache.stats(),
+    }
+
+@timed_stage('nlp')
 def process_text(text):
     """
     Process text using NLP techniques to prepare for sign language translation
@@ -42,101 +109,127 @@ def process_text(text):
     if not text:
         return []
     
+    # Repeated inputs are answered from the cache of normalized texts
+    normalized = ' '.join(text.lower().split())
+    cached = text_cache.get(normalized)
+    if cached is not MISSING:
+        return list(cached)
+    
     try:
-        # Tokenize the text into words
-        words = nltk.word_tokenize(text.lower())
-        
-        # Part-of-speech tagging
-        tagged = nltk.pos_tag(words)
+        tagger = get_tagger()
         
-        # Process each word based on its part of speech
-        processed_words = []
-        for word, tag in tagged:
-            # Remove punctuation
-            if all(char in '.,?!;:"\'()[]{}' for char in word):
-                continue
-                
-            # Lemmatize word based on POS
-            if tag.startswith('N'):  # Noun
-                lemma = lemmatizer.lemmatize(word, 'n')
-            elif tag.startswith('V'):  # Verb
-                lemma = lemmatizer.lemmatize(word, 'v')
-            elif tag.startswith('J'):  # Adjective
-                lemma = lemmatizer.lemmatize(word, 'a')
-            elif tag.startswith('R'):  # Adverb
-                lemma = lemmatizer.lemmatize(word, 'r')
-            else:
-                lemma = lemmatizer.lemmatize(word)
-                
-            processed_words.append(lemma)
+        if normalized.isalnum():
+            # Fast path for single plain words: they need no tokenizing, and
+            # words with an unambiguous tag are looked up without tagging
+            tag = tagger.tagdict.get(normalized)
+            tagged = [(normalized, tag)] if tag else tagger.tag([normalized])
+        else:
+            # Tokenize the text into words
+            words = nltk.word_tokenize(normalized)
+            
+            # Part-of-speech tagging
+            tagged = tagger.tag(words)
         
+        # Lemmatize each word based on its part of speech, removing punctuation
+        processed_words = [lemmatize_tagged(word, tag) for word, tag in tagged if not is_punctuation(word)]
+        text_cache.put(normalized, tuple(processed_words))
         return processed_words
     except Exception as e:
         # Fallback if NLTK processing fails
         logging.error(f"Error in process_text: {str(e)}")
         
         # Just return the words split by whitespace as a simple fallback
-        return [w for w in text.lower().split() if w and not all(char in '.,?!;:"\'()[]{}' for char in w)]
+        return split_words(text)
 
-def find_sign_video(word, video_dir='static/videos/sign_language/'):
+@timed_stage('nlp')
+def process_words(words):
     """
-    Find a matching sign language video for a word, trying different case variants
+    Process several words or short texts with a single tokenize/tag pass
+    
+    The tokens of every input are tagged together so the tagger runs once for the
+    whole batch, then split back so each input keeps its own list of lemmas.
     
     Args:
-        word (str): Word to find a video for
+        words (list): Input words or texts to process, in order
+        
+    Returns:
+        list: One list of processed words per input, in the same order
+    """
+    if not words:
+        return []
+    
+    try:
+        tokenized = [nltk.word_tokenize(word.lower()) if word else [] for word in words]
+        tagged = get_tagger().tag([token for tokens in tokenized for token in tokens])
+        
+        results = []
+        position = 0
+        for tokens in tokenized:
+            chunk = tagged[position:position + len(tokens)]
+            position += len(tokens)
+            results.append([lemmatize_tagged(word, tag) for word, tag in chunk if not is_punctuation(word)])
+        return results
+    except Exception as e:
+        # Fallback if NLTK processing fails
+        logging.error(f"Error in process_words: {str(e)}")
+        
+        return [split_words(word) for word in words]
+
+@timed_stage('video_lookup')
+def find_sign_phrases(words, video_dir='static/videos/sign_language/'):
+    """
+    Split processed words into the fewest sign videos, matching phrase clips
+    such as "Thank You" or "Do Not" before single words
+    
+    Args:
+        words (list): Processed words in sentence order
         video_dir (str): Directory path where videos are stored
         
     Returns:
-        tuple: (path, title) where path is the path to the video file and title is the exact name 
-              without extension, or (None, None) if not found
-    """
-    # Get root path for static files
-    app_root = current_app.root_path
-    full_video_dir = os.path.join(app_root, video_dir)
-    
-    # Create the directory if it doesn't exist
-    if not os.path.exists(full_video_dir):
-        try:
-            os.makedirs(full_video_dir)
-            logging.info(f"Created directory: {full_video_dir}")
-        except Exception as e:
-            logging.error(f"Error creating directory {full_video_dir}: {str(e)}")
-    
-    # Try exact match
-    filename = f"{word}.mp4"
-    video_path = os.path.join(video_dir, filename)
-    if check_video_exists(os.path.join(app_root, video_path)):
-        return video_path, word
-    
-    # Try lowercase
-    filename = f"{word.lower()}.mp4"
-    video_path = os.path.join(video_dir, filename)
-    if check_video_exists(os.path.join(app_root, video_path)):
-        return video_path, word.lower()
-    
-    # Try capitalizing first letter
-    filename = f"{word.capitalize()}.mp4"
-    video_path = os.path.join(video_dir, filename)
-    if check_video_exists(os.path.join(app_root, video_path)):
-        return video_path, word.capitalize()
-    
-    # Try uppercase
-    filename = f"{word.upper()}.mp4"
-    video_path = os.path.join(video_dir, filename)
-    if check_video_exists(os.path.join(app_root, video_path)):
-        return video_path, word.upper()
-    
-    # No match found
-    return None, None
+        list: Segments as dicts with start and end word indexes, video_path and
+              video_title, where video_path is None for words without a video
+    """
+    catalog = get_video_catalog(current_app.root_path, video_dir)
+    return get_phrase_matcher(catalog, process_words).segment(words)
 
-def check_video_exists(path):
+@timed_stage('video_lookup')
+def fingerspell_word(word, video_dir='static/videos/sign_language/'):
     """
-    Check if a video file exists at the specified path
+    Spell a word using the single character videos, which are only the
+    digits 0-9 in the bundled video set
     
     Args:
-        path (str): Full path to check
+        word (str): Word to spell
+        video_dir (str): Directory path where videos are stored
+        
+    Returns:
+        list: (path, title) for each character, or an empty list if the word
+              can't be fully spelled
+    """
+    catalog = get_video_catalog(current_app.root_path, video_dir)
+    return get_phrase_matcher(catalog, process_words).fingerspell(word)
+
+def sign_video_catalog(video_dir='static/videos/sign_language/'):
+    """
+    Get the in-memory index of the sign videos
+    
+    Args:
+        video_dir (str): Directory path where videos are stored
+        
+    Returns:
+        VideoCatalog: The catalog for the video directory
+    """
+    return get_video_catalog(current_app.root_path, video_dir)
+
+def video_manifest(video_dir='static/videos/sign_language/'):
+    """
+    Get the precomputed size, duration and hash metadata of the sign videos
+    
+    Args:
+        video_dir (str): Directory path where videos are stored
         
     Returns:
-        bool: True if the file exists, False otherwise
+        VideoManifest: The manifest for the video directory
     """
-    return os.path.exists(path) and os.path.isfile(path)
\ No newline at end of file
+    catalog = get_video_catalog(current_app.root_path, video_dir)
+    return get_video_manifest(catalog, os.path.join(current_app.instance_path, 'video_manifest.json'))
@@ -0,0 +1,206 @@
+import os
+import time
+import logging
+import threading
+
+# Video file extensions recognised as sign language clips
+VIDEO_EXTENSIONS = ('.mp4',)
+
+# Minimum number of seconds between directory mtime checks
+DEFAULT_REFRESH_INTERVAL = 5.0
+
+
+class VideoCatalog:
+    """
+    In-memory index of the sign language video directory.
+
+    The directory is scanned once and every clip is indexed by its exact name and
+    its case-folded name, so lookups are answered from memory without touching the
+    filesystem. The directory mtime is re-checked at most once per refresh interval
+    and the index is rebuilt when clips are added or removed.
+    """
+
+    def __init__(self, root_path, video_dir='static/videos/sign_language/',
+                 refresh_interval=DEFAULT_REFRESH_INTERVAL):
+        """
+        Initialize the catalog
+
+        Args:
+            root_path (str): Application root path the video directory is relative to
+            video_dir (str): Directory path where videos are stored
+            refresh_interval (float): Seconds between directory mtime checks, 0 checks on every lookup
+        """
+        self.root_path = root_path
+        self.video_dir = video_dir
+        self.full_video_dir = os.path.join(root_path, video_dir)
+        self.refresh_interval = refresh_interval
+
+        self._lock = threading.Lock()
+        self._exact = {}
+        self._folded = {}
+        self._dir_mtime = None
+        self._last_check = 0.0
+
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+
+        self.reload()
+
+    def reload(self):
+        """Rescan the video directory and rebuild the index"""
+        exact = {}
+        folded = {}
+        mtime = None
+
+        if not os.path.isdir(self.full_video_dir):
+            try:
+                os.makedirs(self.full_video_dir)
+                logging.info(f"Created directory: {self.full_video_dir}")
+            except Exception as e:
+                logging.error(f"Error creating directory {self.full_video_dir}: {str(e)}")
+
+        try:
+            mtime = os.stat(self.full_video_dir).st_mtime
+            with os.scandir(self.full_video_dir) as it:
+                for dir_entry in it:
+                    title, ext = os.path.splitext(dir_entry.name)
+                    if ext.lower() not in VIDEO_EXTENSIONS or not dir_entry.is_file():
+                        continue
+                    video = (os.path.join(self.video_dir, dir_entry.name), title)
+                    exact[title] = video
+                    # Keep the first clip seen for a folded name, preferring the exact
+                    # lookup above when several clips differ only by case
+                    folded.setdefault(title.casefold(), video)
+        except Exception as e:
+            logging.error(f"Error scanning video directory {self.full_video_dir}: {str(e)}")
+
+        with self._lock:
+            self._exact = exact
+            self._folded = folded
+            self._dir_mtime = mtime
+            self._last_check = time.monotonic()
+            self.reloads += 1
+
+        logging.debug(f"Indexed {len(exact)} sign videos in {self.full_video_dir}")
+
+    def refresh_if_stale(self):
+        """
+        Reload the index if the video directory changed since the last scan
+
+        Returns:
+            bool: True if the index was rebuilt, False otherwise
+        """
+        now = time.monotonic()
+        if now - self._last_check < self.refresh_interval:
+            return False
+        self._last_check = now
+
+        try:
+            mtime = os.stat(self.full_video_dir).st_mtime
+        except OSError:
+            mtime = None
+
+        if mtime != self._dir_mtime:
+            self.reload()
+            return True
+        return False
+
+    def lookup(self, word):
+        """
+        Find the video for a word, ignoring case
+
+        Args:
+            word (str): Word to find a video for
+
+        Returns:
+            tuple: (path, title) where path is the path to the video file relative to the
+                  application root and title is the exact name without extension,
+                  or (None, None) if not found
+        """
+        self.refresh_if_stale()
+
+        video = self._exact.get(word) or self._folded.get(word.casefold())
+        if video:
+            self.hits += 1
+            return video
+
+        self.misses += 1
+        return None, None
+
+    def record(self, hits=0, misses=0):
+        """
+        Count lookups answered from the index without going through lookup()
+
+        Args:
+            hits (int): Lookups that found a clip
+            misses (int): Lookups that found none
+        """
+        self.hits += hits
+        self.misses += misses
+
+    def titles(self):
+        """
+        Get the titles of all indexed videos
+
+        Returns:
+            list: Video titles without extension
+        """
+        return list(self._exact)
+
+    def entries(self):
+        """
+        Get every indexed video without touching the lookup counters
+
+        Returns:
+            list: (title, (path, title)) pairs for all indexed videos
+        """
+        return list(self._exact.items())
+
+    def __len__(self):
+        return len(self._exact)
+
+    def __contains__(self, word):
+        return word in self._exact or word.casefold() in self._folded
+
+    def stats(self):
+        """
+        Get lookup counters for the catalog
+
+        Returns:
+            dict: Number of indexed videos, hits, misses, reloads and hit rate
+        """
+        total = self.hits + self.misses
+        return {
+            'videos': len(self._exact),
+            'hits': self.hits,
+            'misses': self.misses,
+            'reloads': self.reloads,
+            'hit_rate': self.hits / total if total else 0.0,
+        }
+
+
+_catalogs = {}
+_catalogs_lock = threading.Lock()
+
+
+def get_video_catalog(root_path, video_dir='static/videos/sign_language/'):
+    """
+    Get the shared catalog for a video directory, building it on first use
+
+    Args:
+        root_path (str): Application root path the video directory is relative to
+        video_dir (str): Directory path where videos are stored
+
+    Returns:
+        VideoCatalog: The catalog for the directory
+    """
+    key = (root_path, video_dir)
+    catalog = _catalogs.get(key)
+    if catalog is None:
+        with _catalogs_lock:
+            catalog = _catalogs.get(key)
+            if catalog is None:
+                catalog = VideoCatalog(root_path, video_dir)
+                _catalogs[key] = catalog
+    return catalog
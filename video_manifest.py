@@ -0,0 +1,210 @@
+import os
+import json
+import struct
+import hashlib
+import logging
+import threading
+
+# Length of the content hash prefix used in fingerprinted URLs
+FINGERPRINT_LENGTH = 12
+
+
+def mp4_duration(path):
+    """
+    Read the duration of an MP4 file from its movie header box
+
+    Args:
+        path (str): Path to the MP4 file
+
+    Returns:
+        float: Duration in seconds, or None if it can't be read
+    """
+    try:
+        with open(path, 'rb') as f:
+            end = os.fstat(f.fileno()).st_size
+            # Walk the top level boxes to the moov box, then its children to mvhd
+            return _find_mvhd_duration(f, 0, end, ('moov', 'mvhd'))
+    except (OSError, struct.error, IndexError) as e:
+        # Truncated or corrupt boxes leave the duration unknown instead of failing the scan
+        logging.error(f"Error reading duration of {path}: {str(e)}")
+        return None
+
+
+def _find_mvhd_duration(f, start, end, path):
+    """Search the boxes between two offsets for the next box on a path"""
+    offset = start
+    while offset + 8 <= end:
+        f.seek(offset)
+        size, box_type = struct.unpack('>I4s', f.read(8))
+        header = 8
+        if size == 1:
+            size = struct.unpack('>Q', f.read(8))[0]
+            header = 16
+        elif size == 0:
+            size = end - offset
+        if size < header:
+            return None
+
+        if box_type.decode('latin-1') == path[0]:
+            if len(path) > 1:
+                return _find_mvhd_duration(f, offset + header, offset + size, path[1:])
+            version = f.read(4)[0]
+            if version == 1:
+                timescale, duration = struct.unpack('>16xIQ', f.read(28))
+            else:
+                timescale, duration = struct.unpack('>8xII', f.read(16))
+            return round(duration / timescale, 3) if timescale else None
+        offset += size
+    return None
+
+
+def file_sha256(path):
+    """
+    Hash a file's contents
+
+    Args:
+        path (str): Path to the file
+
+    Returns:
+        str: Hex SHA-256 digest
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class VideoManifest:
+    """
+    Precomputed size, duration and content hash of every clip in a video catalog.
+
+    The manifest is rebuilt whenever the catalog is reloaded. Results are kept in
+    a JSON cache file keyed by file size and mtime, so a restart only hashes clips
+    that actually changed.
+    """
+
+    def __init__(self, catalog, cache_file=None):
+        """
+        Initialize the manifest
+
+        Args:
+            catalog (VideoCatalog): Catalog providing the clips
+            cache_file (str): Optional JSON file to persist metadata across restarts
+        """
+        self.catalog = catalog
+        self.cache_file = cache_file
+        self._lock = threading.Lock()
+        self._entries = None
+        self._catalog_version = None
+
+    def _load_cache(self):
+        """Read previously computed metadata from the cache file"""
+        if not self.cache_file or not os.path.exists(self.cache_file):
+            return {}
+        try:
+            with open(self.cache_file) as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logging.error(f"Error reading video manifest cache {self.cache_file}: {str(e)}")
+            return {}
+
+    def _save_cache(self, entries):
+        """Write the metadata to the cache file atomically"""
+        if not self.cache_file:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+            temp_file = f"{self.cache_file}.tmp"
+            with open(temp_file, 'w') as f:
+                json.dump(entries, f, indent=1, sort_keys=True)
+            os.replace(temp_file, self.cache_file)
+        except OSError as e:
+            logging.error(f"Error writing video manifest cache {self.cache_file}: {str(e)}")
+
+    def _build(self):
+        """Compute metadata for every clip, reusing cached values for unchanged files"""
+        version = self.catalog.reloads
+        cached = self._load_cache()
+        entries = {}
+
+        for title, (video_path, _) in self.catalog.entries():
+            full_path = os.path.join(self.catalog.root_path, video_path)
+            filename = os.path.basename(video_path)
+            try:
+                stat = os.stat(full_path)
+            except OSError as e:
+                logging.error(f"Error reading video {full_path}: {str(e)}")
+                continue
+
+            entry = cached.get(filename)
+            if not entry or entry.get('size') != stat.st_size or entry.get('mtime') != stat.st_mtime:
+                sha256 = file_sha256(full_path)
+                entry = {
+                    'title': title,
+                    'path': video_path,
+                    'size': stat.st_size,
+                    'mtime': stat.st_mtime,
+                    'sha256': sha256,
+                    'fingerprint': sha256[:FINGERPRINT_LENGTH],
+                    'duration': mp4_duration(full_path),
+                }
+            entries[filename] = entry
+
+        if entries != cached:
+            self._save_cache(entries)
+
+        self._entries = entries
+        self._catalog_version = version
+        logging.debug(f"Built video manifest for {len(entries)} clips")
+
+    def entries(self):
+        """
+        Get the metadata of every clip, rebuilding it if the catalog was reloaded
+
+        Returns:
+            dict: Metadata dicts keyed by file name
+        """
+        self.catalog.refresh_if_stale()
+        if self._entries is None or self._catalog_version != self.catalog.reloads:
+            with self._lock:
+                if self._entries is None or self._catalog_version != self.catalog.reloads:
+                    self._build()
+        return self._entries
+
+    def get(self, filename):
+        """
+        Get the metadata of one clip
+
+        Args:
+            filename (str): File name of the clip, including the extension
+
+        Returns:
+            dict: The clip metadata, or None if the clip isn't in the catalog
+        """
+        return self.entries().get(filename)
+
+
+_manifests = {}
+_manifests_lock = threading.Lock()
+
+
+def get_video_manifest(catalog, cache_file=None):
+    """
+    Get the shared manifest for a catalog, building it on first use
+
+    Args:
+        catalog (VideoCatalog): Catalog providing the clips
+        cache_file (str): Optional JSON file to persist metadata across restarts
+
+    Returns:
+        VideoManifest: The manifest for the catalog
+    """
+    manifest = _manifests.get(id(catalog))
+    if manifest is None:
+        with _manifests_lock:
+            manifest = _manifests.get(id(catalog))
+            if manifest is None:
+                manifest = VideoManifest(catalog, cache_file)
+                _manifests[id(catalog)] = manifest
+    return manifest
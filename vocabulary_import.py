@@ -0,0 +1,273 @@
+import os
+import csv
+import sys
+import json
+import time
+import logging
+import argparse
+
+from sqlalchemy import insert, update, select
+
+from app import app, db
+from models import SignLanguageEntry, normalize_word
+from utils import sign_video_catalog
+
+# Columns read from vocabulary files, anything else is ignored
+FIELDS = ('word', 'category', 'difficulty', 'video_path')
+DIFFICULTIES = ('beginner', 'intermediate', 'advanced')
+
+
+def infer_category(word):
+    """
+    Guess a category for a word that has none
+
+    Args:
+        word (str): Word or phrase
+
+    Returns:
+        str: Category name
+    """
+    if word.isdigit():
+        return 'Numbers'
+    if len(word) == 1 and word.isalpha():
+        return 'Alphabet'
+    if ' ' in word.strip():
+        return 'Common Phrases'
+    return 'Vocabulary'
+
+
+def read_vocabulary_file(path):
+    """
+    Read vocabulary rows from a CSV or JSON file
+
+    CSV files need a header row with at least a word column. JSON files hold a
+    list of objects, or an object with the list under "entries".
+
+    Args:
+        path (str): Path to a .csv or .json file
+
+    Returns:
+        list: Row dicts with the known fields that are present
+    """
+    if path.lower().endswith('.json'):
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            data = data.get('entries', [])
+    else:
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            data = list(csv.DictReader(f))
+
+    rows = []
+    for item in data:
+        if not isinstance(item, dict):
+            continue
+        row = {field: item[field].strip() for field in FIELDS
+               if isinstance(item.get(field), str) and item[field].strip()}
+        if 'word' in row:
+            rows.append(row)
+    return rows
+
+
+class VocabularyImporter:
+    """
+    Idempotent sync of the vocabulary table from the video catalog and vocabulary files.
+
+    Rows are merged by normalized word: the video catalog contributes one entry
+    per clip, and file rows then override its fields. The table is read once,
+    the differences are worked out in memory, and only new or changed rows are
+    written with batched bulk inserts and primary key updates. Re-running an
+    import with the same inputs writes nothing.
+    """
+
+    def __init__(self, db, model, video_catalog=None, batch_size=1000):
+        """
+        Initialize the importer
+
+        Args:
+            db (SQLAlchemy): Database extension
+            model: Vocabulary model class
+            video_catalog (VideoCatalog): Catalog whose clips are imported and linked, None skips videos
+            batch_size (int): Rows per insert or update statement
+        """
+        self.db = db
+        self.model = model
+        self.video_catalog = video_catalog
+        self.batch_size = batch_size
+
+    def _desired(self, rows):
+        """Merge catalog clips and file rows into one entry per normalized word"""
+        desired = {}
+        if self.video_catalog is not None:
+            for title, (video_path, _) in self.video_catalog.entries():
+                desired[normalize_word(title)] = {'word': title, 'video_path': video_path}
+
+        for row in rows:
+            key = normalize_word(row['word'])
+            if not key or len(row['word']) > 100:
+                continue
+            entry = desired.setdefault(key, {})
+            entry.update(row)
+            if 'video_path' not in entry and self.video_catalog is not None:
+                video_path, _ = self.video_catalog.lookup(row['word'])
+                if video_path:
+                    entry['video_path'] = video_path
+        return desired
+
+    def _video_missing(self, video_path):
+        """Check whether a stored video path no longer points at a file"""
+        if not video_path or self.video_catalog is None:
+            return False
+        # Stored paths may be URL paths like /static/videos/..., relative to the app root either way
+        return not os.path.exists(os.path.join(self.video_catalog.root_path, video_path.lstrip('/')))
+
+    def sync(self, rows=(), dry_run=False):
+        """
+        Bring the vocabulary table in line with the catalog and the given rows
+
+        Args:
+            rows (list): Row dicts from vocabulary files, later rows win
+            dry_run (bool): Work out the differences without writing them
+
+        Returns:
+            dict: Report with counts of inserted, updated, unchanged and duplicate
+                  rows, plus the changes made to each word
+        """
+        started = time.perf_counter()
+        model = self.model
+        desired = self._desired(rows)
+
+        existing = {}
+        duplicates = 0
+        for row in self.db.session.execute(
+            select(model.id, model.word, model.word_normalized, model.category,
+                   model.difficulty, model.video_path).order_by(model.id)
+        ).all():
+            key = row.word_normalized or normalize_word(row.word)
+            if key in existing:
+                duplicates += 1
+                continue
+            existing[key] = row
+
+        inserts = []
+        updates = []
+        changes = []
+        for key, entry in desired.items():
+            current = existing.get(key)
+            if current is None:
+                difficulty = entry.get('difficulty')
+                inserts.append({
+                    'word': entry['word'],
+                    'word_normalized': key,
+                    'category': entry.get('category') or infer_category(entry['word']),
+                    'difficulty': difficulty if difficulty in DIFFICULTIES else 'beginner',
+                    'video_path': entry.get('video_path'),
+                })
+                changes.append({'word': entry['word'], 'action': 'insert'})
+                continue
+
+            values = {}
+            if entry.get('category') and entry['category'] != current.category:
+                values['category'] = entry['category']
+            elif not current.category:
+                values['category'] = infer_category(current.word)
+            if entry.get('difficulty') in DIFFICULTIES and entry['difficulty'] != current.difficulty:
+                values['difficulty'] = entry['difficulty']
+            if entry.get('video_path') and entry['video_path'] != current.video_path:
+                values['video_path'] = entry['video_path']
+            if current.word_normalized != key:
+                values['word_normalized'] = key
+            if values:
+                updates.append(dict(values, id=current.id))
+                changes.append({
+                    'word': current.word,
+                    'action': 'update',
+                    'fields': {field: [getattr(current, field), value] for field, value in values.items()},
+                })
+
+        unchanged = len(desired) - len(inserts) - len(updates)
+
+        # Fill missing categories of other rows and clear links to clips that
+        # were removed from the video directory
+        for key, current in existing.items():
+            if key in desired:
+                continue
+            values = {}
+            if not current.category:
+                values['category'] = infer_category(current.word)
+            if self._video_missing(current.video_path):
+                values['video_path'] = None
+            if values:
+                updates.append(dict(values, id=current.id))
+                changes.append({
+                    'word': current.word,
+                    'action': 'update',
+                    'fields': {field: [getattr(current, field), value] for field, value in values.items()},
+                })
+
+        if not dry_run:
+            try:
+                for start in range(0, len(inserts), self.batch_size):
+                    self.db.session.execute(insert(model), inserts[start:start + self.batch_size])
+                for start in range(0, len(updates), self.batch_size):
+                    self.db.session.execute(update(model), updates[start:start + self.batch_size])
+                self.db.session.commit()
+            except Exception as e:
+                self.db.session.rollback()
+                logging.error(f"Error importing vocabulary: {str(e)}")
+                raise
+
+        return {
+            'inserted': len(inserts),
+            'updated': len(updates),
+            'unchanged': unchanged,
+            'duplicates': duplicates,
+            'dry_run': dry_run,
+            'seconds': round(time.perf_counter() - started, 3),
+            'changes': changes,
+        }
+
+
+def main(argv=None):
+    """Command line entry point for importing vocabulary"""
+    parser = argparse.ArgumentParser(
+        description='Sync the vocabulary table with the sign videos and CSV/JSON vocabulary files')
+    parser.add_argument('files', nargs='*', help='CSV or JSON files with word, category, difficulty and video_path')
+    parser.add_argument('--no-videos', action='store_true', help="don't import or link the sign video clips")
+    parser.add_argument('--dry-run', action='store_true', help='report the differences without writing them')
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--verbose', action='store_true', help='list every changed word')
+    args = parser.parse_args(argv)
+
+    rows = []
+    for path in args.files:
+        try:
+            rows.extend(read_vocabulary_file(path))
+        except (OSError, ValueError) as e:
+            print(f"Error reading {path}: {str(e)}")
+            return 1
+
+    with app.app_context():
+        importer = VocabularyImporter(
+            db, SignLanguageEntry,
+            video_catalog=None if args.no_videos else sign_video_catalog(),
+            batch_size=args.batch_size,
+        )
+        report = importer.sync(rows, dry_run=args.dry_run)
+
+    if args.verbose:
+        for change in report['changes']:
+            if change['action'] == 'insert':
+                print(f"+ {change['word']}")
+            else:
+                fields = ', '.join(f"{field}: {old!r} -> {new!r}" for field, (old, new) in change['fields'].items())
+                print(f"~ {change['word']} ({fields})")
+    prefix = 'Would import' if args.dry_run else 'Imported'
+    print(f"{prefix} {len(rows)} file rows in {report['seconds']}s: {report['inserted']} inserted, "
+          f"{report['updated']} updated, {report['unchanged']} unchanged, "
+          f"{report['duplicates']} duplicate rows skipped.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())